@@ -287,6 +287,31 @@ class Sample(VESIcal.sample_class.Sample):
     pass
 
 
+class SampleBatch(VESIcal.sample_class.SampleBatch):
+    """ Stores the compositions of many samples in a single 2-D numpy array, with one row per
+    sample and one column per oxide in core.oxides. Provides the compositional methods of the
+    Sample class, calculated for all samples at once.
+
+    Parameters
+    ----------
+    compositions:     pandas.DataFrame or numpy.ndarray
+        The compositions of the samples, one per row. DataFrame columns are oxide names (or
+        cation names if units is 'mol_cations'). An array must have one column for each oxide
+        in core.oxides, in the same order.
+
+    units     str
+        Specifies the units of compositions. Choose from 'wtpt_oxides', 'mol_oxides',
+        'mol_cations'.
+
+    default_normalization:     str
+        The type of normalization to apply to the data by default, as for Sample.
+
+    default_units     str
+        The type of composition to return by default, as for Sample.
+    """
+    pass
+
+
 def get_oxides(sample):
     """
     Returns a sample composition with only compositional oxide data, removing
@@ -390,6 +415,16 @@ def BatchFile_from_DataFrame(dataframe, **kwargs):
     return VESIcal.batchmodel.BatchFile_from_DataFrame(dataframe, **kwargs)
 
 
+def calculate_in_chunks(filename, output_filename, calculation, **kwargs):
+    """
+    Performs a batch calculation on a csv file too large to be held in
+    memory, appending the results of each chunk of samples to an output csv
+    file. See batchmodel.calculate_in_chunks().
+    """
+    return VESIcal.batchmodel.calculate_in_chunks(filename, output_filename,
+                                                  calculation, **kwargs)
+
+
 """
                         ,,,                                     .*****
                        ,***,*                                  ,* *****
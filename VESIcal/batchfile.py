@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import os
 import sys
@@ -194,17 +195,17 @@ class BatchFile(object):
         for name in total_iron_columns:
             if name in data.columns:
                 if 'FeO' in data.columns:
-                    for row in data.itertuples():
-                        if (data.at[row.Index, "FeO"] == 0 and
-                           data.at[row.Index, name] > 0):
-                            w.warn("Sample " + str(row.Index) + ": " +
-                                   str(name) + " value of " +
-                                   str(data.at[row.Index, name]) +
-                                   " used as FeO. Fe2O3 set to 0.0.",
-                                   RuntimeWarning, stacklevel=2)
-                            data.at[row.Index, "Fe2O3"] = 0.0
-                            data.at[row.Index, "FeO"] = (
-                                                      data.at[row.Index, name])
+                    replace = (data['FeO'] == 0) & (data[name] > 0)
+                    for index, value in data.loc[replace, name].items():
+                        w.warn("Sample " + str(index) + ": " + str(name) +
+                               " value of " + str(value) +
+                               " used as FeO. Fe2O3 set to 0.0.",
+                               RuntimeWarning, stacklevel=2)
+                    if replace.any():
+                        if 'Fe2O3' not in data.columns:
+                            data['Fe2O3'] = 0.0
+                        data.loc[replace, "Fe2O3"] = 0.0
+                        data.loc[replace, "FeO"] = data.loc[replace, name]
                 else:
                     w.warn("Total iron column " + str(name) + " detected. " +
                            "This column will be treated as FeO. If Fe2O3 " +
@@ -216,10 +217,8 @@ class BatchFile(object):
 
         if units == "wtpt_oxides":
             pass
-        if units == "mol_oxides":
-            data = self._molOxides_to_wtpercentOxides(data)
-        if units == "mol_cations":
-            data = self._molCations_to_wtpercentOxides(data)
+        if units in ["mol_oxides", "mol_cations"]:
+            data = self._moles_to_wtpercentOxides(data, units)
 
         for oxide in core.oxides:
             if oxide in data.columns:
@@ -227,9 +226,7 @@ class BatchFile(object):
             else:
                 data[oxide] = 0.0
 
-        for column in data:
-            if column in core.oxides:
-                data[column][data[column] < 0] = 0
+        data[core.oxides] = data[core.oxides].clip(lower=0)
 
         self.data = data
 
@@ -334,36 +331,42 @@ class BatchFile(object):
         pandas.DataFrame or BatchFile object
             All sample information.
         """
-        data = self.data.copy()
-
         # Fetch the default return types if not specified in function call
         if normalization is None and species is None:
             normalization = self.default_normalization
         if units is None and species is None:
             units = self.default_units
 
-        new_compositions = []
-        sample_names = []
-        for index, row in data.iterrows():
-            sample_comp = self.get_sample_composition(index, units=units,
-                                                      asSampleClass=True)
-            new_compositions.append(sample_comp.get_composition(
-                     species=species, normalization=normalization, units=units,
-                     exclude_volatiles=exclude_volatiles))
-            sample_names.append(index)
-        if isinstance(new_compositions[0], pd.Series):
-            return_frame = pd.concat(
-                           [pd.DataFrame(j) for j in new_compositions], axis=1)
-            return_frame = return_frame.transpose()
-            return_frame["new_index"] = sample_names
-            return_frame = return_frame.set_index("new_index")
-            return_frame.index.name = None
-        elif isinstance(new_compositions[0], float):
-            species_data = {species: new_compositions}
-            return_frame = pd.DataFrame(
-                           species_data, index=[name for name in sample_names])
+        # Each sample is stored as wt% oxides with the default normalization
+        # applied, as in get_sample_composition(), before the requested
+        # exclusion, conversion, and normalization are applied to all samples
+        # at once by sample_class.SampleBatch.
+        oxides = [col for col in self.data.columns if col in core.oxides]
+        batch = sample_class.SampleBatch(self.data[oxides])
+        if self.default_normalization != 'none':
+            batch = sample_class.SampleBatch(batch.get_composition(
+                        normalization=self.default_normalization,
+                        units='wtpt_oxides'))
+
+        if isinstance(species, str):
+            if species in core.oxides:
+                values = batch.get_composition(
+                             species=species, normalization=normalization,
+                             units=units, exclude_volatiles=exclude_volatiles)
+            else:
+                values = np.zeros(len(batch))
+            return_frame = pd.DataFrame({species: values}, index=batch.index)
+        elif species is None:
+            return_frame = batch.get_composition(
+                               normalization=normalization, units=units,
+                               exclude_volatiles=exclude_volatiles)
+            return_frame = return_frame[self._get_column_order(
+                               oxides, normalization, units,
+                               exclude_volatiles)]
         else:
-            return_frame = None
+            raise core.InputError("Species must be either a string or a "
+                                  "NoneType.")
+        return_frame = return_frame.rename_axis(None)
 
         if asBatchFile is False:
             return return_frame
@@ -526,32 +529,63 @@ class BatchFile(object):
             elif isinstance(species, str):
                 return return_sample
 
-    def _molOxides_to_wtpercentOxides(self, data):
-        for i, row in data.iterrows():
-            sample_comp = {}
-            for oxide in core.oxides:
-                if oxide in data.columns:
-                    sample_comp[oxide] = row[oxide]
-                else:
-                    sample_comp[oxide] = 0.0
-            _sample = sample_class.Sample(sample_comp, units='mol_oxides')
-            _sample_conv = _sample.get_composition()
-            for ox in core.oxides:
-                data.loc[i, oxide] = _sample_conv[oxide]
-        return data
+    def _get_column_order(self, oxides, normalization, units,
+                          exclude_volatiles):
+        """
+        Returns the columns of get_composition() in the order in which
+        Sample.get_composition() returns them for a single sample: in the
+        order of the imported data, with volatiles moved to the end by the
+        'fixedvolatiles' and 'additionalvolatiles' normalizations of oxides.
 
-    def _molCations_to_wtpercentOxides(self, data):
-        for i, row in data.iterrows():
-            sample_comp = {}
-            for cation in core.oxides_to_cations[core.oxides]:
-                if cation in data.columns:
-                    sample_comp[cation] = row[cation]
-                else:
-                    sample_comp[cation] = 0.0
-            _sample = sample_class.Sample(sample_comp, units='mol_cations')
-            _sample_conv = _sample.get_composition()
-            for oxide in core.oxides:
-                data.loc[i, oxide] = _sample_conv[oxide]
+        Parameters
+        ----------
+        oxides: list
+            The oxide columns of the imported data, in order.
+
+        normalization: str
+            The normalization applied by get_composition().
+
+        units: str
+            The units returned by get_composition().
+
+        exclude_volatiles: bool
+            Whether volatiles are excluded.
+
+        Returns
+        -------
+        list
+            Oxide names, or cation names if units is 'mol_cations' or
+            'mol_singleO'.
+        """
+        for norm in [self.default_normalization, normalization]:
+            if norm == 'fixedvolatiles':
+                volatiles = ['CO2', 'H2O']
+            elif norm == 'additionalvolatiles':
+                volatiles = ['H2O', 'CO2']
+            else:
+                volatiles = []
+            oxides = ([ox for ox in oxides if ox not in volatiles] +
+                      [ox for ox in volatiles if ox in oxides])
+            if units not in ['wtpt_oxides', 'mol_oxides']:
+                # Normalizations of cations keep the order of the oxides
+                break
+
+        if exclude_volatiles:
+            oxides = [ox for ox in oxides if ox not in ['H2O', 'CO2']]
+        if units in ['mol_cations', 'mol_singleO']:
+            return [core.oxides_to_cations[ox] for ox in oxides]
+        return oxides
+
+    def _moles_to_wtpercentOxides(self, data, units):
+        """
+        Replaces the oxide columns of data with wt% oxides, normalized to
+        100 wt%, converted by sample_class.SampleBatch from mol oxides or mol
+        cations, as given by units. Missing oxides are taken to be zero.
+        """
+        wtpt = sample_class.SampleBatch(data, units=units).get_composition(
+                   normalization='none', units='wtpt_oxides')
+        data[core.oxides] = wtpt.reindex(columns=core.oxides,
+                                         fill_value=0.0).to_numpy()
         return data
 
     def try_set_index(self, dataframe, label):
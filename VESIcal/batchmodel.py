@@ -2,27 +2,26 @@ from VESIcal import core
 from VESIcal import models
 from VESIcal import calculate_classes
 from VESIcal import batchfile
+from VESIcal import melts_stats
+from VESIcal.checkpoint import Checkpoint
 
+from VESIcal.models import magmasat
+
+from concurrent.futures import ProcessPoolExecutor
+import collections
+import functools
+import multiprocessing
+import multiprocessing.connection
 import numpy as np
+import os
+import pandas as pd
 import warnings as w
 import sys
-
-from thermoengine import equilibrate
+import time
 
 w.filterwarnings("ignore", message="rubicon.objc.ctypes_patch has only been "
                                    "tested ")
 
-# -------------- MELTS preamble --------------- #
-# instantiate thermoengine equilibrate MELTS instance
-melts = equilibrate.MELTSmodel('1.2.0')
-
-# Suppress phases not required in the melts simulation
-phases = melts.get_phase_names()
-for phase in phases:
-    melts.set_phase_inclusion_status({phase: False})
-melts.set_phase_inclusion_status({'Fluid': True, 'Liquid': True})
-# --------------------------------------------- #
-
 
 # -------------- BATCH PROCESSING ----------- #
 class BatchFile(batchfile.BatchFile):
@@ -61,6 +60,8 @@ class BatchFile(batchfile.BatchFile):
         bulk_comp = {oxide:  sample[oxide] for oxide in core.oxides}
         bulk_comp["H2O"] = H2O
         bulk_comp["CO2"] = CO2
+        # use magmasat's MELTS instance (and its cache)
+        melts = magmasat.melts
         melts.set_bulk_composition(bulk_comp)
 
         output = melts.equilibrate_tp(temperature, pressureMPa,
@@ -80,7 +81,11 @@ class BatchFile(batchfile.BatchFile):
 
     def calculate_dissolved_volatiles(self, temperature, pressure, X_fluid=1,
                                       print_status=True, model='MagmaSat',
-                                      record_errors=False, **kwargs):
+                                      record_errors=False, n_workers=None,
+                                      executor=None, record_melts_calls=False,
+                                      timeout=None, max_equilibrations=None,
+                                      checkpoint=None, warm_start=False,
+                                      **kwargs):
         """
         Calculates the amount of H2O and CO2 dissolved in a magma at the given
         P/T conditions and fluid composition. Fluid composition will be
@@ -126,6 +131,65 @@ class BatchFile(batchfile.BatchFile):
             OPTIONAL: If True, any errors arising during the calculation will
             be recorded as a column.
 
+        n_workers: int
+            OPTIONAL: Default is None, in which case samples are calculated
+            one after another in this process. Only used by MagmaSat. If an
+            int greater than 1 is passed, samples are calculated in that many
+            worker processes, each with its own MELTS instance. Results are
+            returned in the original sample order. Scripts using this option
+            must run the calculation under `if __name__ == '__main__':`.
+
+        executor: concurrent.futures.Executor
+            OPTIONAL: Default is None. An existing executor (e.g., a
+            ProcessPoolExecutor) in which to run MagmaSat calculations, in
+            place of the one created with n_workers. It is not shut down
+            after the calculation.
+
+        record_melts_calls: bool
+            OPTIONAL: Default is False. If True, the number of calls to
+            MELTS made for each sample, and the wall time spent in them, are
+            recorded and returned as columns '<method>_calls_VESIcal' and
+            '<method>_seconds_VESIcal' for each of equilibrate_tp,
+            get_mass_of_phase, and get_composition_of_phase. Only used by
+            MagmaSat. Equilibrations answered from the MELTS cache are not
+            counted.
+
+        timeout: float
+            OPTIONAL: Default is None. Only used by MagmaSat. If a number is
+            passed, each sample is allowed that many seconds of wall time.
+            Samples are then calculated in worker processes (n_workers of
+            them, or one), and a worker whose sample runs over is stopped and
+            replaced. Samples that time out are given NaN, with the reason in
+            the Warnings column. Cannot be used with executor.
+
+        max_equilibrations: int
+            OPTIONAL: Default is None. Only used by MagmaSat. If an int is
+            passed, the calculation of a sample is stopped once it has made
+            more than that many MELTS equilibrations. Such samples are given
+            NaN, with the reason in the Warnings column.
+
+        checkpoint: str
+            OPTIONAL: Default is None. Only used by MagmaSat. Path to a
+            checkpoint file, which is created if it does not exist. The
+            result of each sample is stored in it as soon as it has been
+            calculated, so that a calculation that is interrupted can be
+            resumed by running it again with the same checkpoint file.
+            Samples whose results are in the file, from the same calculation
+            with the same arguments, are not calculated again. Samples whose
+            calculation failed are.
+
+        warm_start: bool
+            OPTIONAL: Default is False. Only used by MagmaSat. If True,
+            samples are calculated in nearest-neighbour order of their
+            composition (wt% oxides, including volatiles), temperature,
+            pressure, and X_fluid, and the dissolved H2O of the last sample
+            calculated in the same process is passed as H2O_guess (unless
+            H2O_guess is passed), so that the search for a fluid-saturated
+            system starts close to saturation. Results are returned in the
+            original sample order. They may differ slightly from those of a
+            cold start, since the fluid-saturated system found, and so the
+            mass of fluid, differs.
+
         Returns
         -------
         pandas DataFrame
@@ -227,65 +291,34 @@ class BatchFile(batchfile.BatchFile):
             XH2Ovals = []
             XCO2vals = []
             FluidProportionvals = []
-            iterno = 0
+            skipped = {}
+            results = {}
+            calc_args = []
             for index, row in dissolved_data.iterrows():
-                iterno += 1
-                if print_status:
-                    percent = iterno/len(dissolved_data.index)
-                    batchfile.status_bar.status_bar(percent, index)
-
                 if file_has_temp:
                     temperature = row[temp_name]
+                if file_has_press:
+                    pressure = row[press_name]
+                if file_has_X:
+                    X_fluid = row[X_name]
+
                 if temperature <= 0:
-                    H2Ovals.append(np.nan)
-                    CO2vals.append(np.nan)
-                    XH2Ovals.append(np.nan)
-                    XCO2vals.append(np.nan)
-                    FluidProportionvals.append(np.nan)
-                    warnings.append("Sample skipped. Bad temperature.")
-                    errors.append(sys.exc_info()[0])
+                    skipped[index] = "Sample skipped. Bad temperature."
                     w.warn("Temperature for sample " + str(index) +
                            " is <=0. Skipping sample.", stacklevel=2)
-
-                if file_has_press:
-                    pressure = row[press_name]
-                if temperature > 0 and pressure <= 0:
-                    H2Ovals.append(np.nan)
-                    CO2vals.append(np.nan)
-                    XH2Ovals.append(np.nan)
-                    XCO2vals.append(np.nan)
-                    FluidProportionvals.append(np.nan)
-                    warnings.append("Sample skipped. Bad pressure.")
-                    errors.append(sys.exc_info()[0])
+                elif pressure <= 0:
+                    skipped[index] = "Sample skipped. Bad pressure."
                     w.warn("Pressure for sample " + str(index) +
                            " is <=0. Skipping sample.", stacklevel=2)
-
-                if file_has_X:
-                    X_fluid = row[X_name]
-                if temperature > 0 and pressure > 0 and X_fluid < 0:
-                    H2Ovals.append(np.nan)
-                    CO2vals.append(np.nan)
-                    XH2Ovals.append(np.nan)
-                    XCO2vals.append(np.nan)
-                    FluidProportionvals.append(np.nan)
-                    warnings.append("Sample skipped. Bad X_fluid.")
-                    errors.append(sys.exc_info()[0])
+                elif X_fluid < 0:
+                    skipped[index] = "Sample skipped. Bad X_fluid."
                     w.warn("X_fluid for sample " + str(index) +
                            " is <0. Skipping sample.", stacklevel=2)
-
-                if temperature > 0 and pressure > 0 and X_fluid > 1:
-                    H2Ovals.append(np.nan)
-                    CO2vals.append(np.nan)
-                    XH2Ovals.append(np.nan)
-                    XCO2vals.append(np.nan)
-                    FluidProportionvals.append(np.nan)
-                    warnings.append("Sample skipped. Bad X_fluid.")
-                    errors.append(sys.exc_info()[0])
+                elif X_fluid > 1:
+                    skipped[index] = "Sample skipped. Bad X_fluid."
                     w.warn("X_fluid for sample " + str(index) +
                            " is >1. Skipping sample.", stacklevel=2)
-
-                if (temperature > 0 and pressure > 0 and
-                   X_fluid >= 0 and X_fluid <= 1):
+                else:
                     try:
                         # Get sample comp as Sample class with defaults
                         bulk_comp = self.get_sample_composition(
@@ -296,27 +329,54 @@ class BatchFile(batchfile.BatchFile):
                         bulk_comp.set_default_units(self.default_units)
                         bulk_comp.set_default_normalization(
                                                     self.default_normalization)
-                        calc = calculate_classes.calculate_dissolved_volatiles(
-                                           sample=bulk_comp, pressure=pressure,
-                                           temperature=temperature,
-                                           X_fluid=X_fluid, model=model,
-                                           silence_warnings=True, verbose=True)
-                        H2Ovals.append(calc.result['H2O_liq'])
-                        CO2vals.append(calc.result['CO2_liq'])
-                        XH2Ovals.append(calc.result['XH2O_fl'])
-                        XCO2vals.append(calc.result['XCO2_fl'])
-                        FluidProportionvals.append(
-                                             calc.result['FluidProportion_wt'])
-                        warnings.append(calc.calib_check)
-                        errors.append('')
-                    except Exception:
-                        H2Ovals.append(np.nan)
-                        CO2vals.append(np.nan)
-                        XH2Ovals.append(np.nan)
-                        XCO2vals.append(np.nan)
-                        FluidProportionvals.append(np.nan)
-                        warnings.append('Calculation Failed.')
-                        errors.append(sys.exc_info()[0])
+                        calc_args.append((index, (bulk_comp, temperature,
+                                                  pressure, X_fluid, kwargs,
+                                                  warm_start)))
+                    except Exception as e:
+                        results[index] = e
+
+            if warm_start:
+                calc_args = _nearest_neighbour_order(calc_args, 3)
+                _warm_start.clear()
+
+            call_stats = {} if record_melts_calls else None
+            results.update(self._run_calculations(
+                                        _dissolved_volatiles_MagmaSat,
+                                        calc_args, n_workers=n_workers,
+                                        executor=executor,
+                                        print_status=print_status,
+                                        call_stats=call_stats,
+                                        timeout=timeout,
+                                        max_equilibrations=max_equilibrations,
+                                        checkpoint=checkpoint))
+
+            for index in dissolved_data.index:
+                if index in skipped:
+                    H2Ovals.append(np.nan)
+                    CO2vals.append(np.nan)
+                    XH2Ovals.append(np.nan)
+                    XCO2vals.append(np.nan)
+                    FluidProportionvals.append(np.nan)
+                    warnings.append(skipped[index])
+                    errors.append(None)
+                elif isinstance(results[index], Exception):
+                    H2Ovals.append(np.nan)
+                    CO2vals.append(np.nan)
+                    XH2Ovals.append(np.nan)
+                    XCO2vals.append(np.nan)
+                    FluidProportionvals.append(np.nan)
+                    warnings.append(self._failure_warning(
+                                    results[index], 'Calculation Failed.'))
+                    errors.append(type(results[index]))
+                else:
+                    (result, calib_check) = results[index]
+                    H2Ovals.append(result['H2O_liq'])
+                    CO2vals.append(result['CO2_liq'])
+                    XH2Ovals.append(result['XH2O_fl'])
+                    XCO2vals.append(result['XCO2_fl'])
+                    FluidProportionvals.append(result['FluidProportion_wt'])
+                    warnings.append(calib_check)
+                    errors.append('')
             dissolved_data["H2O_liq_VESIcal"] = H2Ovals
             dissolved_data["CO2_liq_VESIcal"] = CO2vals
 
@@ -330,6 +390,8 @@ class BatchFile(batchfile.BatchFile):
             dissolved_data["Warnings"] = warnings
             if record_errors:
                 dissolved_data["Errors"] = errors
+            if record_melts_calls:
+                self._add_melts_call_columns(dissolved_data, call_stats)
 
             return dissolved_data
 
@@ -394,7 +456,10 @@ class BatchFile(batchfile.BatchFile):
 
     def calculate_equilibrium_fluid_comp(self, temperature, pressure=None,
                                          print_status=False, model='MagmaSat',
-                                         **kwargs):
+                                         n_workers=None, executor=None,
+                                         record_melts_calls=False,
+                                         timeout=None, max_equilibrations=None,
+                                         checkpoint=None, **kwargs):
         """
         Returns H2O and CO2 concentrations in wt% or mole fraction in a fluid
         in equilibrium with the given sample(s) at the given P/T condition.
@@ -423,6 +488,53 @@ class BatchFile(batchfile.BatchFile):
             OPTIONAL: Default is 'MagmaSat'. Any other model name can be
             passed here.
 
+        n_workers: int
+            OPTIONAL: Default is None, in which case samples are calculated
+            one after another in this process. Only used by MagmaSat. If an
+            int greater than 1 is passed, samples are calculated in that many
+            worker processes, each with its own MELTS instance. Results are
+            returned in the original sample order. Scripts using this option
+            must run the calculation under `if __name__ == '__main__':`.
+
+        executor: concurrent.futures.Executor
+            OPTIONAL: Default is None. An existing executor (e.g., a
+            ProcessPoolExecutor) in which to run MagmaSat calculations, in
+            place of the one created with n_workers. It is not shut down
+            after the calculation.
+
+        record_melts_calls: bool
+            OPTIONAL: Default is False. If True, the number of calls to
+            MELTS made for each sample, and the wall time spent in them, are
+            recorded and returned as columns '<method>_calls_VESIcal' and
+            '<method>_seconds_VESIcal' for each of equilibrate_tp,
+            get_mass_of_phase, and get_composition_of_phase. Only used by
+            MagmaSat. Equilibrations answered from the MELTS cache are not
+            counted.
+
+        timeout: float
+            OPTIONAL: Default is None. Only used by MagmaSat. If a number is
+            passed, each sample is allowed that many seconds of wall time.
+            Samples are then calculated in worker processes (n_workers of
+            them, or one), and a worker whose sample runs over is stopped and
+            replaced. Samples that time out are given NaN, with the reason in
+            the Warnings column. Cannot be used with executor.
+
+        max_equilibrations: int
+            OPTIONAL: Default is None. Only used by MagmaSat. If an int is
+            passed, the calculation of a sample is stopped once it has made
+            more than that many MELTS equilibrations. Such samples are given
+            NaN, with the reason in the Warnings column.
+
+        checkpoint: str
+            OPTIONAL: Default is None. Only used by MagmaSat. Path to a
+            checkpoint file, which is created if it does not exist. The
+            result of each sample is stored in it as soon as it has been
+            calculated, so that a calculation that is interrupted can be
+            resumed by running it again with the same checkpoint file.
+            Samples whose results are in the file, from the same calculation
+            with the same arguments, are not calculated again. Samples whose
+            calculation failed are.
+
         Returns
         -------
         pandas DataFrame
@@ -500,33 +612,25 @@ class BatchFile(batchfile.BatchFile):
 
             return fluid_data
         elif model == 'MagmaSat':
-            iterno = 0
+            skipped = {}
+            results = {}
+            calc_args = []
             for index, row in fluid_data.iterrows():
-                iterno += 1
-                if print_status:
-                    percent = iterno/len(fluid_data.index)
-                    batchfile.status_bar.status_bar(percent, index)
-
                 if file_has_temp:
                     temperature = row[temp_name]
+                if file_has_press:
+                    pressure = row[press_name]
+
                 if temperature <= 0:
-                    H2Ovals.append(np.nan)
-                    CO2vals.append(np.nan)
-                    warnings.append("Calculation skipped. Bad temperature.")
+                    skipped[index] = "Calculation skipped. Bad temperature."
                     w.warn("Temperature for sample " + str(index) +
                            " is <=0. Skipping sample.",
                            stacklevel=2)
-
-                if file_has_press:
-                    pressure = row[press_name]
-                if temperature > 0 and pressure <= 0:
-                    H2Ovals.append(np.nan)
-                    CO2vals.append(np.nan)
-                    warnings.append("Calculation skipped. Bad pressure.")
+                elif pressure is not None and pressure <= 0:
+                    skipped[index] = "Calculation skipped. Bad pressure."
                     w.warn("Pressure for sample " + str(index) +
                            " is <=0. Skipping sample.", stacklevel=2)
-
-                if temperature > 0 and pressure > 0:
+                else:
                     try:
                         # Get sample comp as Sample class with defaults
                         bulk_comp = self.get_sample_composition(
@@ -536,24 +640,41 @@ class BatchFile(batchfile.BatchFile):
                         bulk_comp.set_default_units(self.default_units)
                         bulk_comp.set_default_normalization(
                                                     self.default_normalization)
-
-                        calc = (
-                            calculate_classes.calculate_equilibrium_fluid_comp(
-                                           sample=bulk_comp, pressure=pressure,
-                                           temperature=temperature,
-                                           model=model, silence_warnings=True))
-
-                        H2Ovals.append(calc.result['H2O'])
-                        CO2vals.append(calc.result['CO2'])
-                        if calc.result['H2O'] == 0 and calc.result['CO2'] == 0:
-                            warnings.append(calc.calib_check + "Sample not " +
-                                            "saturated at these conditions")
-                        else:
-                            warnings.append(calc.calib_check)
-                    except Exception:
-                        H2Ovals.append(np.nan)
-                        CO2vals.append(np.nan)
-                        warnings.append("Calculation Failed.")
+                        calc_args.append((index, (bulk_comp, temperature,
+                                                  pressure, kwargs)))
+                    except Exception as e:
+                        results[index] = e
+
+            call_stats = {} if record_melts_calls else None
+            results.update(self._run_calculations(
+                                        _equilibrium_fluid_comp_MagmaSat,
+                                        calc_args, n_workers=n_workers,
+                                        executor=executor,
+                                        print_status=print_status,
+                                        call_stats=call_stats,
+                                        timeout=timeout,
+                                        max_equilibrations=max_equilibrations,
+                                        checkpoint=checkpoint))
+
+            for index in fluid_data.index:
+                if index in skipped:
+                    H2Ovals.append(np.nan)
+                    CO2vals.append(np.nan)
+                    warnings.append(skipped[index])
+                elif isinstance(results[index], Exception):
+                    H2Ovals.append(np.nan)
+                    CO2vals.append(np.nan)
+                    warnings.append(self._failure_warning(
+                                    results[index], "Calculation Failed."))
+                else:
+                    (result, calib_check) = results[index]
+                    H2Ovals.append(result['H2O'])
+                    CO2vals.append(result['CO2'])
+                    if result['H2O'] == 0 and result['CO2'] == 0:
+                        warnings.append(calib_check + "Sample not " +
+                                        "saturated at these conditions")
+                    else:
+                        warnings.append(calib_check)
 
             fluid_data["XH2O_fl_VESIcal"] = H2Ovals
             fluid_data["XCO2_fl_VESIcal"] = CO2vals
@@ -563,6 +684,8 @@ class BatchFile(batchfile.BatchFile):
                 fluid_data["Pressure_bars_VESIcal"] = pressure
             fluid_data["Model"] = model
             fluid_data["Warnings"] = warnings
+            if record_melts_calls:
+                self._add_melts_call_columns(fluid_data, call_stats)
 
             return fluid_data
 
@@ -603,7 +726,11 @@ class BatchFile(batchfile.BatchFile):
             return fluid_data
 
     def calculate_saturation_pressure(self, temperature, print_status=None,
-                                      model='MagmaSat', **kwargs):
+                                      model='MagmaSat', n_workers=None,
+                                      executor=None, record_melts_calls=False,
+                                      timeout=None, max_equilibrations=None,
+                                      checkpoint=None, warm_start=False,
+                                      **kwargs):
         """
         Calculates the saturation pressure of multiple sample compositions in
         the BatchFile.
@@ -630,6 +757,63 @@ class BatchFile(batchfile.BatchFile):
             OPTIONAL: Default is 'MagmaSat'. Any other model name can be
             passed here.
 
+        n_workers: int
+            OPTIONAL: Default is None, in which case samples are calculated
+            one after another in this process. Only used by MagmaSat. If an
+            int greater than 1 is passed, samples are calculated in that many
+            worker processes, each with its own MELTS instance. Results are
+            returned in the original sample order. Scripts using this option
+            must run the calculation under `if __name__ == '__main__':`.
+
+        executor: concurrent.futures.Executor
+            OPTIONAL: Default is None. An existing executor (e.g., a
+            ProcessPoolExecutor) in which to run MagmaSat calculations, in
+            place of the one created with n_workers. It is not shut down
+            after the calculation.
+
+        record_melts_calls: bool
+            OPTIONAL: Default is False. If True, the number of calls to
+            MELTS made for each sample, and the wall time spent in them, are
+            recorded and returned as columns '<method>_calls_VESIcal' and
+            '<method>_seconds_VESIcal' for each of equilibrate_tp,
+            get_mass_of_phase, and get_composition_of_phase. Only used by
+            MagmaSat. Equilibrations answered from the MELTS cache are not
+            counted.
+
+        timeout: float
+            OPTIONAL: Default is None. Only used by MagmaSat. If a number is
+            passed, each sample is allowed that many seconds of wall time.
+            Samples are then calculated in worker processes (n_workers of
+            them, or one), and a worker whose sample runs over is stopped and
+            replaced. Samples that time out are given NaN, with the reason in
+            the Warnings column. Cannot be used with executor.
+
+        max_equilibrations: int
+            OPTIONAL: Default is None. Only used by MagmaSat. If an int is
+            passed, the calculation of a sample is stopped once it has made
+            more than that many MELTS equilibrations. Such samples are given
+            NaN, with the reason in the Warnings column.
+
+        checkpoint: str
+            OPTIONAL: Default is None. Only used by MagmaSat. Path to a
+            checkpoint file, which is created if it does not exist. The
+            result of each sample is stored in it as soon as it has been
+            calculated, so that a calculation that is interrupted can be
+            resumed by running it again with the same checkpoint file.
+            Samples whose results are in the file, from the same calculation
+            with the same arguments, are not calculated again. Samples whose
+            calculation failed are.
+
+        warm_start: bool
+            OPTIONAL: Default is False. Only used by MagmaSat. If True,
+            samples are calculated in nearest-neighbour order of their
+            composition (wt% oxides, including volatiles) and temperature,
+            and each search starts from the saturation pressure of the last
+            sample calculated in the same process, passed as initial_guess
+            (unless initial_guess is passed). Results are returned in the
+            original sample order, and may differ from those of a cold start
+            by up to the pressure_tolerance of the search.
+
         Returns
         -------
         pandas DataFrame object
@@ -708,26 +892,18 @@ class BatchFile(batchfile.BatchFile):
             flCO2 = []
             flsystem_wtper = []
             warnings = []
-            iterno = 0
+            skipped = {}
+            results = {}
+            calc_args = []
             for index, row in satp_data.iterrows():
-                iterno += 1
-                if print_status:
-                    percent = iterno/len(satp_data.index)
-                    batchfile.status_bar.status_bar(percent, index)
-
                 if file_has_temp:
                     temperature = row[temp_name]
+
                 if temperature <= 0:
-                    satP.append(np.nan)
-                    flmass.append(np.nan)
-                    flsystem_wtper.append(np.nan)
-                    flH2O.append(np.nan)
-                    flCO2.append(np.nan)
-                    warnings.append("Calculation skipped. Bad temperature.")
+                    skipped[index] = "Calculation skipped. Bad temperature."
                     w.warn("Temperature for sample " + str(index) +
                            " is <=0. Skipping sample.", stacklevel=2)
-
-                if temperature > 0:
+                else:
                     try:
                         # Get sample comp as Sample class with defaults
                         bulk_comp = self.get_sample_composition(
@@ -737,25 +913,46 @@ class BatchFile(batchfile.BatchFile):
                         bulk_comp.set_default_units(self.default_units)
                         bulk_comp.set_default_normalization(
                                                     self.default_normalization)
-
-                        calc = calculate_classes.calculate_saturation_pressure(
-                                     sample=bulk_comp, temperature=temperature,
-                                     model=model, verbose=True,
-                                     silence_warnings=True)
-                        satP.append(calc.result["SaturationP_bars"])
-                        flmass.append(calc.result["FluidMass_grams"])
-                        flsystem_wtper.append(
-                                             calc.result["FluidProportion_wt"])
-                        flH2O.append(calc.result["XH2O_fl"])
-                        flCO2.append(calc.result["XCO2_fl"])
-                        warnings.append(calc.calib_check)
-                    except Exception:
-                        satP.append(np.nan)
-                        flmass.append(np.nan)
-                        flsystem_wtper.append(np.nan)
-                        flH2O.append(np.nan)
-                        flCO2.append(np.nan)
-                        warnings.append("Calculation Failed")
+                        calc_args.append((index, (bulk_comp, temperature,
+                                                  kwargs, warm_start)))
+                    except Exception as e:
+                        results[index] = e
+
+            if warm_start:
+                calc_args = _nearest_neighbour_order(calc_args, 1)
+                _warm_start.clear()
+
+            call_stats = {} if record_melts_calls else None
+            results.update(self._run_calculations(
+                                        _saturation_pressure_MagmaSat,
+                                        calc_args, n_workers=n_workers,
+                                        executor=executor,
+                                        print_status=print_status,
+                                        call_stats=call_stats,
+                                        timeout=timeout,
+                                        max_equilibrations=max_equilibrations,
+                                        checkpoint=checkpoint))
+
+            for index in satp_data.index:
+                if index in skipped or isinstance(results[index], Exception):
+                    satP.append(np.nan)
+                    flmass.append(np.nan)
+                    flsystem_wtper.append(np.nan)
+                    flH2O.append(np.nan)
+                    flCO2.append(np.nan)
+                    if index in skipped:
+                        warnings.append(skipped[index])
+                    else:
+                        warnings.append(self._failure_warning(
+                                        results[index], "Calculation Failed"))
+                else:
+                    (result, calib_check) = results[index]
+                    satP.append(result["SaturationP_bars"])
+                    flmass.append(result["FluidMass_grams"])
+                    flsystem_wtper.append(result["FluidProportion_wt"])
+                    flH2O.append(result["XH2O_fl"])
+                    flCO2.append(result["XCO2_fl"])
+                    warnings.append(calib_check)
 
             satp_data["SaturationP_bars_VESIcal"] = satP
             if file_has_temp is False:
@@ -766,9 +963,550 @@ class BatchFile(batchfile.BatchFile):
             satp_data["FluidSystem_wt_VESIcal"] = flsystem_wtper
             satp_data["Model"] = model
             satp_data["Warnings"] = warnings
+            if record_melts_calls:
+                self._add_melts_call_columns(satp_data, call_stats)
 
             return satp_data
 
+    def calculate_degassing_path(self, temperature, pressure='saturation',
+                                 fractionate_vapor=0.0, print_status=None,
+                                 model='MagmaSat', n_workers=None,
+                                 executor=None, record_melts_calls=False,
+                                 timeout=None, max_equilibrations=None,
+                                 checkpoint=None, **kwargs):
+        """
+        Calculates degassing paths for all samples in the BatchFile.
+
+        Parameters
+        ----------
+        temperature: float, int, or str
+            Temperature at which to calculate degassing paths, in degrees C.
+            Can be passed as float or int, in which case the passed value is
+            used as the temperature for all samples. Alternatively,
+            temperature information for each individual sample may already be
+            present in the passed BatchFile object. If so, pass the str value
+            corresponding to the column title in the passed BatchFile object.
+
+        pressure: str, float, or int
+            OPTIONAL: Default is 'saturation', in which case each path begins
+            at the saturation pressure of the sample. If a float or int is
+            passed, it is used as the starting pressure, in bars, for all
+            samples. Alternatively, starting pressures for each individual
+            sample may already be present in the passed BatchFile object. If
+            so, pass the str value corresponding to the column title in the
+            passed BatchFile object.
+
+        fractionate_vapor: float
+            OPTIONAL: Default is 0.0 (closed-system degassing). Proportion of
+            vapor removed at each pressure step. A value of 1.0 corresponds to
+            open-system degassing.
+
+        print_status: bool
+            OPTIONAL: The default value for MagmaSat is True and the default
+            for all other models is False. If set to True, the progress of the
+            calculation will be printed to the terminal.
+
+        model: string
+            OPTIONAL: Default is 'MagmaSat'. Any other model name can be
+            passed here.
+
+        n_workers: int
+            OPTIONAL: Default is None, in which case samples are calculated
+            one after another in this process. If an int greater than 1 is
+            passed, samples are calculated in that many worker processes, each
+            with its own MELTS instance. Scripts using this option must run
+            the calculation under `if __name__ == '__main__':`.
+
+        executor: concurrent.futures.Executor
+            OPTIONAL: Default is None. An existing executor (e.g., a
+            ProcessPoolExecutor) in which to run the calculations, in place of
+            the one created with n_workers. It is not shut down after the
+            calculation.
+
+        record_melts_calls: bool
+            OPTIONAL: Default is False. If True, the number of calls to
+            MELTS made for each sample, and the wall time spent in them, are
+            recorded and returned as columns '<method>_calls_VESIcal' and
+            '<method>_seconds_VESIcal' for each of equilibrate_tp,
+            get_mass_of_phase, and get_composition_of_phase. Only nonzero for
+            MagmaSat. Equilibrations answered from the MELTS cache are not
+            counted. Values are the totals for each sample, repeated on each
+            row of its path.
+
+        timeout: float
+            OPTIONAL: Default is None. If a number is passed, each sample is
+            allowed that many seconds of wall time. Samples are then
+            calculated in worker processes (n_workers of them, or one), and a
+            worker whose sample runs over is stopped and replaced. Samples
+            that time out are left out, with a warning. Cannot be used with
+            executor.
+
+        max_equilibrations: int
+            OPTIONAL: Default is None. Only used by MagmaSat. If an int is
+            passed, the calculation of a sample is stopped once it has made
+            more than that many MELTS equilibrations. Such samples are left
+            out, with a warning.
+
+        checkpoint: str
+            OPTIONAL: Default is None. Path to a checkpoint file, which is
+            created if it does not exist. The path of each sample is stored in
+            it as soon as it has been calculated, so that a calculation that
+            is interrupted can be resumed by running it again with the same
+            checkpoint file. Samples whose paths are in the file, from the
+            same calculation with the same arguments, are not calculated
+            again. Samples whose calculation failed are.
+
+        Any other keyword arguments (e.g., steps, init_vapor, final_pressure)
+        are passed to the model's calculate_degassing_path method.
+
+        Returns
+        -------
+        pandas DataFrame object
+            The degassing paths of all samples, one after another, in the
+            original sample order. The DataFrame is indexed by sample name, so
+            that the path of a single sample can be retrieved with
+            .loc[sample_name]. Columns are those returned by the model's
+            calculate_degassing_path method, plus the temperature (if it was
+            not passed as a column name) and the model name. Samples for which
+            the calculation was skipped or failed are left out, with a
+            warning.
+        """
+        data = self.get_data()
+
+        if hasattr(model, 'model_type') is True:
+            model = model.model_type
+
+        if print_status is None:
+            if model == 'MagmaSat':
+                print_status = True
+            else:
+                print_status = False
+
+        if isinstance(temperature, str):
+            file_has_temp = True
+            temp_name = temperature
+        elif isinstance(temperature, float) or isinstance(temperature, int):
+            file_has_temp = False
+        else:
+            raise core.InputError("temperature must be type str or float or "
+                                  "int")
+
+        if isinstance(pressure, str) and pressure != 'saturation':
+            file_has_press = True
+            press_name = pressure
+        elif (pressure == 'saturation' or isinstance(pressure, float) or
+              isinstance(pressure, int)):
+            file_has_press = False
+        else:
+            raise core.InputError("pressure must be 'saturation' or type str "
+                                  "or float or int")
+
+        calc_args = []
+        for index, row in data.iterrows():
+            if file_has_temp:
+                temperature = row[temp_name]
+            if file_has_press:
+                pressure = row[press_name]
+
+            if temperature <= 0:
+                w.warn("Temperature for sample " + str(index) +
+                       " is <=0. Skipping sample.", stacklevel=2)
+            elif pressure != 'saturation' and pressure <= 0:
+                w.warn("Pressure for sample " + str(index) +
+                       " is <=0. Skipping sample.", stacklevel=2)
+            else:
+                # Get sample comp as Sample class with defaults
+                bulk_comp = self.get_sample_composition(
+                                      index,
+                                      normalization=self.default_normalization,
+                                      units='wtpt_oxides', asSampleClass=True)
+                bulk_comp.set_default_units(self.default_units)
+                bulk_comp.set_default_normalization(self.default_normalization)
+                calc_args.append((index, (bulk_comp, temperature, pressure,
+                                          fractionate_vapor, model, kwargs)))
+
+        call_stats = {} if record_melts_calls else None
+        results = self._run_calculations(_degassing_path, calc_args,
+                                         n_workers=n_workers,
+                                         executor=executor,
+                                         print_status=print_status,
+                                         call_stats=call_stats,
+                                         timeout=timeout,
+                                         max_equilibrations=max_equilibrations,
+                                         checkpoint=checkpoint)
+
+        paths = []
+        for index, args in calc_args:
+            if isinstance(results[index], Exception):
+                warning = ("Degassing path calculation failed for sample " +
+                           str(index) + ".")
+                if isinstance(results[index], core.BudgetExceededError):
+                    warning += " " + results[index].message
+                w.warn(warning, RuntimeWarning, stacklevel=2)
+                continue
+            path = results[index].copy()
+            path.index = pd.Index([index]*len(path), name=data.index.name)
+            if file_has_temp is False:
+                path["Temperature_C_VESIcal"] = temperature
+            path["Model"] = model
+            if record_melts_calls:
+                self._add_melts_call_columns(path, call_stats)
+            paths.append(path)
+
+        if len(paths) == 0:
+            return pd.DataFrame()
+        return pd.concat(paths)
+
+    def _run_calculations(self, calculation, calc_args, n_workers=None,
+                          executor=None, print_status=False, call_stats=None,
+                          timeout=None, max_equilibrations=None,
+                          checkpoint=None):
+        """
+        Runs a calculation on each sample, either one after another in this
+        process or in a pool of worker processes. Each worker process imports
+        VESIcal and so holds its own MELTS instance, with all phases other
+        than Fluid and Liquid suppressed.
+
+        Parameters
+        ----------
+        calculation: function
+            A module-level function, called as calculation(*args) for each
+            sample, which returns the calculation result.
+
+        calc_args: list
+            List of (index, args) tuples, one for each sample to calculate.
+
+        n_workers: int
+            OPTIONAL: Default is None. Number of worker processes. If None or
+            1, and no executor is passed, samples are calculated in this
+            process.
+
+        executor: concurrent.futures.Executor
+            OPTIONAL: Default is None. An existing executor in which to run
+            the calculations. It is not shut down afterwards.
+
+        print_status: bool
+            OPTIONAL: Default is False. If True, a status bar is printed.
+
+        call_stats: dict
+            OPTIONAL: Default is None. If a dict is passed, calls to MELTS are
+            recorded for each sample, and their statistics (see
+            melts_stats.MELTSCallStats.as_dict) are added to it, keyed by
+            sample index.
+
+        timeout: float
+            OPTIONAL: Default is None. Wall time allowed for each sample, in
+            seconds. If passed, samples are calculated in worker processes
+            that are stopped if they run over (see _run_with_timeout).
+
+        max_equilibrations: int
+            OPTIONAL: Default is None. Number of MELTS equilibrations allowed
+            for each sample.
+
+        checkpoint: str
+            OPTIONAL: Default is None. Path to a checkpoint file (see
+            checkpoint.Checkpoint). Samples with results stored in it from
+            the same calculation with the same arguments are not calculated
+            again, and the result of each sample calculated is stored in it
+            as soon as it is made.
+
+        Returns
+        -------
+        dict
+            The result of each calculation, or the Exception it raised, keyed
+            by sample index. Calculations that ran over their budget are given
+            a core.BudgetExceededError. Samples with the same arguments are
+            only calculated once, and share the result. If call_stats is
+            passed, the copies are recorded as making no calls to MELTS.
+        """
+        if timeout is not None:
+            if executor is not None:
+                raise core.InputError("timeout cannot be used with executor, "
+                                      "since the calculations of an executor "
+                                      "cannot be stopped.")
+            if timeout <= 0:
+                raise core.InputError("timeout must be greater than 0.")
+        if max_equilibrations is not None:
+            if max_equilibrations < 1:
+                raise core.InputError("max_equilibrations must be at least "
+                                      "1.")
+            calculation = functools.partial(melts_stats.call_budgeted,
+                                            max_equilibrations, calculation)
+        if call_stats is not None:
+            calculation = functools.partial(melts_stats.call_recorded,
+                                            calculation)
+
+        results = {}
+        store = None
+        if checkpoint is not None:
+            store = Checkpoint(checkpoint)
+
+        # Samples with the same calculation and arguments (e.g., repeated
+        # analyses) are calculated once, and the result is copied to the
+        # others. inputs_keys hashes each sample's normalized composition and
+        # calculation parameters, and copies lists the samples that share the
+        # result of each sample calculated.
+        inputs_keys = {}
+        first = {}
+        copies = collections.defaultdict(list)
+        remaining = []
+        for index, args in calc_args:
+            key = Checkpoint.get_inputs_key(calculation, args)
+            inputs_keys[index] = key
+            if key is not None and key in first:
+                copies[first[key]].append(index)
+                continue
+            if key is not None:
+                first[key] = index
+            if store is not None:
+                (found, result) = store.get(index, key)
+                if found:
+                    results[index] = result
+                    continue
+            remaining.append((index, args))
+        calc_args = remaining
+
+        def store_result(index, result):
+            results[index] = result
+            if store is not None and not isinstance(result, Exception):
+                store.add(index, inputs_keys[index], result)
+
+        def copy_result(index, result):
+            if call_stats is not None and not isinstance(result, Exception):
+                # copies made no calls to MELTS of their own
+                result = (result[0], melts_stats.MELTSCallStats().as_dict())
+            for copy in copies[index]:
+                store_result(copy, result)
+
+        def completed(index, result):
+            store_result(index, result)
+            copy_result(index, result)
+
+        for index in list(results):
+            copy_result(index, results[index])
+
+        try:
+            if timeout is not None:
+                self._run_with_timeout(calculation, calc_args, timeout,
+                                       completed, n_workers=n_workers,
+                                       print_status=print_status)
+            elif executor is None and (n_workers is None or n_workers <= 1):
+                for iterno, (index, args) in enumerate(calc_args):
+                    if print_status:
+                        percent = (iterno + 1)/len(calc_args)
+                        batchfile.status_bar.status_bar(percent, index)
+                    try:
+                        result = calculation(*args)
+                    except Exception as e:
+                        result = e
+                    completed(index, result)
+            else:
+                self._run_in_executor(calculation, calc_args, completed,
+                                      n_workers=n_workers, executor=executor,
+                                      print_status=print_status)
+        finally:
+            if store is not None:
+                store.close()
+
+        return self._split_call_stats(results, call_stats)
+
+    def _run_in_executor(self, calculation, calc_args, completed,
+                         n_workers=None, executor=None, print_status=False):
+        """
+        Runs a calculation on each sample in a pool of worker processes,
+        calling completed(index, result) with the result of each sample, or
+        the Exception it raised, in the original sample order.
+        """
+        # MELTS is not fork-safe, so worker processes are spawned fresh
+        if executor is None:
+            pool = ProcessPoolExecutor(
+                             max_workers=n_workers,
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=magmasat._initialize_worker,
+                             initargs=(magmasat.get_engine(),))
+        else:
+            pool = executor
+        try:
+            futures = [(index, pool.submit(calculation, *args)) for
+                       index, args in calc_args]
+            for iterno, (index, future) in enumerate(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+                completed(index, result)
+                if print_status:
+                    percent = (iterno + 1)/len(futures)
+                    batchfile.status_bar.status_bar(percent, index)
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+    def _run_with_timeout(self, calculation, calc_args, timeout, completed,
+                          n_workers=None, print_status=False):
+        """
+        Runs a calculation on each sample in worker processes, giving each
+        sample at most timeout seconds of wall time. A worker whose sample
+        runs over is terminated, and replaced by a new worker if samples
+        remain. Each worker's clock starts once its MELTS instance has been
+        created, so that start-up time is not counted against a sample.
+
+        Parameters
+        ----------
+        calculation: function
+            A module-level function, called as calculation(*args) for each
+            sample, which returns the calculation result.
+
+        calc_args: list
+            List of (index, args) tuples, one for each sample to calculate.
+
+        timeout: float
+            Wall time allowed for each sample, in seconds.
+
+        completed: function
+            Called as completed(index, result) as each sample finishes, with
+            the result of its calculation or the Exception it raised. Samples
+            that time out are given a core.BudgetExceededError.
+
+        n_workers: int
+            OPTIONAL: Default is None, in which case one worker process is
+            used. Number of worker processes.
+
+        print_status: bool
+            OPTIONAL: Default is False. If True, a status bar is printed.
+        """
+        if len(calc_args) == 0:
+            return
+        if n_workers is None or n_workers < 1:
+            n_workers = 1
+        n_workers = min(n_workers, len(calc_args))
+
+        # MELTS is not fork-safe, so worker processes are spawned fresh
+        context = multiprocessing.get_context('spawn')
+        engine = magmasat.get_engine()
+        pending = collections.deque(calc_args)
+        n_done = 0
+        # Workers, keyed by the connection to them. index is the sample being
+        # calculated (None if idle) and deadline the time it must finish by.
+        workers = {}
+
+        def start_worker():
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=_timed_worker,
+                                      args=(worker_connection, engine),
+                                      daemon=True)
+            process.start()
+            worker_connection.close()
+            workers[connection] = {'process': process, 'ready': False,
+                                   'index': None, 'deadline': None}
+
+        def stop_worker(connection):
+            workers[connection]['process'].terminate()
+            workers[connection]['process'].join()
+            connection.close()
+            del workers[connection]
+
+        def record(index, result):
+            nonlocal n_done
+            completed(index, result)
+            n_done += 1
+            if print_status:
+                percent = n_done/len(calc_args)
+                batchfile.status_bar.status_bar(percent, index)
+
+        for i in range(n_workers):
+            start_worker()
+        try:
+            while n_done < len(calc_args):
+                now = time.monotonic()
+                for connection, worker in workers.items():
+                    if (worker['ready'] and worker['index'] is None and
+                            len(pending) > 0):
+                        (index, args) = pending.popleft()
+                        connection.send((calculation, args))
+                        worker['index'] = index
+                        worker['deadline'] = now + timeout
+
+                deadlines = [worker['deadline'] for worker in workers.values()
+                             if worker['index'] is not None]
+                if len(deadlines) > 0:
+                    wait_time = max(min(deadlines) - now, 0.0)
+                else:
+                    wait_time = None  # all workers are starting up
+                for connection in multiprocessing.connection.wait(
+                                            list(workers), timeout=wait_time):
+                    worker = workers[connection]
+                    try:
+                        message = connection.recv()
+                    except EOFError:
+                        # The worker process died, e.g., if MELTS crashed
+                        if worker['index'] is None:
+                            raise RuntimeError("A worker process failed to "
+                                               "start.")
+                        record(worker['index'],
+                               RuntimeError("The worker process calculating "
+                                            "this sample exited."))
+                        stop_worker(connection)
+                        if len(pending) > 0:
+                            start_worker()
+                        continue
+                    if worker['ready']:
+                        record(worker['index'], message)
+                        worker['index'] = None
+                        worker['deadline'] = None
+                    else:
+                        worker['ready'] = True
+
+                now = time.monotonic()
+                for connection, worker in list(workers.items()):
+                    if (worker['index'] is not None and
+                            now >= worker['deadline']):
+                        record(worker['index'], core.BudgetExceededError(
+                                    "Calculation timed out after " +
+                                    str(timeout) + " s."))
+                        stop_worker(connection)
+                        if len(pending) > 0:
+                            start_worker()
+        finally:
+            for connection in list(workers):
+                try:
+                    connection.send(None)
+                except Exception:
+                    pass
+                workers[connection]['process'].join(timeout=1.0)
+                stop_worker(connection)
+
+    def _failure_warning(self, error, message):
+        """An internally used function that returns the warning recorded for
+        a sample whose calculation raised error: the error's own message if it
+        ran over its budget, and message otherwise.
+        """
+        if isinstance(error, core.BudgetExceededError):
+            return error.message
+        return message
+
+    def _split_call_stats(self, results, call_stats):
+        """An internally used function to separate the results of calculations
+        run with melts_stats.call_recorded from their call statistics, which
+        are added to call_stats.
+        """
+        if call_stats is None:
+            return results
+        for index, result in results.items():
+            if not isinstance(result, Exception):
+                (results[index], call_stats[index]) = result
+        return results
+
+    def _add_melts_call_columns(self, data, call_stats):
+        """An internally used function to add columns of MELTS call statistics
+        to a DataFrame indexed by sample. Samples without statistics (e.g.,
+        because they were skipped or failed) are given NaN.
+        """
+        for name in melts_stats.MELTSCallStats().as_dict().keys():
+            data[name + "_VESIcal"] = [call_stats[index][name]
+                                       if index in call_stats else np.nan
+                                       for index in data.index]
+
 
 def BatchFile_from_DataFrame(dataframe, units='wtpt_oxides', label=None):
     """
@@ -784,3 +1522,220 @@ def BatchFile_from_DataFrame(dataframe, units='wtpt_oxides', label=None):
     """
     return BatchFile(filename=None, dataframe=dataframe, units=units,
                      label=label)
+
+
+def calculate_in_chunks(filename, output_filename, calculation,
+                        chunksize=10000, units='wtpt_oxides', label='Label',
+                        **kwargs):
+    """
+    Performs a batch calculation on a csv file too large to be held in memory.
+    The file is read in chunks of chunksize samples, each of which is
+    calculated as a BatchFile and its results appended to output_filename, so
+    that only one chunk is held in memory at a time. Duplicated sample names
+    are only renamed within a chunk. If a chunk returns columns that earlier
+    chunks did not, output_filename is rewritten, a chunk at a time, with the
+    new columns added and left empty for the samples already written.
+
+    Parameters
+    ----------
+    filename: str
+        Path to the csv file of samples.
+
+    output_filename: str
+        Path to the csv file that results are written to. Any existing file is
+        overwritten.
+
+    calculation: str
+        Name of the BatchFile method to run on each chunk. One of
+        'calculate_dissolved_volatiles', 'calculate_equilibrium_fluid_comp',
+        'calculate_saturation_pressure', or 'calculate_degassing_path'.
+        Degassing paths are written one row per step, indexed by sample
+        name, as returned by BatchFile.calculate_degassing_path.
+
+    chunksize: int
+        OPTIONAL. Default is 10000. Number of samples read and calculated at a
+        time.
+
+    units: str
+        OPTIONAL. Default is 'wtpt_oxides'. Units of the oxide compositions in
+        the file, as for BatchFile.
+
+    label: str
+        OPTIONAL. Default is 'Label'. Name of the column referring to sample
+        names, as for BatchFile.
+
+    kwargs:
+        Passed to the calculation, e.g., temperature, pressure, model. A
+        checkpoint file path passed as checkpoint= allows an interrupted run
+        to be resumed. Checkpoint rows are keyed by sample name, so samples
+        whose names are repeated in different chunks overwrite each other's
+        rows and are recalculated on resume.
+
+    Returns
+    -------
+    int
+        The number of rows written: one per sample, or one per step of each
+        degassing path.
+    """
+    if calculation not in ['calculate_dissolved_volatiles',
+                           'calculate_equilibrium_fluid_comp',
+                           'calculate_saturation_pressure',
+                           'calculate_degassing_path']:
+        raise core.InputError("calculation must be one of "
+                              "'calculate_dissolved_volatiles', "
+                              "'calculate_equilibrium_fluid_comp', "
+                              "'calculate_saturation_pressure', or "
+                              "'calculate_degassing_path'.")
+
+    n_samples = 0
+    columns = None
+    for chunk in pd.read_csv(filename, chunksize=chunksize):
+        batch = BatchFile(filename=None, dataframe=chunk, units=units,
+                          label=label)
+        results = getattr(batch, calculation)(**kwargs)
+
+        # Later chunks are written with the columns already in the header,
+        # which is first extended by any columns they add.
+        if columns is None:
+            columns = list(results.columns)
+            results.to_csv(output_filename, mode='w', index_label=label)
+        else:
+            new_columns = [col for col in results.columns
+                           if col not in columns]
+            if len(new_columns) > 0:
+                columns = columns + new_columns
+                _add_csv_columns(output_filename, columns, chunksize)
+            results.reindex(columns=columns).to_csv(output_filename,
+                                                    mode='a', header=False)
+        n_samples += len(results)
+
+    return n_samples
+
+
+def _add_csv_columns(filename, columns, chunksize):
+    """An internally used function to rewrite the csv file written by
+    calculate_in_chunks with the given columns, a chunk at a time, leaving
+    columns it did not have empty."""
+    temporary_filename = filename + '.tmp'
+    mode = 'w'
+    for chunk in pd.read_csv(filename, index_col=0, chunksize=chunksize):
+        chunk.reindex(columns=columns).to_csv(temporary_filename, mode=mode,
+                                              header=(mode == 'w'))
+        mode = 'a'
+    os.replace(temporary_filename, filename)
+
+
+# -------------- CALCULATION WORKERS ----------- #
+# Module-level functions so that they can be sent to worker processes.
+
+# Results of the last MagmaSat calculations made with warm_start in this
+# process, from which the next ones start. See
+# BatchFile.calculate_saturation_pressure and calculate_dissolved_volatiles.
+_warm_start = {}
+
+
+def _nearest_neighbour_order(calc_args, n_conditions):
+    """Returns calc_args in nearest-neighbour order, starting from the first
+    sample and moving each time to the most similar sample not yet visited.
+    Samples are compared on the wt% oxides of their Sample (args[0]) and on
+    the n_conditions arguments that follow it (e.g., temperature), each
+    divided by its standard deviation across the batch."""
+    if len(calc_args) < 3:
+        return list(calc_args)
+    features = np.array([list(args[0].get_composition(units='wtpt_oxides'
+                                                      ).reindex(core.oxides,
+                                                                fill_value=0.0))
+                         + [float(x) for x in args[1:1+n_conditions]]
+                         for index, args in calc_args])
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    features = features / scale
+
+    visited = np.zeros(len(features), dtype=bool)
+    order = [0]
+    visited[0] = True
+    for i in range(len(features) - 1):
+        distance = np.sum((features - features[order[-1]])**2, axis=1)
+        distance[visited] = np.inf
+        order.append(int(np.argmin(distance)))
+        visited[order[-1]] = True
+    return [calc_args[i] for i in order]
+
+
+def _timed_worker(connection, engine):
+    """Calculates samples sent through connection as (calculation, args)
+    tuples, sending back each result (or the Exception raised), until None is
+    sent. Run in the worker processes of BatchFile._run_with_timeout."""
+    magmasat._initialize_worker(engine)
+    connection.send(None)  # ready
+    while True:
+        task = connection.recv()
+        if task is None:
+            break
+        (calculation, args) = task
+        try:
+            result = calculation(*args)
+        except Exception as e:
+            result = e
+        try:
+            connection.send(result)
+        except Exception as e:
+            # e.g., an Exception that cannot be pickled
+            connection.send(RuntimeError(str(e)))
+    connection.close()
+
+
+def _saturation_pressure_MagmaSat(bulk_comp, temperature, kwargs,
+                                  warm_start=False):
+    if (warm_start and 'initial_guess' not in kwargs and
+            'SaturationP_bars' in _warm_start):
+        kwargs = dict(kwargs, initial_guess=_warm_start['SaturationP_bars'])
+    calc = calculate_classes.calculate_saturation_pressure(
+                                     sample=bulk_comp, temperature=temperature,
+                                     model='MagmaSat', verbose=True,
+                                     silence_warnings=True, **kwargs)
+    satP = calc.result["SaturationP_bars"]
+    if warm_start and np.isfinite(satP) and satP > 0:
+        _warm_start['SaturationP_bars'] = satP
+    return calc.result, calc.calib_check
+
+
+def _dissolved_volatiles_MagmaSat(bulk_comp, temperature, pressure, X_fluid,
+                                  kwargs, warm_start=False):
+    # H2O_guess is the system H2O, and so is only used if there is H2O in
+    # the fluid
+    if (warm_start and 'H2O_guess' not in kwargs and X_fluid > 0 and
+            'H2O_liq' in _warm_start):
+        kwargs = dict(kwargs, H2O_guess=_warm_start['H2O_liq'])
+    calc = calculate_classes.calculate_dissolved_volatiles(
+                                     sample=bulk_comp, pressure=pressure,
+                                     temperature=temperature, X_fluid=X_fluid,
+                                     model='MagmaSat', silence_warnings=True,
+                                     verbose=True, **kwargs)
+    if warm_start and np.isfinite(calc.result['H2O_liq']):
+        _warm_start['H2O_liq'] = float(calc.result['H2O_liq'])
+    return calc.result, calc.calib_check
+
+
+def _equilibrium_fluid_comp_MagmaSat(bulk_comp, temperature, pressure,
+                                     kwargs):
+    calc = calculate_classes.calculate_equilibrium_fluid_comp(
+                                     sample=bulk_comp, pressure=pressure,
+                                     temperature=temperature,
+                                     model='MagmaSat', silence_warnings=True,
+                                     **kwargs)
+    return calc.result, calc.calib_check
+
+
+def _degassing_path(bulk_comp, temperature, pressure, fractionate_vapor,
+                    model, kwargs):
+    if pressure != 'saturation':
+        # 'saturation' is the default, and is not a valid pressure for the
+        # calibration checks
+        kwargs = dict(kwargs, pressure=pressure)
+    calc = calculate_classes.calculate_degassing_path(
+                                     sample=bulk_comp, temperature=temperature,
+                                     fractionate_vapor=fractionate_vapor,
+                                     model=model, silence_warnings=True,
+                                     **kwargs)
+    return calc.result
@@ -6,8 +6,6 @@ from VESIcal import core
 from VESIcal import models
 from VESIcal.models import magmasat
 
-from copy import deepcopy
-
 
 class Calculate(object):
     """ The Calculate object is a template for implementing user-friendly
@@ -113,9 +111,6 @@ class calculate_dissolved_volatiles(Calculate):
         """
         default_units = sample.default_units
 
-        # get the composition of
-        bulk_comp = deepcopy(sample)
-
         # check if calculation result is H2O-only, CO2-only, or mixed
         # H2O-CO2
         if isinstance(self.model_name, str):
@@ -123,8 +118,10 @@ class calculate_dissolved_volatiles(Calculate):
                 # set dissolved H2O and CO2 values.
                 # this action assumes they are input as wt% but updates the
                 # composition in its default units.
-                bulk_comp.change_composition({'H2O': calc_result['H2O_liq'],
-                                             'CO2': calc_result['CO2_liq']})
+                bulk_comp = sample.change_composition(
+                                        {'H2O': calc_result['H2O_liq'],
+                                         'CO2': calc_result['CO2_liq']},
+                                        inplace=False)
                 return {'H2O_liq': bulk_comp.get_composition(
                                                       species='H2O',
                                                       units=default_units),
@@ -132,16 +129,20 @@ class calculate_dissolved_volatiles(Calculate):
                                                       species='CO2',
                                                       units=default_units)}
             elif 'Water' in self.model_name:
-                bulk_comp.change_composition({'H2O': calc_result})
+                bulk_comp = sample.change_composition({'H2O': calc_result},
+                                                      inplace=False)
                 return bulk_comp.get_composition(species='H2O',
                                                  units=default_units)
             elif 'Carbon' in self.model_name:
-                bulk_comp.change_composition({'CO2': calc_result})
+                bulk_comp = sample.change_composition({'CO2': calc_result},
+                                                      inplace=False)
                 return bulk_comp.get_composition(species='CO2',
                                                  units=default_units)
             elif self.model_name == 'MagmaSat':
-                bulk_comp.change_composition({'H2O': calc_result['H2O_liq'],
-                                             'CO2': calc_result['CO2_liq']})
+                bulk_comp = sample.change_composition(
+                                        {'H2O': calc_result['H2O_liq'],
+                                         'CO2': calc_result['CO2_liq']},
+                                        inplace=False)
                 # check if verbose method has been chosen
                 if 'verbose' in kwargs and kwargs['verbose']:
                     return {'H2O_liq': bulk_comp.get_composition(
@@ -0,0 +1,110 @@
+import hashlib
+import pickle
+import sqlite3
+
+
+class Checkpoint(object):
+    """
+    Stores the results of the samples of a BatchFile calculation in an sqlite database on disk,
+    each as soon as it has been calculated, so that an interrupted calculation can be resumed.
+    Results are keyed by sample label, and stored with a hash of the calculation and its
+    arguments, so that a stored result is only reused by a calculation with the same inputs.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path: str
+            Path to the database. The file is created if it does not exist.
+        """
+        self.path = path
+        self._store = sqlite3.connect(path)
+        self._store.execute("CREATE TABLE IF NOT EXISTS results "
+                            "(label TEXT PRIMARY KEY, inputs TEXT, result BLOB)")
+        self._store.commit()
+
+    def __len__(self):
+        return self._store.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @staticmethod
+    def get_inputs_key(calculation, args):
+        """
+        Returns a hash of a calculation and its arguments.
+
+        Parameters
+        ----------
+        calculation: function
+            The calculation, which must be picklable.
+
+        args: tuple
+            The arguments it is called with.
+
+        Returns
+        -------
+        str or None
+            The hash, or None if the calculation or its arguments cannot be pickled.
+        """
+        try:
+            return hashlib.sha1(pickle.dumps((calculation, args))).hexdigest()
+        except Exception:
+            return None
+
+    def get(self, label, inputs_key):
+        """
+        Returns the stored result of a sample.
+
+        Parameters
+        ----------
+        label: object
+            The sample label.
+
+        inputs_key: str
+            The hash of the calculation and its arguments (see get_inputs_key).
+
+        Returns
+        -------
+        tuple
+            True and the result if a result calculated with the same inputs is stored, and
+            (False, None) otherwise.
+        """
+        if inputs_key is None:
+            return False, None
+        row = self._store.execute("SELECT inputs, result FROM results WHERE label = ?",
+                                  (repr(label),)).fetchone()
+        if row is None or row[0] != inputs_key:
+            return False, None
+        return True, pickle.loads(row[1])
+
+    def add(self, label, inputs_key, result):
+        """
+        Stores the result of a sample, replacing any stored result with the same label. The
+        result is committed to disk before returning. Results that cannot be pickled, or whose
+        inputs could not be hashed, are not stored.
+
+        Parameters
+        ----------
+        label: object
+            The sample label.
+
+        inputs_key: str
+            The hash of the calculation and its arguments (see get_inputs_key).
+
+        result: object
+            The result of the calculation.
+        """
+        if inputs_key is None:
+            return
+        try:
+            blob = pickle.dumps(result)
+        except Exception:
+            return
+        self._store.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                            (repr(label), inputs_key, sqlite3.Binary(blob)))
+        self._store.commit()
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self._store.close()
@@ -166,3 +166,14 @@ class SaturationError(Error):
 
     def __init__(self, message):
         self.message = message
+
+
+class BudgetExceededError(Error):
+    """Exception raised when a calculation exceeds its wall-clock time or iteration budget.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        self.message = message
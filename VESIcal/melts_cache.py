@@ -0,0 +1,195 @@
+from collections import OrderedDict
+import hashlib
+import pickle
+import sqlite3
+
+
+class CachedMELTS(object):
+    """
+    Wraps a thermoengine equilibrate MELTS instance so that the results of equilibrate_tp are
+    memoized. Results are keyed on the bulk composition last passed to set_bulk_composition and
+    on the temperature and pressure, all rounded to a fixed number of decimal places. Only
+    calls with initialize=True are cached, since only their results are fully determined by
+    composition, temperature, and pressure. All other attributes and methods are passed through
+    to the wrapped MELTS instance.
+
+    Results are held in memory in a least-recently-used cache, and can also be stored in an
+    sqlite database on disk (see open_store) so that they persist between sessions.
+    """
+
+    def __init__(self, melts, maxsize=1024, path=None, decimals=6):
+        """
+        Parameters
+        ----------
+        melts: thermoengine.equilibrate.MELTSmodel
+            The MELTS instance to wrap.
+
+        maxsize: int
+            OPTIONAL: Default is 1024. The maximum number of results held in memory. If 0,
+            nothing is held in memory, but results are still read from and written to the
+            on-disk store, if one is open.
+
+        path: str
+            OPTIONAL: Default is None. Path to an sqlite database in which to store results. The
+            file is created if it does not exist.
+
+        decimals: int
+            OPTIONAL: Default is 6. The number of decimal places to which composition (in wt%),
+            temperature, and pressure are rounded to build cache keys.
+        """
+        self.melts = melts
+        self.maxsize = maxsize
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._composition_key = None
+        self._store = None
+        if path is not None:
+            self.open_store(path)
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the wrapper itself
+        if name == 'melts':
+            raise AttributeError(name)
+        return getattr(self.melts, name)
+
+    def set_bulk_composition(self, bulk_comp):
+        """
+        Sets the bulk composition of the wrapped MELTS instance and records it for use in cache
+        keys.
+
+        Parameters
+        ----------
+        bulk_comp: dict or pandas Series
+            Bulk composition in wt% oxides.
+        """
+        items = sorted((str(oxide), round(float(value), self.decimals))
+                       for oxide, value in dict(bulk_comp).items())
+        # treat -0.0 and 0.0 (and absent oxides) alike
+        self._composition_key = repr([(oxide, value + 0.0) for oxide, value in items
+                                      if value != 0])
+        return self.melts.set_bulk_composition(bulk_comp)
+
+    def equilibrate_tp(self, T_a, P_a, initialize=False, **kwargs):
+        """
+        Calls equilibrate_tp on the wrapped MELTS instance, unless the same equilibration has
+        already been done, in which case the stored result is returned.
+
+        Parameters are as for thermoengine.equilibrate.MELTSmodel.equilibrate_tp.
+        """
+        if (not initialize or kwargs or self._composition_key is None or
+                not self._is_scalar(T_a) or not self._is_scalar(P_a)):
+            return self.melts.equilibrate_tp(T_a, P_a, initialize=initialize, **kwargs)
+
+        key = self._make_key(T_a, P_a)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+
+        output = self._read_store(key)
+        if output is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            output = self.melts.equilibrate_tp(T_a, P_a, initialize=initialize)
+            self._write_store(key, output)
+
+        self._remember(key, output)
+        return output
+
+    def cache_info(self):
+        """
+        Returns cache statistics.
+
+        Returns
+        -------
+        dict
+            Number of hits and misses, the current and maximum number of results held in memory,
+            and the path of the on-disk store (None if there is none).
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache),
+                'maxsize': self.maxsize, 'path': self._store_path()}
+
+    def cache_clear(self):
+        """
+        Empties the in-memory cache and resets the hit and miss counters. The on-disk store, if
+        any, is left untouched.
+        """
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def open_store(self, path):
+        """
+        Opens (or creates) an sqlite database in which results are stored, so that they can be
+        reused in later sessions. Any store already open is closed first. A store should only
+        be used with one version of MELTS.
+
+        Parameters
+        ----------
+        path: str
+            Path to the sqlite database.
+        """
+        self.close_store()
+        self._store = sqlite3.connect(path)
+        self._store.execute("CREATE TABLE IF NOT EXISTS equilibrations "
+                            "(key TEXT PRIMARY KEY, output BLOB)")
+        self._store.commit()
+
+    def close_store(self):
+        """
+        Closes the on-disk store, if one is open.
+        """
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def _store_path(self):
+        if self._store is None:
+            return None
+        for row in self._store.execute("PRAGMA database_list"):
+            if row[1] == 'main':
+                return row[2]
+
+    @staticmethod
+    def _is_scalar(value):
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            return False
+        return True
+
+    def _make_key(self, T_a, P_a):
+        key = repr((self._composition_key, round(float(T_a), self.decimals) + 0.0,
+                    round(float(P_a), self.decimals) + 0.0))
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _remember(self, key, output):
+        if self.maxsize <= 0:
+            return
+        self._cache[key] = output
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def _read_store(self, key):
+        if self._store is None:
+            return None
+        row = self._store.execute("SELECT output FROM equilibrations WHERE key = ?",
+                                  (key,)).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0])
+
+    def _write_store(self, key, output):
+        if self._store is None:
+            return
+        try:
+            blob = pickle.dumps(output)
+        except Exception:
+            return  # output that cannot be stored is simply not cached on disk
+        self._store.execute("INSERT OR REPLACE INTO equilibrations VALUES (?, ?)",
+                            (key, sqlite3.Binary(blob)))
+        self._store.commit()
@@ -0,0 +1,177 @@
+from abc import abstractmethod
+import numpy as np
+import warnings as w
+
+from VESIcal import core
+from VESIcal import models
+from VESIcal import sample_class
+
+
+class MELTSEngine(object):
+    """
+    The interface through which MagmaSat calls MELTS. thermoengine's equilibrate.MELTSmodel
+    implements it, and any object implementing the methods below can be used in its place (see
+    magmasat.set_engine). Pressures are in MPa and temperatures in degrees C.
+    """
+
+    @abstractmethod
+    def get_phase_names(self):
+        pass
+
+    @abstractmethod
+    def set_phase_inclusion_status(self, phase_dict):
+        pass
+
+    @abstractmethod
+    def set_bulk_composition(self, oxide_dict):
+        pass
+
+    @abstractmethod
+    def equilibrate_tp(self, T_a, P_a, initialize=False):
+        pass
+
+    @abstractmethod
+    def get_mass_of_phase(self, xmlout, phase_name='System'):
+        pass
+
+    @abstractmethod
+    def get_composition_of_phase(self, xmlout, phase_name='System', mode='oxide_wt'):
+        pass
+
+
+class MissingEngine(MELTSEngine):
+    """
+    Stands in for MELTS when thermoengine is not installed. Any attempt to calculate raises an
+    ImportError.
+    """
+
+    def _raise(self):
+        raise ImportError("thermoengine is required for MagmaSat calculations, but could not "
+                          "be imported. See https://gitlab.com/ENKI-portal/ThermoEngine. To run "
+                          "MagmaSat code paths without it, see magmasat.set_engine.")
+
+    def get_phase_names(self):
+        return []
+
+    def set_phase_inclusion_status(self, phase_dict):
+        pass
+
+    def set_bulk_composition(self, oxide_dict):
+        self._raise()
+
+    def equilibrate_tp(self, T_a, P_a, initialize=False):
+        self._raise()
+
+    def get_mass_of_phase(self, xmlout, phase_name='System'):
+        self._raise()
+
+    def get_composition_of_phase(self, xmlout, phase_name='System', mode='oxide_wt'):
+        self._raise()
+
+
+class MixedFluidEngine(MELTSEngine):
+    """
+    A fast, deterministic, analytic stand-in for MELTS, which calculates the equilibrium between
+    a silicate liquid and an H2O-CO2 fluid with one of VESIcal's MixedFluid models. Only the
+    Liquid and Fluid phases are modelled. It is intended for testing and benchmarking MagmaSat
+    code paths (solvers, caching, parallelism) on machines without thermoengine; its results
+    are those of the MixedFluid model, not of MagmaSat.
+
+    The dissolved volatile concentrations given by the MixedFluid model are taken to be grams
+    per 100 g of system, as in MixedFluid.calculate_degassing_path; the remainder of the H2O and
+    CO2 in the system forms the fluid.
+    """
+
+    def __init__(self, version='1.2.0', model='Dixon'):
+        """
+        Parameters
+        ----------
+        version: str
+            OPTIONAL: Default is '1.2.0'. Ignored; accepted so that the class can be passed to
+            magmasat.set_engine.
+
+        model: str or MixedFluid object
+            OPTIONAL: Default is 'Dixon'. The MixedFluid model to calculate with, or its name in
+            VESIcal.models.default_models. It must model H2O and CO2.
+        """
+        if isinstance(model, str):
+            if model not in models.default_models.keys():
+                raise core.InputError("The model name given is not recognised. Run the method "
+                                      "get_model_names() to find allowed names.")
+            model = models.default_models[model]
+        if sorted(getattr(model, 'volatile_species', [])) != ['CO2', 'H2O']:
+            raise core.InputError("model must be a MixedFluid model of H2O and CO2.")
+        self.version = version
+        self.model = model
+        self.bulk_comp = {}
+
+    def get_phase_names(self):
+        return ['Liquid', 'Fluid']
+
+    def set_phase_inclusion_status(self, phase_dict):
+        pass
+
+    def set_bulk_composition(self, oxide_dict):
+        self.bulk_comp = {oxide: float(value) for oxide, value in dict(oxide_dict).items()}
+
+    def equilibrate_tp(self, T_a, P_a, initialize=False):
+        bulk = dict(self.bulk_comp)
+        for volatile in ['H2O', 'CO2']:
+            bulk[volatile] = max(bulk.get(volatile, 0.0), 0.0)
+        system_mass = sum(bulk.values())
+        fluid = {'H2O': 0.0, 'CO2': 0.0}
+        X_fluid = {'H2O': 0.0, 'CO2': 0.0}
+        status = 'success, Minimal energy computed.'
+
+        try:
+            with w.catch_warnings():
+                w.simplefilter("ignore")
+                sample = sample_class.Sample(bulk)
+                sample.set_default_normalization('none')
+                pressure = float(P_a) * 10.0
+                X = self.model.calculate_equilibrium_fluid_comp(pressure=pressure, sample=sample,
+                                                                temperature=T_a)
+                if X['H2O'] > 0 or X['CO2'] > 0:
+                    X_H2O = min(max(float(X['H2O']), 0.0), 1.0)
+                    X_fluid = {'H2O': X_H2O, 'CO2': 1.0 - X_H2O}
+                    dissolved = self.model.calculate_dissolved_volatiles(
+                                    pressure=pressure, sample=sample, temperature=T_a,
+                                    X_fluid=tuple(X_fluid[species] for species in
+                                                  self.model.volatile_species),
+                                    returndict=True)
+                    for volatile in ['H2O', 'CO2']:
+                        if X_fluid[volatile] > 0:
+                            dissolved_mass = dissolved[volatile + '_liq'] * system_mass / 100.0
+                            fluid[volatile] = max(bulk[volatile] - dissolved_mass, 0.0)
+        except Exception:
+            status = 'failure, MixedFluid model calculation failed.'
+
+        if not all(np.isfinite(value) for value in fluid.values()):
+            fluid = {'H2O': 0.0, 'CO2': 0.0}
+            status = 'failure, MixedFluid model calculation failed.'
+
+        liquid = dict(bulk)
+        for volatile in ['H2O', 'CO2']:
+            liquid[volatile] = bulk[volatile] - fluid[volatile]
+        xmlout = {'Liquid': liquid, 'Fluid': fluid, 'X_fluid': X_fluid,
+                  'System': system_mass, 'status': status}
+        return [(status, T_a, P_a, xmlout)]
+
+    def get_mass_of_phase(self, xmlout, phase_name='System'):
+        if phase_name == 'System':
+            return xmlout['System']
+        if phase_name in ['Liquid', 'Fluid']:
+            return sum(xmlout[phase_name].values())
+        return 0.0
+
+    def get_composition_of_phase(self, xmlout, phase_name='System', mode='oxide_wt'):
+        if phase_name not in ['Liquid', 'Fluid']:
+            return {}
+        mass = sum(xmlout[phase_name].values())
+        if mass <= 0:
+            return {}
+        if phase_name == 'Fluid' and mode == 'component':
+            return {'Water': xmlout['X_fluid']['H2O'],
+                    'Carbon Dioxide': xmlout['X_fluid']['CO2']}
+        return {oxide: 100.0 * value / mass for oxide, value in xmlout[phase_name].items()
+                if value > 0}
@@ -0,0 +1,183 @@
+from VESIcal import core
+
+from contextlib import contextmanager
+import time
+
+# MELTS methods whose calls are counted and timed
+instrumented_calls = ['equilibrate_tp', 'get_mass_of_phase', 'get_composition_of_phase']
+
+# MELTSCallStats objects currently recording, see record_calls()
+_recorders = []
+
+
+class MELTSCallStats(object):
+    """
+    Number of calls to, and wall time spent in, each instrumented MELTS method while recording.
+    """
+
+    def __init__(self):
+        self.calls = {name: 0 for name in instrumented_calls}
+        self.seconds = {name: 0.0 for name in instrumented_calls}
+
+    def __repr__(self):
+        return "\n".join(name + ": " + str(self.calls[name]) + " calls, " +
+                         "{:.3f}".format(self.seconds[name]) + " s"
+                         for name in instrumented_calls)
+
+    def record(self, name, seconds):
+        """
+        Records one call.
+
+        Parameters
+        ----------
+        name: str
+            Name of the MELTS method called.
+
+        seconds: float
+            Wall time taken by the call, in seconds.
+        """
+        self.calls[name] += 1
+        self.seconds[name] += seconds
+
+    def as_dict(self):
+        """
+        Returns the statistics as a flat dict.
+
+        Returns
+        -------
+        dict
+            Keys are '<method>_calls' and '<method>_seconds' for each instrumented method.
+        """
+        stats = {}
+        for name in instrumented_calls:
+            stats[name + '_calls'] = self.calls[name]
+            stats[name + '_seconds'] = self.seconds[name]
+        return stats
+
+
+@contextmanager
+def record_calls():
+    """
+    Context manager which records calls to MELTS made while it is active, in this process. The
+    MELTS instances created by VESIcal are all instrumented. Recorders can be nested, in which
+    case each call is recorded by all of them. Equilibrations answered from the cache of
+    magmasat.melts (see melts_cache.CachedMELTS) do not call MELTS, and so are not recorded.
+
+    Yields
+    ------
+    MELTSCallStats
+        Statistics of the calls made, updated as calls are made.
+
+    Example
+    -------
+    >>> with melts_stats.record_calls() as stats:
+    ...     v.calculate_saturation_pressure(sample, temperature=1000)
+    >>> stats.calls['equilibrate_tp']
+    """
+    stats = MELTSCallStats()
+    _recorders.append(stats)
+    try:
+        yield stats
+    finally:
+        _recorders.remove(stats)
+
+
+def call_recorded(calculation, *args):
+    """
+    Calls calculation(*args) while recording calls to MELTS. Module-level so that it can be sent
+    to worker processes.
+
+    Returns
+    -------
+    tuple
+        The result of the calculation, and the statistics of the calls made as a dict (see
+        MELTSCallStats.as_dict).
+    """
+    with record_calls() as stats:
+        result = calculation(*args)
+    return result, stats.as_dict()
+
+
+class MELTSCallBudget(MELTSCallStats):
+    """
+    Call statistics that raise a core.BudgetExceededError once more than a set number of MELTS
+    equilibrations have been made.
+    """
+
+    def __init__(self, max_equilibrations):
+        """
+        Parameters
+        ----------
+        max_equilibrations: int
+            The number of calls to equilibrate_tp allowed.
+        """
+        super().__init__()
+        self.max_equilibrations = max_equilibrations
+
+    def record(self, name, seconds):
+        super().record(name, seconds)
+        if name == 'equilibrate_tp' and self.calls[name] > self.max_equilibrations:
+            raise core.BudgetExceededError("Calculation exceeded " +
+                                           str(self.max_equilibrations) +
+                                           " MELTS equilibrations.")
+
+
+def call_budgeted(max_equilibrations, calculation, *args):
+    """
+    Calls calculation(*args), raising a core.BudgetExceededError from the first call to MELTS
+    equilibrate_tp beyond max_equilibrations. Module-level so that it can be sent to worker
+    processes.
+
+    Returns
+    -------
+    The result of the calculation.
+    """
+    budget = MELTSCallBudget(max_equilibrations)
+    _recorders.append(budget)
+    try:
+        return calculation(*args)
+    finally:
+        _recorders.remove(budget)
+
+
+class InstrumentedMELTS(object):
+    """
+    Wraps a thermoengine equilibrate MELTS instance so that calls to the instrumented methods
+    are counted and timed by any active recorders (see record_calls). All other attributes and
+    methods are passed through to the wrapped MELTS instance.
+    """
+
+    def __init__(self, melts):
+        """
+        Parameters
+        ----------
+        melts: thermoengine.equilibrate.MELTSmodel
+            The MELTS instance to wrap.
+        """
+        self.melts = melts
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the wrapper itself
+        if name == 'melts':
+            raise AttributeError(name)
+        return getattr(self.melts, name)
+
+    def _call(self, name, *args, **kwargs):
+        if len(_recorders) == 0:
+            return getattr(self.melts, name)(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return getattr(self.melts, name)(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            for stats in _recorders:
+                stats.record(name, seconds)
+
+    def equilibrate_tp(self, *args, **kwargs):
+        return self._call('equilibrate_tp', *args, **kwargs)
+
+    def get_mass_of_phase(self, *args, **kwargs):
+        return self._call('get_mass_of_phase', *args, **kwargs)
+
+    def get_composition_of_phase(self, *args, **kwargs):
+        return self._call('get_composition_of_phase', *args, **kwargs)
@@ -1,13 +1,24 @@
 from VESIcal import calibration_checks
 from VESIcal import core
+from VESIcal import melts_cache
+from VESIcal import melts_engine
+from VESIcal import melts_stats
 from VESIcal import model_classes
+from VESIcal import models
 from VESIcal import sample_class
 from VESIcal import vplot
 from VESIcal import batchfile  # needed for status_bar functions
 
-from thermoengine import equilibrate
+try:
+    from thermoengine import equilibrate
+except ImportError:
+    # MagmaSat calculations will raise an ImportError unless another engine is set with
+    # set_engine()
+    equilibrate = None
 
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
+import multiprocessing
 import numpy as np
 import pandas as pd
 import warnings as w
@@ -15,15 +26,157 @@ import sys
 
 w.filterwarnings("ignore", message="rubicon.objc.ctypes_patch has only been tested ")
 
+
 # -------------- MELTS preamble --------------- #
-# instantiate thermoengine equilibrate MELTS instance
-melts = equilibrate.MELTSmodel('1.2.0')
-
-# Suppress phases not required in the melts simulation
-phases = melts.get_phase_names()
-for phase in phases:
-    melts.set_phase_inclusion_status({phase: False})
-melts.set_phase_inclusion_status({'Fluid': True, 'Liquid': True})
+# Function called with the MELTS version to create the engine MagmaSat calculates with. If None,
+# thermoengine's equilibrate.MELTSmodel is used. See set_engine().
+_engine = None
+
+# Maximum number of steps taken by the searches that step a pressure or a volatile content until
+# MELTS reports the change they are looking for, so that a composition for which that change
+# never comes raises a SaturationError instead of running forever.
+max_search_steps = 1000
+
+
+def initialize_melts(version='1.2.0'):
+    """
+    Returns a MELTS instance with all phases other than Fluid and Liquid suppressed. This is a
+    thermoengine equilibrate MELTS instance unless another engine has been set with set_engine().
+    The instance is wrapped so that calls to it can be recorded (see melts_stats.record_calls).
+
+    Parameters
+    ----------
+    version: str
+        OPTIONAL: Default is '1.2.0'. The version of MELTS to instantiate.
+
+    Returns
+    -------
+    melts_stats.InstrumentedMELTS
+    """
+    if _engine is not None:
+        _melts = _engine(version)
+    elif equilibrate is not None:
+        _melts = equilibrate.MELTSmodel(version)
+    else:
+        _melts = melts_engine.MissingEngine()
+
+    # Suppress phases not required in the melts simulation
+    phases = _melts.get_phase_names()
+    for phase in phases:
+        _melts.set_phase_inclusion_status({phase: False})
+    _melts.set_phase_inclusion_status({'Fluid': True, 'Liquid': True})
+
+    return melts_stats.InstrumentedMELTS(_melts)
+
+
+class MELTSHandle(object):
+    """
+    Holds a MELTS instance for reuse between calculations. Calls are passed through to the MELTS
+    instance. Any call to set_bulk_composition or equilibrate_tp that raises an error, and any
+    equilibration that returns a failure status, marks the instance as failed. reset() builds a
+    new instance only if there is none yet or the current one has failed, so that MELTS is only
+    re-instantiated when its state may have been corrupted (e.g., by an unfeasible composition
+    set during an open-system degassing calculation).
+    """
+
+    def __init__(self, version='1.2.0'):
+        """
+        Parameters
+        ----------
+        version: str
+            OPTIONAL: Default is '1.2.0'. The version of MELTS to instantiate.
+        """
+        self.version = version
+        self.melts = None
+        self.failed = False
+        self.builds = 0
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the handle itself
+        if name == 'melts' or self.melts is None:
+            raise AttributeError(name)
+        return getattr(self.melts, name)
+
+    def reset(self):
+        """
+        Makes the handle ready for a new calculation, building a new MELTS instance if there is
+        none yet or if the current one has failed.
+        """
+        if self.melts is None or self.failed:
+            self.melts = initialize_melts(self.version)
+            self.failed = False
+            self.builds += 1
+
+    def set_bulk_composition(self, bulk_comp):
+        try:
+            return self.melts.set_bulk_composition(bulk_comp)
+        except Exception:
+            self.failed = True
+            raise
+
+    def equilibrate_tp(self, T_a, P_a, initialize=False, **kwargs):
+        try:
+            output = self.melts.equilibrate_tp(T_a, P_a, initialize=initialize, **kwargs)
+        except Exception:
+            self.failed = True
+            raise
+        for result in output:
+            if str(result[0]).lower().startswith('failure'):
+                self.failed = True
+        return output
+
+
+# instantiate thermoengine equilibrate MELTS instance. Results of equilibrations are memoized,
+# so that identical (composition, T, P) states are only calculated once. See
+# melts_cache.CachedMELTS for cache statistics and for storing results on disk.
+melts = melts_cache.CachedMELTS(initialize_melts('1.2.0'))
+
+# MELTS instance used for degassing calculations, rebuilt only if a calculation fails
+degassing_melts = MELTSHandle('1.2.0')
+
+
+def _check_search_steps(steps, search):
+    """An internally used function that raises a SaturationError if a search has taken more than
+    max_search_steps steps."""
+    if steps > max_search_steps:
+        raise core.SaturationError("The " + search + " did not converge within " +
+                                   str(max_search_steps) + " steps.")
+
+
+def set_engine(engine=None):
+    """
+    Sets the engine with which MagmaSat calculations are run in this process, and replaces the
+    module's MELTS instances (emptying the MELTS cache). Worker processes created by VESIcal
+    (e.g., with n_workers) use the same engine; other processes use thermoengine unless they
+    call set_engine themselves.
+
+    Parameters
+    ----------
+    engine: function or class
+        OPTIONAL: Default is None, in which case thermoengine's equilibrate.MELTSmodel is used.
+        Otherwise, a function (or class) which is called with the MELTS version and returns an
+        object implementing melts_engine.MELTSEngine. It must be picklable to be used in worker
+        processes. For example, melts_engine.MixedFluidEngine runs MagmaSat code paths with an
+        analytic MixedFluid model in place of MELTS, for testing and benchmarking without
+        thermoengine.
+    """
+    global _engine, melts, degassing_melts
+    _engine = engine
+    melts = melts_cache.CachedMELTS(initialize_melts('1.2.0'))
+    degassing_melts = MELTSHandle('1.2.0')
+
+
+def get_engine():
+    """
+    Returns the engine set with set_engine(), or None if thermoengine is being used.
+    """
+    return _engine
+
+
+def _initialize_worker(engine):
+    """Initializes a worker process to use the same engine as the process that created it."""
+    if engine is not None:
+        set_engine(engine)
 # --------------------------------------------- #
 
 
@@ -49,6 +202,19 @@ class MagmaSat(model_classes.Model):
                 description_msg=calibration_checks.crmsg_Between_description)])
         self.model_type = 'MagmaSat'
 
+    def record_melts_calls(self):
+        """
+        Returns a context manager which records the number of calls to MELTS, and the wall time
+        spent in them, while it is active. See melts_stats.record_calls.
+
+        Example
+        -------
+        >>> with v.models.magmasat.MagmaSat().record_melts_calls() as stats:
+        ...     v.calculate_saturation_pressure(sample, temperature=1000)
+        >>> print(stats)
+        """
+        return melts_stats.record_calls()
+
     def preprocess_sample(self, sample):
         """
         Returns sample with 0.0 values for any oxides not passed.
@@ -202,11 +368,12 @@ class MagmaSat(model_classes.Model):
         return H2O_fl
 
     def calculate_dissolved_volatiles(self, sample, temperature, pressure, X_fluid=1,
-                                      H2O_guess=0.0, verbose=False, **kwargs):
+                                      H2O_guess=0.0, verbose=False, solver='secant',
+                                      X_fluid_tolerance=0.0001, **kwargs):
         """
         Calculates the amount of H2O and CO2 dissolved in a magma at saturation at the given P/T
-        conditions and fluid composition. Fluid composition will be matched to within 0.0001 mole
-        fraction.
+        conditions and fluid composition. Fluid composition will be matched to within
+        X_fluid_tolerance (default 0.0001) mole fraction.
 
         Parameters
         ----------
@@ -223,16 +390,34 @@ class MagmaSat(model_classes.Model):
             The default value is 1. The mole fraction of H2O in the H2O-CO2 fluid. X_fluid=1 is a
             pure H2O fluid. X_fluid=0 is a pure CO2 fluid.
 
+        H2O_guess: float
+            OPTIONAL: Default is 0.0. Initial guess for the wt% H2O in the system, from which the
+            search for a fluid-saturated system begins.
+
         verbose: bool
             OPTIONAL: Default is False. If set to True, returns H2O and CO2 concentration in the
             melt, H2O and CO2 concentration in the fluid, mass of the fluid in grams, and
             proportion of fluid in the system in wt%.
 
+        solver: str
+            OPTIONAL: Default is 'secant'. The search used to match the fluid composition.
+            'secant' adds H2O (or CO2) to a fluid-saturated system and solves for the amount
+            that gives X_fluid using a bracketed secant (Illinois) method. 'legacy' nudges H2O
+            and CO2 in fixed increments that are refined from 0.1 to 0.0001 mole fraction. If the
+            secant search cannot bracket X_fluid, the legacy search is used instead.
+
+        X_fluid_tolerance: float
+            OPTIONAL: Default is 0.0001. The tolerance, in mole fraction, to which the fluid
+            composition is matched. Ignored if solver='legacy'.
+
         Returns
         -------
         dict
             A dictionary of dissolved volatile concentrations in wt% with keys H2O and CO2.
         """
+        if solver not in ['secant', 'legacy']:
+            raise core.InputError("solver must be one of 'secant' or 'legacy'.")
+
         _sample = self.preprocess_sample(sample)
 
         if isinstance(X_fluid, int) or isinstance(X_fluid, float):
@@ -253,10 +438,215 @@ class MagmaSat(model_classes.Model):
                                       "fraction. Value for X_fluid must be between 0.0001 and "
                                       "0.9999.")
 
+        H2O_val_CO2_val = None
+        if solver == 'secant':
+            H2O_val_CO2_val = self._match_X_fluid_secant(_sample, temperature, pressure, X_fluid,
+                                                         H2O_guess, X_fluid_tolerance)
+        if H2O_val_CO2_val is None:
+            H2O_val_CO2_val = self._match_X_fluid_legacy(_sample, temperature, pressure, X_fluid,
+                                                         H2O_guess)
+        (H2O_val, CO2_val) = H2O_val_CO2_val
+
+        # ------ Get calculated values ------ #
+        _sample.change_composition({'H2O': H2O_val, 'CO2': CO2_val}, units='wtpt_oxides')
+        melts.set_bulk_composition(_sample.get_composition(units='wtpt_oxides',
+                                                           normalization='none'))
+
+        output = melts.equilibrate_tp(temperature, pressureMPa, initialize=True)
+        (status, temperature, pressureMPa, xmlout) = output[0]
+        fluid_mass = melts.get_mass_of_phase(xmlout, phase_name='Fluid')
+        system_mass = melts.get_mass_of_phase(xmlout, phase_name='System')
+        liquid_comp = melts.get_composition_of_phase(xmlout, phase_name='Liquid', mode='oxide_wt')
+        fluid_comp = melts.get_composition_of_phase(xmlout, phase_name='Fluid', mode='component')
+
+        if "H2O" in liquid_comp:
+            H2O_liq = liquid_comp["H2O"]
+        else:
+            H2O_liq = 0
+
+        if "CO2" in liquid_comp:
+            CO2_liq = liquid_comp["CO2"]
+        else:
+            CO2_liq = 0
+
+        if "Water" in fluid_comp:
+            H2O_fl = fluid_comp["Water"]
+        else:
+            H2O_fl = 0.0
+        if "Carbon Dioxide" in fluid_comp:
+            CO2_fl = fluid_comp["Carbon Dioxide"]
+        else:
+            CO2_fl = 0.0
+
+        if verbose:
+            return {"temperature": temperature, "pressure": pressure,
+                    "H2O_liq": H2O_liq, "CO2_liq": CO2_liq,
+                    "XH2O_fl": H2O_fl, "XCO2_fl": CO2_fl,
+                    "FluidProportion_wt": 100*fluid_mass/system_mass}
+
+        if verbose is False:
+            return {"CO2_liq": CO2_liq, "H2O_liq": H2O_liq}
+
+    def _match_X_fluid_secant(self, _sample, temperature, pressure, X_fluid, H2O_guess,
+                              tolerance, max_iterations=50):
+        """An internally used function to find the wt% H2O and CO2 in the system that give a
+        fluid of composition X_fluid. A fluid-saturated system is found first, by growing the
+        system volatile content geometrically. H2O (if the fluid is too CO2-rich) or CO2 (if the
+        fluid is too H2O-rich) is then added, and the amount added is solved for with a bracketed
+        secant (Illinois) method. Adding either volatile keeps the system fluid-saturated.
+
+        Parameters
+        ----------
+        _sample:     Sample class
+            Preprocessed magma major element composition.
+
+        temperature: float
+            Temperature in degrees C.
+
+        pressure: float
+            Pressure in bars.
+
+        X_fluid: float
+            The target mole fraction of H2O in the H2O-CO2 fluid.
+
+        H2O_guess: float
+            Initial guess for the wt% H2O in the system.
+
+        tolerance: float
+            The tolerance, in mole fraction, to which X_fluid is matched.
+
+        max_iterations: int
+            OPTIONAL: Default is 50. Maximum number of MELTS equilibrations used to bracket and
+            then solve for X_fluid.
+
+        Returns
+        -------
+        tuple or None
+            wt% H2O and CO2 in the system. None is returned if X_fluid could not be matched
+            within max_iterations.
+        """
+        # Find a fluid-saturated system with the system wt fraction of H2O set to X_fluid
         H2O_val = H2O_guess
         CO2_val = 0.0
         fluid_mass = 0.0
+        if X_fluid >= 0.5:
+            step = 0.2
+        else:
+            step = 0.1
+        iterno = 0
         while fluid_mass <= 0:
+            iterno += 1
+            if iterno > max_iterations:
+                return None
+            if X_fluid == 0:
+                CO2_val += step
+            else:
+                H2O_val += step
+                # NOTE this is setting XH2Owt of the system (not of the fluid) to X_fluid
+                CO2_val = (H2O_val / X_fluid) - H2O_val
+            fluid_mass = self.get_fluid_mass(_sample, temperature, pressure, H2O_val, CO2_val)
+            step *= 2
+
+        XH2O_fluid = self.get_XH2O_fluid(_sample, temperature, pressure, H2O_val, CO2_val)
+        if abs(XH2O_fluid - X_fluid) <= tolerance:
+            return H2O_val, CO2_val
+
+        # misfit(x) is negative at the start point and increases with the volatile added, x
+        if XH2O_fluid < X_fluid:
+            add_H2O = True
+            x_lo, step = H2O_val, 0.2
+
+            def misfit(x):
+                return self.get_XH2O_fluid(_sample, temperature, pressure, x, CO2_val) - X_fluid
+        else:
+            add_H2O = False
+            x_lo, step = CO2_val, 0.1
+
+            def misfit(x):
+                return X_fluid - self.get_XH2O_fluid(_sample, temperature, pressure, H2O_val, x)
+
+        f_lo = -abs(XH2O_fluid - X_fluid)
+
+        # Bracket the root
+        x_hi = x_lo + step
+        f_hi = misfit(x_hi)
+        iterno = 1
+        while f_hi < -tolerance:
+            iterno += 1
+            if iterno > max_iterations:
+                return None
+            x_lo, f_lo = x_hi, f_hi
+            step *= 2
+            x_hi = x_lo + step
+            f_hi = misfit(x_hi)
+        x = x_hi
+        f = f_hi
+
+        # Illinois method: secant steps that always keep the root bracketed. A bisection step
+        # is taken instead if MELTS returns the same fluid composition at both ends of the
+        # bracket, or if the secant step would leave the bracket.
+        side = 0
+        while abs(f) > tolerance:
+            iterno += 1
+            if iterno > max_iterations:
+                return None
+            if f_hi != f_lo:
+                x = x_hi - f_hi * (x_hi - x_lo) / (f_hi - f_lo)
+            if f_hi == f_lo or not x_lo < x < x_hi:
+                x = 0.5 * (x_lo + x_hi)
+            f = misfit(x)
+            if f < 0:
+                x_lo, f_lo = x, f
+                if side == -1:
+                    f_hi /= 2
+                side = -1
+            else:
+                x_hi, f_hi = x, f
+                if side == 1:
+                    f_lo /= 2
+                side = 1
+
+        if add_H2O:
+            return x, CO2_val
+        else:
+            return H2O_val, x
+
+    def _match_X_fluid_legacy(self, _sample, temperature, pressure, X_fluid, H2O_guess):
+        """An internally used function to find the wt% H2O and CO2 in the system that give a
+        fluid of composition X_fluid, by nudging H2O and CO2 in fixed increments that are
+        refined from 0.1 to 0.0001 mole fraction.
+
+        Parameters
+        ----------
+        _sample:     Sample class
+            Preprocessed magma major element composition.
+
+        temperature: float
+            Temperature in degrees C.
+
+        pressure: float
+            Pressure in bars.
+
+        X_fluid: float
+            The target mole fraction of H2O in the H2O-CO2 fluid.
+
+        H2O_guess: float
+            Initial guess for the wt% H2O in the system.
+
+        Returns
+        -------
+        tuple
+            wt% H2O and CO2 in the system.
+        """
+        pressureMPa = pressure / 10.0
+
+        H2O_val = H2O_guess
+        CO2_val = 0.0
+        fluid_mass = 0.0
+        steps = 0
+        while fluid_mass <= 0:
+            steps += 1
+            _check_search_steps(steps, "search for a fluid-saturated system")
             if X_fluid == 0:
                 CO2_val += 0.1
             elif X_fluid >= 0.5:
@@ -280,7 +670,6 @@ class MagmaSat(model_classes.Model):
 
         output = melts.equilibrate_tp(temperature, pressureMPa, initialize=True)
         (status, temperature, pressureMPa, xmlout) = output[0]
-        liquid_comp = melts.get_composition_of_phase(xmlout, phase_name='Liquid', mode='oxide_wt')
         fluid_comp = melts.get_composition_of_phase(xmlout, phase_name='Fluid', mode='component')
 
         if "Water" in fluid_comp:
@@ -291,82 +680,59 @@ class MagmaSat(model_classes.Model):
         XH2O_fluid = H2O_fl
 
         # ------ Coarse Check ------ #
+        steps = 0
         while XH2O_fluid < X_fluid - 0.1:  # too low coarse check
+            steps += 1
+            _check_search_steps(steps, "search for X_fluid")
             H2O_val += 0.2
-            XH2O_fluid = self.get_XH2O_fluid(sample, temperature, pressure, H2O_val, CO2_val)
+            XH2O_fluid = self.get_XH2O_fluid(_sample, temperature, pressure, H2O_val, CO2_val)
 
         while XH2O_fluid > X_fluid + 0.1:  # too high coarse check
+            steps += 1
+            _check_search_steps(steps, "search for X_fluid")
             CO2_val += 0.1
-            XH2O_fluid = self.get_XH2O_fluid(sample, temperature, pressure, H2O_val, CO2_val)
+            XH2O_fluid = self.get_XH2O_fluid(_sample, temperature, pressure, H2O_val, CO2_val)
 
         # ------ Refinement 1 ------ #
         while XH2O_fluid < X_fluid - 0.01:  # too low refinement 1
+            steps += 1
+            _check_search_steps(steps, "search for X_fluid")
             H2O_val += 0.05
-            XH2O_fluid = self.get_XH2O_fluid(sample, temperature, pressure, H2O_val, CO2_val)
+            XH2O_fluid = self.get_XH2O_fluid(_sample, temperature, pressure, H2O_val, CO2_val)
 
         while XH2O_fluid > X_fluid + 0.01:  # too high refinement 1
+            steps += 1
+            _check_search_steps(steps, "search for X_fluid")
             CO2_val += 0.01
-            XH2O_fluid = self.get_XH2O_fluid(sample, temperature, pressure, H2O_val, CO2_val)
+            XH2O_fluid = self.get_XH2O_fluid(_sample, temperature, pressure, H2O_val, CO2_val)
 
         # ------ Refinement 2 ------ #
         while XH2O_fluid < X_fluid - 0.001:  # too low refinement 2
+            steps += 1
+            _check_search_steps(steps, "search for X_fluid")
             H2O_val += 0.005
-            XH2O_fluid = self.get_XH2O_fluid(sample, temperature, pressure, H2O_val, CO2_val)
+            XH2O_fluid = self.get_XH2O_fluid(_sample, temperature, pressure, H2O_val, CO2_val)
 
         while XH2O_fluid > X_fluid + 0.001:  # too high refinement 2
+            steps += 1
+            _check_search_steps(steps, "search for X_fluid")
             CO2_val += 0.001
-            XH2O_fluid = self.get_XH2O_fluid(sample, temperature, pressure, H2O_val, CO2_val)
+            XH2O_fluid = self.get_XH2O_fluid(_sample, temperature, pressure, H2O_val, CO2_val)
 
         # ------ Final refinement ------ #
         while XH2O_fluid < X_fluid - 0.0001:  # too low final refinement
+            steps += 1
+            _check_search_steps(steps, "search for X_fluid")
             H2O_val += 0.001
-            XH2O_fluid = self.get_XH2O_fluid(sample, temperature, pressure, H2O_val, CO2_val)
+            XH2O_fluid = self.get_XH2O_fluid(_sample, temperature, pressure, H2O_val, CO2_val)
 
         while XH2O_fluid > X_fluid + 0.0001:  # too high final refinement
+            steps += 1
+            _check_search_steps(steps, "search for X_fluid")
             CO2_val += 0.0001
-            XH2O_fluid = self.get_XH2O_fluid(sample, temperature, pressure, H2O_val, CO2_val)
+            XH2O_fluid = self.get_XH2O_fluid(_sample, temperature, pressure, H2O_val, CO2_val)
 
-        # ------ Get calculated values ------ #
-        _sample.change_composition({'H2O': H2O_val, 'CO2': CO2_val}, units='wtpt_oxides')
-        melts.set_bulk_composition(_sample.get_composition(units='wtpt_oxides',
-                                                           normalization='none'))
-
-        output = melts.equilibrate_tp(temperature, pressureMPa, initialize=True)
-        (status, temperature, pressureMPa, xmlout) = output[0]
-        fluid_mass = melts.get_mass_of_phase(xmlout, phase_name='Fluid')
-        system_mass = melts.get_mass_of_phase(xmlout, phase_name='System')
-        liquid_comp = melts.get_composition_of_phase(xmlout, phase_name='Liquid', mode='oxide_wt')
-        fluid_comp = melts.get_composition_of_phase(xmlout, phase_name='Fluid', mode='component')
-
-        if "H2O" in liquid_comp:
-            H2O_liq = liquid_comp["H2O"]
-        else:
-            H2O_liq = 0
-
-        if "CO2" in liquid_comp:
-            CO2_liq = liquid_comp["CO2"]
-        else:
-            CO2_liq = 0
-
-        if "Water" in fluid_comp:
-            H2O_fl = fluid_comp["Water"]
-        else:
-            H2O_fl = 0.0
-        if "Carbon Dioxide" in fluid_comp:
-            CO2_fl = fluid_comp["Carbon Dioxide"]
-        else:
-            CO2_fl = 0.0
-
-        XH2O_fluid = H2O_fl
-
-        if verbose:
-            return {"temperature": temperature, "pressure": pressure,
-                    "H2O_liq": H2O_liq, "CO2_liq": CO2_liq,
-                    "XH2O_fl": H2O_fl, "XCO2_fl": CO2_fl,
-                    "FluidProportion_wt": 100*fluid_mass/system_mass}
-
-        if verbose is False:
-            return {"CO2_liq": CO2_liq, "H2O_liq": H2O_liq}
+        return H2O_val, CO2_val
 
     def calculate_equilibrium_fluid_comp(self, sample, temperature, pressure, verbose=False,
                                          **kwargs):
@@ -453,7 +819,9 @@ class MagmaSat(model_classes.Model):
                     'FluidMass_grams': fluid_mass,
                     'FluidProportion_wt': flsystem_wtper}
 
-    def calculate_saturation_pressure(self, sample, temperature, verbose=False, **kwargs):
+    def calculate_saturation_pressure(self, sample, temperature, verbose=False,
+                                      solver='bisection', pressure_tolerance=10.0,
+                                      initial_guess=None, **kwargs):
         """
         Calculates the saturation pressure of a sample composition.
 
@@ -471,20 +839,285 @@ class MagmaSat(model_classes.Model):
             in wt%, and H2O and CO2 concentrations in the fluid in mole fraction are all returned
             in a dict.
 
+        solver: str
+            OPTIONAL: Default is 'bisection'. The search used to find the saturation pressure.
+            'bisection' brackets the saturation pressure between a fluid-saturated and a
+            fluid-undersaturated pressure and halves that bracket until it is narrower than
+            pressure_tolerance. 'legacy' steps down (or up) from 2000 MPa in 100, 10, and then
+            1 MPa steps. If the bisection search cannot bracket the saturation pressure, the
+            legacy search is used instead.
+
+        pressure_tolerance: float
+            OPTIONAL: Default is 10 bars (1 MPa, the resolution of the legacy search). The width,
+            in bars, of the final bracket in the bisection search. The pressure returned is the
+            fluid-saturated end of that bracket. Ignored if solver='legacy'.
+
+        initial_guess: float, int, or str
+            OPTIONAL: Default is None, in which case the bisection search starts from a bracket
+            of 0-2000 MPa. If a number is passed, it is taken as an estimate of the saturation
+            pressure in bars. If a string is passed, it must be the name of a model in
+            VESIcal.models.default_models (e.g., 'IaconoMarziano' or 'Dixon'), which is used to
+            calculate the estimate. The search then starts from a bracket of +/-20% around the
+            estimate, which is widened if it does not contain the saturation pressure. If the
+            estimate cannot be calculated, the search starts from 0-2000 MPa as usual. Ignored if
+            solver='legacy'.
+
         Returns
         -------
         float or dict
             If verbose is set to False: Saturation pressure in bars.
             If verbose is set to True: dict of all calculated values.
         """
+        if solver not in ['bisection', 'legacy']:
+            raise core.InputError("solver must be one of 'bisection' or 'legacy'.")
+        if pressure_tolerance <= 0:
+            raise core.InputError("pressure_tolerance must be greater than 0.")
+        if isinstance(initial_guess, str):
+            if initial_guess not in models.default_models.keys():
+                raise core.InputError("initial_guess must be a number or the name of a model "
+                                      "in VESIcal.models.default_models.")
+        elif initial_guess is not None and initial_guess <= 0:
+            raise core.InputError("initial_guess must be greater than 0.")
+
         _sample = self.preprocess_sample(sample)
+        bulk_comp = _sample.get_composition(units='wtpt_oxides', normalization='fixedvolatiles')
+
+        search = None
+        if solver == 'bisection':
+            guessMPa = self._get_saturation_pressure_guess(_sample, temperature, initial_guess)
+            search = self._saturation_pressure_bisection(bulk_comp, temperature,
+                                                         pressure_tolerance / 10.0,
+                                                         guessMPa=guessMPa)
+        if search is None:
+            search = self._saturation_pressure_stepped(bulk_comp, temperature)
+        (pressureMPa, fluid_mass, xmlout) = search
 
-        melts.set_bulk_composition(_sample.get_composition(units='wtpt_oxides',
-                                                           normalization='fixedvolatiles'))
+        if pressureMPa != np.nan:
+            satP = pressureMPa*10  # convert pressure to bars
+            flmass = fluid_mass
+            flsystem_wtper = (100 * fluid_mass / (fluid_mass +
+                              melts.get_mass_of_phase(xmlout, phase_name='Liquid')))
+            flcomp = melts.get_composition_of_phase(xmlout, phase_name='Fluid', mode='component')
+            try:
+                flH2O = flcomp['Water']
+            except Exception:
+                flH2O = 0.0
+            try:
+                flCO2 = flcomp['Carbon Dioxide']
+            except Exception:
+                flCO2 = 0.0
+        else:
+            flmass = np.nan
+            flsystem_wtper = np.nan
+            flH2O = np.nan
+            flCO2 = np.nan
+            warnmessage = 'Calculation failed.'
+
+        melts.set_bulk_composition(self.bulk_comp_orig)  # this needs to be reset always!
+
+        if verbose is False:
+            try:
+                w.warn(warnmessage)
+            except Exception:
+                pass
+            return satP
+
+        elif verbose:
+            try:
+                w.warn(warnmessage)
+            except Exception:
+                pass
+            return {"SaturationP_bars": satP, "FluidMass_grams": flmass,
+                    "FluidProportion_wt": flsystem_wtper,
+                    "XH2O_fl": flH2O, "XCO2_fl": flCO2}
+
+    def _get_saturation_pressure_guess(self, sample, temperature, initial_guess):
+        """An internally used function to turn the initial_guess argument of
+        calculate_saturation_pressure into an estimate of the saturation pressure in MPa.
+
+        Parameters
+        ----------
+        sample: Sample class
+            Magma major element composition.
+
+        temperature: float
+            Temperature in degrees C.
+
+        initial_guess: float, int, str, or None
+            Estimated saturation pressure in bars, or the name of a model in
+            VESIcal.models.default_models with which to estimate it.
+
+        Returns
+        -------
+        float or None
+            Estimated saturation pressure in MPa, or None if there is no usable estimate.
+        """
+        if initial_guess is None:
+            return None
+        if isinstance(initial_guess, str):
+            try:
+                with w.catch_warnings():
+                    w.simplefilter("ignore")
+                    satP = models.default_models[initial_guess].calculate_saturation_pressure(
+                                                    sample=sample, temperature=temperature)
+            except Exception:
+                return None
+        else:
+            satP = initial_guess
+
+        if not np.isfinite(satP) or satP <= 0:
+            return None
+        return satP / 10.0
+
+    def _get_fluid_mass_at_pressure(self, bulk_comp, temperature, pressureMPa):
+        """An internally used function to equilibrate a bulk composition and return the mass of
+        fluid present.
+
+        Parameters
+        ----------
+        bulk_comp: dict or pandas Series
+            Bulk system composition in wt% oxides.
+
+        temperature: float
+            Temperature in degrees C.
+
+        pressureMPa: float
+            Pressure in MPa.
+
+        Returns
+        -------
+        tuple
+            Mass of the fluid in grams and the MELTS xml output of the equilibration.
+        """
+        melts.set_bulk_composition(bulk_comp)
+        output = melts.equilibrate_tp(temperature, pressureMPa, initialize=True)
+        (status, temperature, pressureMPa, xmlout) = output[0]
+        fluid_mass = melts.get_mass_of_phase(xmlout, phase_name='Fluid')
+
+        return fluid_mass, xmlout
+
+    def _saturation_pressure_bisection(self, bulk_comp, temperature, toleranceMPa,
+                                       max_pressureMPa=10000, guessMPa=None):
+        """An internally used function to find the saturation pressure by bisection on the sign
+        of the fluid mass. The search starts from a bracket of 0-2000 MPa, which is extended
+        upward if the sample is fluid-saturated at 2000 MPa. If guessMPa is passed, the search
+        instead starts from a bracket of +/-20% around it, which is widened in whichever
+        direction the saturation pressure lies.
+
+        Parameters
+        ----------
+        bulk_comp: dict or pandas Series
+            Bulk system composition in wt% oxides.
+
+        temperature: float
+            Temperature in degrees C.
+
+        toleranceMPa: float
+            Width of the final bracket in MPa.
+
+        max_pressureMPa: float
+            OPTIONAL: Default is 10000 MPa. The highest pressure at which the bracket will be
+            searched for.
+
+        guessMPa: float
+            OPTIONAL: Default is None. An estimate of the saturation pressure in MPa.
+
+        Returns
+        -------
+        tuple or None
+            The highest fluid-saturated pressure found in MPa, the mass of fluid at that pressure
+            in grams, and the MELTS xml output at that pressure. None is returned if the
+            saturation pressure could not be bracketed, or if MELTS returned a non-finite fluid
+            mass.
+        """
+        try:
+            P_lo = 0.0  # assumed saturated, never equilibrated at 0 MPa
+            if guessMPa is not None and guessMPa >= max_pressureMPa:
+                guessMPa = None
+            if guessMPa is None:
+                P_hi = 2000.0
+                step = 100.0
+            else:
+                P_hi = 1.2 * guessMPa
+                step = 0.2 * guessMPa
+            fluid_mass, xmlout = self._get_fluid_mass_at_pressure(bulk_comp, temperature, P_hi)
+            if not np.isfinite(fluid_mass):
+                return None
+            lo_mass, lo_xml = 0.0, xmlout
+            hi_xml = xmlout
+
+            if guessMPa is not None and fluid_mass <= 0:
+                # Extend the bracket downward from the guess until a saturated pressure is found
+                P_try = 0.8 * guessMPa
+                while P_try > 0:
+                    fluid_mass, xmlout = self._get_fluid_mass_at_pressure(bulk_comp,
+                                                                          temperature, P_try)
+                    if not np.isfinite(fluid_mass):
+                        return None
+                    if fluid_mass > 0:
+                        P_lo, lo_mass, lo_xml = P_try, fluid_mass, xmlout
+                        break
+                    P_hi, hi_xml = P_try, xmlout
+                    P_try -= step
+                    step *= 2
+                fluid_mass = 0.0
+
+            # Extend the bracket upward for samples saturated at P_hi (rare, for deep samples,
+            # unless starting from a guess)
+            while fluid_mass > 0:
+                P_lo, lo_mass, lo_xml = P_hi, fluid_mass, xmlout
+                P_hi = P_lo + step
+                if P_hi > max_pressureMPa:
+                    return None
+                fluid_mass, xmlout = self._get_fluid_mass_at_pressure(bulk_comp, temperature,
+                                                                      P_hi)
+                if not np.isfinite(fluid_mass):
+                    return None
+                hi_xml = xmlout
+                step *= 2
+
+            while P_hi - P_lo > toleranceMPa:
+                P_mid = 0.5 * (P_lo + P_hi)
+                fluid_mass, xmlout = self._get_fluid_mass_at_pressure(bulk_comp, temperature,
+                                                                      P_mid)
+                if not np.isfinite(fluid_mass):
+                    return None
+                if fluid_mass > 0:
+                    P_lo, lo_mass, lo_xml = P_mid, fluid_mass, xmlout
+                else:
+                    P_hi, hi_xml = P_mid, xmlout
+        except Exception:
+            return None
+
+        if P_lo == 0:
+            # not saturated at any pressure searched, which the legacy search reports as 0 MPa
+            return 0.0, 0.0, hi_xml
+
+        return P_lo, lo_mass, lo_xml
+
+    def _saturation_pressure_stepped(self, bulk_comp, temperature):
+        """An internally used function to find the saturation pressure by stepping down (or up)
+        in pressure from 2000 MPa in 100, 10, and then 1 MPa steps.
+
+        Parameters
+        ----------
+        bulk_comp: dict or pandas Series
+            Bulk system composition in wt% oxides.
+
+        temperature: float
+            Temperature in degrees C.
+
+        Returns
+        -------
+        tuple
+            The saturation pressure in MPa, the mass of fluid at that pressure in grams, and the
+            MELTS xml output at that pressure.
+        """
+        melts.set_bulk_composition(bulk_comp)
         # Coarse search
         # NOTE that pressure is in MPa for MagmaSat calculations but reported in bars.
         pressureMPa = 2000
-
+        steps = 0
         # Check if saturated at 2000 MPa (rare, for deep samples)
         output = melts.equilibrate_tp(temperature, pressureMPa, initialize=True)
         (status, temperature, pressureMPa, xmlout) = output[0]
@@ -492,6 +1125,8 @@ class MagmaSat(model_classes.Model):
 
         if fluid_mass <= 0:  # if not sat'd at 2000 MPa
             while fluid_mass <= 0:
+                steps += 1
+                _check_search_steps(steps, "saturation pressure search")
                 pressureMPa -= 100
                 if pressureMPa <= 0:
                     break
@@ -505,10 +1140,11 @@ class MagmaSat(model_classes.Model):
 
         elif fluid_mass > 0:  # if sat'd at 2000 MPa, add pressure
             while fluid_mass > 0:
+                steps += 1
+                _check_search_steps(steps, "saturation pressure search")
                 pressureMPa += 100
 
-                melts.set_bulk_composition(_sample.get_composition(units='wtpt_oxides',
-                                                                   normalization='fixedvolatiles'))
+                melts.set_bulk_composition(bulk_comp)
                 output = melts.equilibrate_tp(temperature, pressureMPa, initialize=True)
                 (status, temperature, pressureMPa, xmlout) = output[0]
                 fluid_mass = melts.get_mass_of_phase(xmlout, phase_name='Fluid')
@@ -517,11 +1153,12 @@ class MagmaSat(model_classes.Model):
             pressureMPa -= 100
 
         # Refined search 1
-        melts.set_bulk_composition(_sample.get_composition(units='wtpt_oxides',
-                                                           normalization='fixedvolatiles'))
+        melts.set_bulk_composition(bulk_comp)
 
         if fluid_mass <= 0:  # proceed down pressure search
             while fluid_mass <= 0:
+                steps += 1
+                _check_search_steps(steps, "saturation pressure search")
                 pressureMPa -= 10
                 if pressureMPa <= 0:
                     break
@@ -535,10 +1172,11 @@ class MagmaSat(model_classes.Model):
 
         elif fluid_mass > 0:  # proceed upward pressure search
             while fluid_mass > 0:
+                steps += 1
+                _check_search_steps(steps, "saturation pressure search")
                 pressureMPa += 10
 
-                melts.set_bulk_composition(_sample.get_composition(units='wtpt_oxides',
-                                                                   normalization='fixedvolatiles'))
+                melts.set_bulk_composition(bulk_comp)
                 output = melts.equilibrate_tp(temperature, pressureMPa, initialize=True)
                 (status, temperature, pressureMPa, xmlout) = output[0]
                 fluid_mass = melts.get_mass_of_phase(xmlout, phase_name='Fluid')
@@ -547,11 +1185,12 @@ class MagmaSat(model_classes.Model):
             pressureMPa -= 10
 
         # Refined search 2
-        melts.set_bulk_composition(_sample.get_composition(units='wtpt_oxides',
-                                                           normalization='fixedvolatiles'))
+        melts.set_bulk_composition(bulk_comp)
 
         if fluid_mass <= 0:  # proceed down pressure search
             while fluid_mass <= 0:
+                steps += 1
+                _check_search_steps(steps, "saturation pressure search")
                 pressureMPa -= 1
                 if pressureMPa <= 0:
                     break
@@ -562,56 +1201,21 @@ class MagmaSat(model_classes.Model):
 
         elif fluid_mass > 0:  # proceed upward pressure search
             while fluid_mass > 0:
+                steps += 1
+                _check_search_steps(steps, "saturation pressure search")
                 pressureMPa += 1
 
-                melts.set_bulk_composition(_sample.get_composition(units='wtpt_oxides',
-                                                                   normalization='fixedvolatiles'))
+                melts.set_bulk_composition(bulk_comp)
                 output = melts.equilibrate_tp(temperature, pressureMPa, initialize=True)
                 (status, temperature, pressureMPa, xmlout) = output[0]
                 fluid_mass = melts.get_mass_of_phase(xmlout, phase_name='Fluid')
 
-        if pressureMPa != np.nan:
-            satP = pressureMPa*10  # convert pressure to bars
-            flmass = fluid_mass
-            flsystem_wtper = (100 * fluid_mass / (fluid_mass +
-                              melts.get_mass_of_phase(xmlout, phase_name='Liquid')))
-            flcomp = melts.get_composition_of_phase(xmlout, phase_name='Fluid', mode='component')
-            try:
-                flH2O = flcomp['Water']
-            except Exception:
-                flH2O = 0.0
-            try:
-                flCO2 = flcomp['Carbon Dioxide']
-            except Exception:
-                flCO2 = 0.0
-        else:
-            flmass = np.nan
-            flsystem_wtper = np.nan
-            flH2O = np.nan
-            flCO2 = np.nan
-            warnmessage = 'Calculation failed.'
-
-        melts.set_bulk_composition(self.bulk_comp_orig)  # this needs to be reset always!
-
-        if verbose is False:
-            try:
-                w.warn(warnmessage)
-            except Exception:
-                pass
-            return satP
-
-        elif verbose:
-            try:
-                w.warn(warnmessage)
-            except Exception:
-                pass
-            return {"SaturationP_bars": satP, "FluidMass_grams": flmass,
-                    "FluidProportion_wt": flsystem_wtper,
-                    "XH2O_fl": flH2O, "XCO2_fl": flCO2}
+        return pressureMPa, fluid_mass, xmlout
 
     def calculate_isobars_and_isopleths(self, sample, temperature, pressure_list,
                                         isopleth_list=None, smooth_isobars=True,
-                                        smooth_isopleths=True, print_status=True, **kwargs):
+                                        smooth_isopleths=True, print_status=True,
+                                        n_workers=None, executor=None, **kwargs):
         """
         Calculates isobars and isopleths at a constant temperature for a given sample. Isobars can
         be calculated for any number of pressures. Isobars are calculated using 5 XH2O values
@@ -647,6 +1251,19 @@ class MagmaSat(model_classes.Model):
             OPTIONAL: Default is True. If set to True, progress of the calculations will be
             printed to the terminal.
 
+        n_workers: int
+            OPTIONAL: Default is None, in which case isobars are calculated one after another in
+            this process. If an int greater than 1 is passed, isobars at different pressures are
+            calculated concurrently in that many worker processes, each with its own MELTS
+            instance. Points along each isobar are still calculated in order of increasing
+            XH2Ofluid, each starting from the dissolved H2O of the previous point. Scripts using
+            this option must run the calculation under `if __name__ == '__main__':`.
+
+        executor: concurrent.futures.Executor
+            OPTIONAL: Default is None. An existing executor (e.g., a ProcessPoolExecutor) in
+            which to calculate isobars, in place of the one created with n_workers. It is not
+            shut down after the calculation.
+
         Returns
         -------
         pandas DataFrame objects
@@ -667,7 +1284,7 @@ class MagmaSat(model_classes.Model):
                                   "list of those [1000, 2000.0, 3000].")
 
         if isopleth_list is None:
-            pass
+            iso_vals = []
         elif isinstance(isopleth_list, list):
             iso_vals = isopleth_list
         else:
@@ -680,42 +1297,42 @@ class MagmaSat(model_classes.Model):
         all_iso_vals = list(dict.fromkeys(all_iso_vals))  # remove duplicates
         all_iso_vals.sort()  # sort from smallest to largest
 
+        # Calculate equilibrium phase assemblage for all P/T conditions, check if saturated in
+        # fluid...
+        if executor is None and (n_workers is None or n_workers <= 1):
+            isobar_results = [self._calculate_isobar(_sample, temperature, i, all_iso_vals,
+                                                     iso_vals, print_status) for i in P_vals]
+        else:
+            # MELTS is not fork-safe, so worker processes are spawned fresh
+            if executor is None:
+                pool = ProcessPoolExecutor(max_workers=n_workers,
+                                           mp_context=multiprocessing.get_context('spawn'),
+                                           initializer=_initialize_worker, initargs=(_engine,))
+            else:
+                pool = executor
+            try:
+                futures = [pool.submit(_calculate_isobar, _sample, temperature, i, all_iso_vals)
+                           for i in P_vals]
+                isobar_results = []
+                for i, future in zip(P_vals, futures):
+                    isobar_results.append(future.result())
+                    if print_status:
+                        print("Calculated isobar at " + str(i) + " bars")
+            finally:
+                if executor is None:
+                    pool.shutdown()
+
         isobar_data = []
         isopleth_data = []
         for X in iso_vals:
             isopleth_data.append([X, 0.0, 0.0])
-        # Calculate equilibrium phase assemblage for all P/T conditions, check if saturated in
-        # fluid...
-        for i in P_vals:
-            guess = 0.0
-            if print_status:
-                print("Calculating isobar at " + str(i) + " bars")
-            X_iter = 0
-            for X in all_iso_vals:
-                X_iter += 1
-                if print_status:
-                    if isopleth_list is not None and X in iso_vals:
-                        sys.stdout.write("\r Calculating isopleth at XH2Ofluid = " + str(X) +
-                                         "               ")
-                    if X not in iso_vals:
-                        sys.stdout.write("\r Calculating isobar control point at XH2Ofluid = " +
-                                         str(X) + "               ")
-                    if X_iter == len(all_iso_vals):
-                        sys.stdout.write("\r done.                                               "
-                                         "                                                       "
-                                         "                     \n")
-                saturated_vols = self.calculate_dissolved_volatiles(sample=_sample,
-                                                                    temperature=temperature,
-                                                                    pressure=i,
-                                                                    H2O_guess=guess, X_fluid=X)
-
+        for i, isobar in zip(P_vals, isobar_results):
+            for X, saturated_vols in zip(all_iso_vals, isobar):
                 if X in required_iso_vals:
                     isobar_data.append([i, saturated_vols['H2O_liq'], saturated_vols['CO2_liq']])
                 if X in iso_vals:
                     isopleth_data.append([X, saturated_vols['H2O_liq'], saturated_vols['CO2_liq']])
 
-                guess = saturated_vols['H2O_liq']
-
         if print_status:
             print("Done!")
 
@@ -738,8 +1355,69 @@ class MagmaSat(model_classes.Model):
 
         return res_isobars, res_isopleths
 
+    def _calculate_isobar(self, sample, temperature, pressure, X_vals, iso_vals=[],
+                          print_status=False):
+        """An internally used function to calculate dissolved volatiles at one pressure for a
+        series of fluid compositions. Each calculation starts from the dissolved H2O found for
+        the previous fluid composition.
+
+        Parameters
+        ----------
+        sample: Sample class
+            Magma major element composition.
+
+        temperature: float
+            Temperature in degrees C.
+
+        pressure: float
+            Pressure in bars.
+
+        X_vals: list
+            Fluid compositions, in mole fraction H2O, sorted from smallest to largest.
+
+        iso_vals: list
+            OPTIONAL: Default is []. Fluid compositions in X_vals at which isopleths are being
+            calculated. Only used when printing progress.
+
+        print_status: bool
+            OPTIONAL: Default is False. If set to True, progress of the calculations will be
+            printed to the terminal.
+
+        Returns
+        -------
+        list
+            The result of calculate_dissolved_volatiles for each value in X_vals.
+        """
+        guess = 0.0
+        if print_status:
+            print("Calculating isobar at " + str(pressure) + " bars")
+        results = []
+        X_iter = 0
+        for X in X_vals:
+            X_iter += 1
+            if print_status:
+                if X in iso_vals:
+                    sys.stdout.write("\r Calculating isopleth at XH2Ofluid = " + str(X) +
+                                     "               ")
+                if X not in iso_vals:
+                    sys.stdout.write("\r Calculating isobar control point at XH2Ofluid = " +
+                                     str(X) + "               ")
+                if X_iter == len(X_vals):
+                    sys.stdout.write("\r done.                                               "
+                                     "                                                       "
+                                     "                     \n")
+            saturated_vols = self.calculate_dissolved_volatiles(sample=sample,
+                                                                temperature=temperature,
+                                                                pressure=pressure,
+                                                                H2O_guess=guess, X_fluid=X)
+            results.append(saturated_vols)
+            guess = saturated_vols['H2O_liq']
+
+        return results
+
     def calculate_degassing_path(self, sample, temperature, pressure='saturation',
-                                 fractionate_vapor=0.0, init_vapor=0.0, steps=50, **kwargs):
+                                 fractionate_vapor=0.0, init_vapor=0.0, steps=50,
+                                 step_tolerance=None, **kwargs):
         """
         Calculates degassing path for one sample
 
@@ -778,13 +1456,28 @@ class MagmaSat(model_classes.Model):
 
         steps: int
             OPTIONAL. Default value is 50. Specifies the number of steps in pressure space at
-            which dissolved volatile concentrations are calculated.
+            which dissolved volatile concentrations are calculated. If step_tolerance is passed,
+            this sets only the size of the first step.
+
+        step_tolerance: float
+            OPTIONAL. Default value is None, in which case pressure steps are evenly spaced. If a
+            float is passed, the size of each pressure step is chosen adaptively: a step is
+            accepted only if neither the dissolved H2O nor the dissolved CO2 concentration
+            changes by more than step_tolerance times its concentration at the start of the path
+            (e.g., 0.02 for 2%). Otherwise the step is halved and repeated. Steps are doubled
+            after any step that changes both by less than half that amount, and are never
+            smaller than 0.1 MPa (1 bar). Steps are thus small where the dissolved volatile
+            concentrations change quickly (typically near saturation and at low pressure) and
+            large elsewhere.
 
         Returns
         -------
         pandas DataFrame object
 
         """
+        if step_tolerance is not None and step_tolerance <= 0:
+            raise core.InputError("step_tolerance must be greater than 0.")
+
         sys.stdout.write("Finding saturation point... ")  # print start of calculation to terminal
         _sample = self.preprocess_sample(sample)
 
@@ -794,17 +1487,11 @@ class MagmaSat(model_classes.Model):
         _sample_dict = _sample.get_composition()
 
         # ------ RESET MELTS ------ #
-        # MELTS needs to be reloaded here. If an unfeasible composition gets set inside of MELTS,
-        # which can happen when running open-system degassing path calcs, the following calls to
-        # MELTS will fail. This prevents that from happening.
-        melts = equilibrate.MELTSmodel('1.2.0')
-
-        # Suppress phases not required in the melts simulation
-        phases = melts.get_phase_names()
-        for phase in phases:
-            melts.set_phase_inclusion_status({phase: False})
-        melts.set_phase_inclusion_status({'Fluid': True, 'Liquid': True})
-
+        # If an unfeasible composition gets set inside of MELTS, which can happen when running
+        # open-system degassing path calcs, the following calls to MELTS will fail. The MELTS
+        # instance used here is reloaded if any previous calculation with it failed.
+        melts = degassing_melts
+        melts.reset()
         melts.set_bulk_composition(_sample_dict)
         # ------------------------- #
 
@@ -826,7 +1513,10 @@ class MagmaSat(model_classes.Model):
         P_array = -np.sort(-P_array)
         fl_wtper = data["FluidProportion_wt"]
 
+        search_steps = 0
         while fl_wtper <= init_vapor:
+            search_steps += 1
+            _check_search_steps(search_steps, "search for init_vapor")
             output = melts.equilibrate_tp(temperature, SatP_MPa, initialize=True)
             (status, temperature, p, xmlout) = output[0]
             fl_mass = melts.get_mass_of_phase(xmlout, phase_name='Fluid')
@@ -845,70 +1535,136 @@ class MagmaSat(model_classes.Model):
             _sample_dict = _sample.get_composition(normalization='standard', units="wtpt_oxides")
             melts.set_bulk_composition(_sample_dict)  # reset MELTS
 
-        pressure = []
-        H2Oliq = []
-        CO2liq = []
-        H2Ofl = []
-        CO2fl = []
-        fluid_wtper = []
-        iterno = 0
+        path = []
         sys.stdout.write("\r")  # carriage return to remove previous printed text
-        for i in P_array:
-            # Handle status_bar
-            iterno += 1
-            percent = iterno/len(P_array)
-            batchfile.status_bar.status_bar(percent, btext="Calculating degassing path...")
-
-            fl_mass = 0.0
-            melts.set_bulk_composition(_sample_dict)
-            output = melts.equilibrate_tp(temperature, i, initialize=True)
-            (status, temperature, p, xmlout) = output[0]
-            liq_comp = melts.get_composition_of_phase(xmlout, phase_name='Liquid')
-            fl_comp = melts.get_composition_of_phase(xmlout, phase_name='Fluid', mode='component')
-            liq_mass = melts.get_mass_of_phase(xmlout, phase_name='Liquid')
-            fl_mass = melts.get_mass_of_phase(xmlout, phase_name='Fluid')
-            fl_wtper = 100 * fl_mass / (fl_mass+liq_mass)
-
-            if fl_mass > 0:
-                pressure.append(p * 10.0)
-                try:
-                    H2Oliq.append(liq_comp["H2O"])
-                except Exception:
-                    H2Oliq.append(0)
-                try:
-                    CO2liq.append(liq_comp["CO2"])
-                except Exception:
-                    CO2liq.append(0)
-                try:
-                    H2Ofl.append(fl_comp["Water"])
-                except Exception:
-                    H2Ofl.append(0)
-                try:
-                    CO2fl.append(fl_comp["Carbon Dioxide"])
-                except Exception:
-                    CO2fl.append(0)
-                fluid_wtper.append(fl_wtper)
-
-                try:
-                    _sample_dict["H2O"] = (liq_comp["H2O"] + (_sample_dict["H2O"] -
-                                           liq_comp["H2O"]) * (1.0-fractionate_vapor))
-                except Exception:
-                    _sample_dict["H2O"] = 0
-                try:
-                    _sample_dict["CO2"] = (liq_comp["CO2"] + (_sample_dict["CO2"] -
-                                           liq_comp["CO2"]) * (1.0-fractionate_vapor))
-                except Exception:
-                    _sample_dict["CO2"] = 0
-            _sample = sample_class.Sample(_sample_dict)
-            _sample_dict = _sample.get_composition(normalization='standard', units='wtpt_oxides')
+        if step_tolerance is None:
+            for iterno, i in enumerate(P_array):
+                # Handle status_bar
+                percent = (iterno + 1)/len(P_array)
+                batchfile.status_bar.status_bar(percent, btext="Calculating degassing path...")
+
+                (step_result, _sample_dict) = self._calculate_degassing_step(
+                                                melts, _sample_dict, temperature, i,
+                                                fractionate_vapor)
+                if step_result is not None:
+                    path.append(step_result)
+        else:
+            # Changes in dissolved volatiles are measured relative to their initial values
+            scale = {volatile: _sample_dict[volatile] for volatile in ['H2O', 'CO2']
+                     if _sample_dict[volatile] > 0}
+            previous = {volatile: _sample_dict[volatile] for volatile in scale.keys()}
+            min_step = 0.1
+            P_step = max(SatP_MPa / steps, min_step)
+            P_current = SatP_MPa
+            while P_current > 1.0:
+                P_next = max(P_current - P_step, 1.0)
+                (step_result, new_sample_dict) = self._calculate_degassing_step(
+                                                melts, _sample_dict, temperature, P_next,
+                                                fractionate_vapor)
+                if step_result is not None:
+                    error = max([abs(step_result[volatile + '_liq'] - previous[volatile]) /
+                                 scale[volatile] for volatile in scale.keys()] + [0.0])
+                    if error > step_tolerance and P_step > min_step:
+                        P_step = max(P_step / 2.0, min_step)
+                        continue
+                    path.append(step_result)
+                    previous = {volatile: step_result[volatile + '_liq']
+                                for volatile in scale.keys()}
+                    if error < step_tolerance / 2.0:
+                        P_step *= 2.0
+
+                _sample_dict = new_sample_dict
+                P_current = P_next
+
+                # Handle status_bar
+                percent = (SatP_MPa - P_current) / (SatP_MPa - 1.0)
+                batchfile.status_bar.status_bar(percent, btext="Calculating degassing path...")
 
         melts.set_bulk_composition(self.bulk_comp_orig)  # this needs to be reset always!
-        open_degassing_df = pd.DataFrame(list(zip(pressure, H2Oliq, CO2liq, H2Ofl,
-                                                  CO2fl, fluid_wtper)),
-                                         columns=['Pressure_bars', 'H2O_liq', 'CO2_liq',
-                                                  'XH2O_fl', 'XCO2_fl', 'FluidProportion_wt'])
+        open_degassing_df = pd.DataFrame(path, columns=['Pressure_bars', 'H2O_liq', 'CO2_liq',
+                                                        'XH2O_fl', 'XCO2_fl',
+                                                        'FluidProportion_wt'])
 
         open_degassing_df = open_degassing_df[open_degassing_df.CO2_liq > 0.000001]
         open_degassing_df = open_degassing_df[open_degassing_df.H2O_liq > 0.000001]
 
         return open_degassing_df
+
+    def _calculate_degassing_step(self, melts, sample_dict, temperature, pressureMPa,
+                                  fractionate_vapor):
+        """An internally used function to calculate one pressure step of a degassing path.
+
+        Parameters
+        ----------
+        melts: thermoengine.equilibrate.MELTSmodel
+            MELTS instance with which to calculate.
+
+        sample_dict: dict
+            Bulk system composition in wt% oxides at the start of the step. Not modified.
+
+        temperature: float
+            Temperature in degrees C.
+
+        pressureMPa: float
+            Pressure of the step in MPa.
+
+        fractionate_vapor: float
+            Proportion of vapor removed at this step.
+
+        Returns
+        -------
+        tuple
+            A dict of the calculated values (or None if the sample is not fluid-saturated at
+            this pressure), and the normalized bulk system composition in wt% oxides after
+            vapor has been removed.
+        """
+        sample_dict = dict(sample_dict)
+        melts.set_bulk_composition(sample_dict)
+        output = melts.equilibrate_tp(temperature, pressureMPa, initialize=True)
+        (status, temperature, p, xmlout) = output[0]
+        liq_comp = melts.get_composition_of_phase(xmlout, phase_name='Liquid')
+        fl_comp = melts.get_composition_of_phase(xmlout, phase_name='Fluid', mode='component')
+        liq_mass = melts.get_mass_of_phase(xmlout, phase_name='Liquid')
+        fl_mass = melts.get_mass_of_phase(xmlout, phase_name='Fluid')
+        fl_wtper = 100 * fl_mass / (fl_mass+liq_mass)
+
+        step_result = None
+        if fl_mass > 0:
+            step_result = {'Pressure_bars': p * 10.0, 'FluidProportion_wt': fl_wtper}
+            try:
+                step_result['H2O_liq'] = liq_comp["H2O"]
+            except Exception:
+                step_result['H2O_liq'] = 0
+            try:
+                step_result['CO2_liq'] = liq_comp["CO2"]
+            except Exception:
+                step_result['CO2_liq'] = 0
+            try:
+                step_result['XH2O_fl'] = fl_comp["Water"]
+            except Exception:
+                step_result['XH2O_fl'] = 0
+            try:
+                step_result['XCO2_fl'] = fl_comp["Carbon Dioxide"]
+            except Exception:
+                step_result['XCO2_fl'] = 0
+
+            try:
+                sample_dict["H2O"] = (liq_comp["H2O"] + (sample_dict["H2O"] -
+                                      liq_comp["H2O"]) * (1.0-fractionate_vapor))
+            except Exception:
+                sample_dict["H2O"] = 0
+            try:
+                sample_dict["CO2"] = (liq_comp["CO2"] + (sample_dict["CO2"] -
+                                      liq_comp["CO2"]) * (1.0-fractionate_vapor))
+            except Exception:
+                sample_dict["CO2"] = 0
+        _sample = sample_class.Sample(sample_dict)
+        sample_dict = _sample.get_composition(normalization='standard', units='wtpt_oxides')
+
+        return step_result, sample_dict
+
+
+def _calculate_isobar(sample, temperature, pressure, X_vals):
+    """Calculates one isobar with MagmaSat. Module-level so that it can be sent to worker
+    processes."""
+    return MagmaSat()._calculate_isobar(sample, temperature, pressure, X_vals)
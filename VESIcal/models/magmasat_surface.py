@@ -0,0 +1,686 @@
+from VESIcal import activity_models
+from VESIcal import calibration_checks
+from VESIcal import core
+from VESIcal import fugacity_models
+from VESIcal import model_classes
+from VESIcal import batchfile  # needed for status_bar functions
+from VESIcal.models import magmasat
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+import pandas as pd
+from scipy.optimize import brentq
+import warnings as w
+
+# Fluid compositions (mole fraction H2O) at which surfaces are calculated by default
+default_X_fluid = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+
+
+class MagmaSatSurface(model_classes.Model):
+    """
+    MagmaSat dissolved volatile concentrations precomputed on a temperature-pressure-XH2Ofluid
+    grid for one magma composition, and interpolated. It implements the same interface as the
+    MagmaSat model, so it can be passed as the model to VESIcal's calculate functions, but each
+    calculation costs microseconds rather than seconds. Results are only valid for the
+    composition the grid was calculated for, and within the grid.
+
+    Surfaces are calculated with calculate_surface(), and can be saved to (and read from) a
+    compressed binary file with save() and load_surface().
+
+    Dissolved volatiles are interpolated linearly in temperature, pressure, and XH2Ofluid. H2O
+    is interpolated as its square, which, like dissolved CO2, varies close to linearly with
+    pressure and fluid composition (dissolved H2O goes roughly as the square root of the H2O
+    fugacity). Equilibrium fluid compositions are found by mass balance between the interpolated
+    liquid and the fluid.
+
+    The saturation pressure of the sample the surface was calculated for is precomputed with
+    MagmaSat at each of the grid's temperatures, and interpolated linearly in temperature.
+    Saturation pressures for other H2O and CO2 concentrations (e.g., along a degassing path) are
+    not on the grid, and are found instead by locating the isobar that passes through the
+    sample's H2O and CO2 concentrations.
+    """
+
+    def __init__(self, temperature, pressure, X_fluid, H2O_liq, CO2_liq, composition,
+                 holdout=None, volatiles=None, SaturationP=None, saturation_XH2O_fl=None,
+                 melts_version='1.2.0'):
+        """
+        Parameters
+        ----------
+        temperature: list or numpy array
+            Temperatures of the grid, in degrees C, in increasing order.
+
+        pressure: list or numpy array
+            Pressures of the grid, in bars, in increasing order.
+
+        X_fluid: list or numpy array
+            Fluid compositions of the grid, in mole fraction H2O, in increasing order.
+
+        H2O_liq: numpy array
+            Dissolved H2O in wt%, with shape (len(temperature), len(pressure), len(X_fluid)).
+
+        CO2_liq: numpy array
+            Dissolved CO2 in wt%, with the same shape as H2O_liq.
+
+        composition: dict or pandas Series
+            The anhydrous composition, in wt% oxides, the grid was calculated for.
+
+        holdout: pandas DataFrame
+            OPTIONAL: Default is None. MagmaSat results at points not on the grid, against which
+            the interpolation error is measured. Columns are 'Temperature', 'Pressure',
+            'XH2O_fl', 'H2O_liq', and 'CO2_liq'.
+
+        volatiles: dict
+            OPTIONAL: Default is None. The H2O and CO2 concentrations, in wt% after
+            'fixedvolatiles' normalization, of the sample whose saturation pressures are given
+            by SaturationP, with keys 'H2O' and 'CO2'.
+
+        SaturationP: list or numpy array
+            OPTIONAL: Default is None. MagmaSat saturation pressures, in bars, of the sample with
+            the given volatiles, at each of the grid's temperatures. NaN where they could not be
+            calculated.
+
+        saturation_XH2O_fl: list or numpy array
+            OPTIONAL: Default is None. The mole fraction of H2O in the fluid at each of those
+            saturation pressures.
+
+        melts_version: str
+            OPTIONAL: Default is '1.2.0'. The version of MELTS the grid was calculated with.
+        """
+        self.temperature = np.array(temperature, dtype=float)
+        self.pressure = np.array(pressure, dtype=float)
+        self.X_fluid = np.array(X_fluid, dtype=float)
+        self.H2O_liq = np.array(H2O_liq, dtype=float)
+        self.CO2_liq = np.array(CO2_liq, dtype=float)
+
+        shape = (len(self.temperature), len(self.pressure), len(self.X_fluid))
+        if self.H2O_liq.shape != shape or self.CO2_liq.shape != shape:
+            raise core.InputError("H2O_liq and CO2_liq must have shape (len(temperature), "
+                                  "len(pressure), len(X_fluid)).")
+        for name, axis in [('temperature', self.temperature), ('pressure', self.pressure),
+                           ('X_fluid', self.X_fluid)]:
+            if np.any(np.diff(axis) <= 0):
+                raise core.InputError(name + " values must be in increasing order.")
+
+        self.composition = pd.Series(_anhydrous_composition(composition))
+        if holdout is None:
+            holdout = pd.DataFrame(columns=['Temperature', 'Pressure', 'XH2O_fl', 'H2O_liq',
+                                            'CO2_liq'])
+        self.holdout = holdout
+
+        if volatiles is None or SaturationP is None:
+            self.volatiles = None
+            self.SaturationP = None
+            self.saturation_XH2O_fl = None
+        else:
+            self.volatiles = {'H2O': float(volatiles['H2O']), 'CO2': float(volatiles['CO2'])}
+            self.SaturationP = np.array(SaturationP, dtype=float)
+            if saturation_XH2O_fl is None:
+                saturation_XH2O_fl = np.full(len(self.temperature), np.nan)
+            self.saturation_XH2O_fl = np.array(saturation_XH2O_fl, dtype=float)
+            if (self.SaturationP.shape != self.temperature.shape or
+                    self.saturation_XH2O_fl.shape != self.temperature.shape):
+                raise core.InputError("SaturationP and saturation_XH2O_fl must have one value "
+                                      "for each temperature.")
+        self.melts_version = melts_version
+
+        self.set_volatile_species(['H2O', 'CO2'])
+        self.set_fugacity_model(fugacity_models.fugacity_idealgas())
+        self.set_activity_model(activity_models.activity_idealsolution())
+        self.set_calibration_ranges([
+            calibration_checks.CalibrationRange(
+                'pressure', [self.pressure[0], self.pressure[-1]], calibration_checks.crf_Between,
+                'bar', 'MagmaSatSurface',
+                fail_msg=calibration_checks.crmsg_Between_fail,
+                pass_msg=calibration_checks.crmsg_Between_pass,
+                description_msg=calibration_checks.crmsg_Between_description),
+            calibration_checks.CalibrationRange(
+                'temperature', [self.temperature[0], self.temperature[-1]],
+                calibration_checks.crf_Between, 'oC', 'MagmaSatSurface',
+                fail_msg=calibration_checks.crmsg_Between_fail,
+                pass_msg=calibration_checks.crmsg_Between_pass,
+                description_msg=calibration_checks.crmsg_Between_description)])
+        self.model_type = 'MagmaSatSurface'
+
+    def save(self, path):
+        """
+        Saves the surface, including any precomputed saturation pressures, to a compressed
+        binary (numpy .npz) file.
+
+        Parameters
+        ----------
+        path: str
+            Path of the file to write. numpy appends '.npz' if it is not given.
+        """
+        np.savez_compressed(path, temperature=self.temperature, pressure=self.pressure,
+                            X_fluid=self.X_fluid, H2O_liq=self.H2O_liq, CO2_liq=self.CO2_liq,
+                            oxides=np.array(self.composition.index, dtype=str),
+                            composition=self.composition.values.astype(float),
+                            holdout=self.holdout[['Temperature', 'Pressure', 'XH2O_fl',
+                                                  'H2O_liq', 'CO2_liq']].values.astype(float),
+                            volatiles=(np.array([self.volatiles['H2O'], self.volatiles['CO2']])
+                                       if self.volatiles is not None else np.zeros(0)),
+                            SaturationP=(self.SaturationP if self.SaturationP is not None
+                                         else np.zeros(0)),
+                            saturation_XH2O_fl=(self.saturation_XH2O_fl
+                                                if self.saturation_XH2O_fl is not None
+                                                else np.zeros(0)),
+                            melts_version=np.array(self.melts_version))
+
+    def get_interpolation_error(self):
+        """
+        Returns the largest difference between the interpolated and the MagmaSat dissolved
+        volatile concentrations at the held-out points.
+
+        Returns
+        -------
+        dict
+            Maximum absolute errors in wt% with keys 'H2O_liq' and 'CO2_liq', and the number
+            of held-out points with key 'n_points'. Errors are NaN if there are no held-out
+            points.
+        """
+        errors = self.get_holdout_errors()
+        if len(errors) == 0:
+            return {'H2O_liq': np.nan, 'CO2_liq': np.nan, 'n_points': 0}
+        return {'H2O_liq': float(errors['H2O_liq_error'].abs().max()),
+                'CO2_liq': float(errors['CO2_liq_error'].abs().max()),
+                'n_points': len(errors)}
+
+    def get_holdout_errors(self):
+        """
+        Returns the held-out points with the interpolated dissolved volatile concentrations and
+        their differences from the MagmaSat values.
+
+        Returns
+        -------
+        pandas DataFrame
+            The holdout DataFrame with additional columns 'H2O_liq_surface', 'CO2_liq_surface',
+            'H2O_liq_error', and 'CO2_liq_error', all in wt%.
+        """
+        errors = self.holdout.copy()
+        H2O_surface = []
+        CO2_surface = []
+        for index, row in errors.iterrows():
+            isobar = self._isobar(row['Temperature'], row['Pressure'])
+            (H2O_liq, CO2_liq) = self._interpolate_X_fluid(isobar, row['XH2O_fl'])
+            H2O_surface.append(H2O_liq)
+            CO2_surface.append(CO2_liq)
+        errors['H2O_liq_surface'] = np.array(H2O_surface, dtype=float)
+        errors['CO2_liq_surface'] = np.array(CO2_surface, dtype=float)
+        errors['H2O_liq_error'] = errors['H2O_liq_surface'] - errors['H2O_liq'].astype(float)
+        errors['CO2_liq_error'] = errors['CO2_liq_surface'] - errors['CO2_liq'].astype(float)
+        return errors
+
+    def check_composition(self, sample, tolerance=0.01):
+        """
+        Warns if the anhydrous composition of sample differs from the composition the surface
+        was calculated for.
+
+        Parameters
+        ----------
+        sample: Sample class
+            Magma major element composition.
+
+        tolerance: float
+            OPTIONAL: Default is 0.01. The largest difference, in wt% of the anhydrous
+            composition, allowed for any oxide.
+
+        Returns
+        -------
+        bool
+            True if the compositions match, False if not.
+        """
+        composition = pd.Series(_anhydrous_composition(
+                                    sample.get_composition(units='wtpt_oxides')))
+        difference = composition.subtract(self.composition, fill_value=0.0).abs().max()
+        if difference > tolerance:
+            w.warn("The composition of the sample differs from the composition the "
+                   "MagmaSatSurface was calculated for, by up to " +
+                   "{:.3f}".format(difference) + " wt%. Results are those for the "
+                   "surface's composition.", RuntimeWarning, stacklevel=2)
+            return False
+        return True
+
+    def calculate_dissolved_volatiles(self, sample, temperature, pressure, X_fluid=1,
+                                      verbose=False, **kwargs):
+        """
+        Interpolates the amount of H2O and CO2 dissolved in the magma at saturation at the given
+        P/T conditions and fluid composition.
+
+        Parameters
+        ----------
+        sample:     Sample class
+            Magma major element composition. It should be the composition the surface was
+            calculated for.
+
+        temperature: float or int
+            Temperature, in degrees C.
+
+        pressure: float or int
+            Pressure, in bars.
+
+        X_fluid: float or int
+            The default value is 1. The mole fraction of H2O in the H2O-CO2 fluid.
+
+        verbose: bool
+            OPTIONAL: Default is False. If set to True, the temperature, pressure, and fluid
+            composition (XH2O_fl and XCO2_fl) are returned as well.
+
+        Returns
+        -------
+        dict
+            A dictionary of dissolved volatile concentrations in wt% with keys H2O_liq and
+            CO2_liq.
+        """
+        self.check_composition(sample)
+        X_fluid = float(X_fluid)
+        if X_fluid < self.X_fluid[0] or X_fluid > self.X_fluid[-1]:
+            raise core.InputError("X_fluid must be within the surface's range of " +
+                                  str(self.X_fluid[0]) + "-" + str(self.X_fluid[-1]) + ".")
+        isobar = self._isobar(temperature, pressure)
+        (H2O_liq, CO2_liq) = self._interpolate_X_fluid(isobar, X_fluid)
+
+        if verbose:
+            return {"temperature": temperature, "pressure": pressure,
+                    "H2O_liq": H2O_liq, "CO2_liq": CO2_liq,
+                    "XH2O_fl": X_fluid, "XCO2_fl": 1.0 - X_fluid}
+        return {"CO2_liq": CO2_liq, "H2O_liq": H2O_liq}
+
+    def calculate_equilibrium_fluid_comp(self, sample, temperature, pressure, **kwargs):
+        """
+        Returns the mole fractions of H2O and CO2 in a fluid in equilibrium with the given
+        sample at the given P/T condition. The fluid composition is that for which the
+        interpolated liquid and the fluid together hold the sample's H2O and CO2.
+
+        Parameters
+        ----------
+        sample:     Sample class
+            Magma composition, including its H2O and CO2 concentrations.
+
+        temperature: float or int
+            Temperature, in degrees C.
+
+        pressure: float or int
+            Pressure, in bars.
+
+        Returns
+        -------
+        dict
+            A dictionary of fluid composition in mole fraction with keys 'H2O' and 'CO2'. Both
+            are 0 if the sample is not saturated at the given conditions.
+        """
+        self.check_composition(sample)
+        bulk_comp = sample.get_composition(units='wtpt_oxides', normalization='none')
+        total = bulk_comp.sum()
+        H2O = 100.0 * bulk_comp.get('H2O', 0.0) / total
+        CO2 = 100.0 * bulk_comp.get('CO2', 0.0) / total
+
+        # As in MagmaSat, a single volatile species forms a pure fluid
+        if H2O == 0 and CO2 == 0:
+            return {'CO2': 0.0, 'H2O': 0.0}
+        if H2O == 0:
+            return {'CO2': 1.0, 'H2O': 0.0}
+        if CO2 == 0:
+            return {'CO2': 0.0, 'H2O': 1.0}
+
+        isobar = self._isobar(temperature, pressure)
+        (X_ray, excess) = self._saturation_excess(isobar, H2O, CO2)
+        if X_ray is None or excess >= 0:
+            return {'CO2': 0.0, 'H2O': 0.0}
+
+        def mass_balance(X):
+            (H2O_liq, CO2_liq) = self._interpolate_X_fluid(isobar, X)
+            fluid_fraction = (H2O + CO2 - H2O_liq - CO2_liq) / (100.0 - H2O_liq - CO2_liq)
+            H2O_fl = 100.0 * _fluid_H2O_mass_fraction(X)
+            return (1 - fluid_fraction) * H2O_liq + fluid_fraction * H2O_fl - H2O
+
+        try:
+            X = brentq(mass_balance, self.X_fluid[0], self.X_fluid[-1])
+        except ValueError:
+            # The fluid composition lies outside the surface's range; the fluid is taken to be
+            # in vanishingly small quantity
+            X = X_ray
+        return {'CO2': 1.0 - X, 'H2O': X}
+
+    def calculate_saturation_pressure(self, sample, temperature, verbose=False, **kwargs):
+        """
+        Interpolates the saturation pressure of a sample composition. If the sample's H2O and
+        CO2 concentrations are those the surface's saturation pressures were precomputed for,
+        the precomputed MagmaSat saturation pressures are interpolated in temperature.
+        Otherwise, the saturation pressure is found where the sample lies on the interpolated
+        isobars, by root finding on pressure between the grid's isobars.
+
+        Parameters
+        ----------
+        sample:     Sample class
+            Magma composition, including its H2O and CO2 concentrations.
+
+        temperature: float or int
+            Temperature of the sample in degrees C.
+
+        verbose: bool
+            OPTIONAL: Default is False. If set to True, the saturation pressure and the mole
+            fractions of H2O and CO2 in the first fluid to form (XH2O_fl and XCO2_fl) are
+            returned in a dict.
+
+        Returns
+        -------
+        float or dict
+            If verbose is set to False: Saturation pressure in bars. NaN if the saturation
+            pressure is outside of the surface's pressure range and was not precomputed.
+            If verbose is set to True: dict of all calculated values.
+        """
+        self.check_composition(sample)
+        bulk_comp = sample.get_composition(units='wtpt_oxides', normalization='fixedvolatiles')
+        H2O = bulk_comp.get('H2O', 0.0)
+        CO2 = bulk_comp.get('CO2', 0.0)
+
+        if (self.volatiles is not None and abs(H2O - self.volatiles['H2O']) <= 1e-6 and
+                abs(CO2 - self.volatiles['CO2']) <= 1e-6):
+            (iT, fT) = _interpolation_weights(self.temperature, temperature, 'temperature')
+            iT1 = min(iT + 1, len(self.temperature) - 1)
+            satP = (1 - fT) * self.SaturationP[iT] + fT * self.SaturationP[iT1]
+            X = (1 - fT) * self.saturation_XH2O_fl[iT] + fT * self.saturation_XH2O_fl[iT1]
+            if not np.isnan(satP):
+                if verbose:
+                    return {"SaturationP_bars": float(satP), "XH2O_fl": float(X),
+                            "XCO2_fl": 1.0 - float(X)}
+                return float(satP)
+
+        def excess(pressure):
+            return self._saturation_excess(self._isobar(temperature, pressure), H2O, CO2)
+
+        satP = np.nan
+        X = np.nan
+        if H2O + CO2 <= 0:
+            w.warn("The sample contains no H2O or CO2.", RuntimeWarning, stacklevel=2)
+        else:
+            excesses = [excess(pressure)[1] for pressure in self.pressure]
+            if np.isnan(excesses).any():
+                w.warn("The fluid in equilibrium with the sample is outside the surface's range "
+                       "of X_fluid.", RuntimeWarning, stacklevel=2)
+            elif excesses[0] >= 0:
+                w.warn("The saturation pressure is below the surface's pressure range.",
+                       RuntimeWarning, stacklevel=2)
+            elif excesses[-1] < 0:
+                w.warn("The saturation pressure is above the surface's pressure range.",
+                       RuntimeWarning, stacklevel=2)
+            else:
+                i = np.argmax(np.array(excesses) >= 0)
+                satP = brentq(lambda pressure: excess(pressure)[1], self.pressure[i - 1],
+                              self.pressure[i], xtol=1e-6)
+                X = excess(satP)[0]
+
+        if verbose:
+            return {"SaturationP_bars": satP, "XH2O_fl": X, "XCO2_fl": 1.0 - X}
+        return satP
+
+    def _isobar(self, temperature, pressure):
+        """An internally used function which interpolates the squared dissolved H2O and the
+        dissolved CO2, in wt%, at each of the surface's fluid compositions, at the given
+        temperature and pressure."""
+        (iT, fT) = _interpolation_weights(self.temperature, temperature, 'temperature')
+        (iP, fP) = _interpolation_weights(self.pressure, pressure, 'pressure')
+        values = []
+        for grid in [self.H2O_liq**2, self.CO2_liq]:
+            low = (1 - fP) * grid[iT, iP] + fP * grid[iT, min(iP + 1, len(self.pressure) - 1)]
+            iT1 = min(iT + 1, len(self.temperature) - 1)
+            high = (1 - fP) * grid[iT1, iP] + fP * grid[iT1, min(iP + 1, len(self.pressure) - 1)]
+            values.append((1 - fT) * low + fT * high)
+        return tuple(values)
+
+    def _interpolate_X_fluid(self, isobar, X_fluid):
+        """An internally used function which interpolates the dissolved H2O and CO2, in wt%, at
+        the given fluid composition along an isobar returned by _isobar."""
+        (H2O_squared, CO2_vals) = isobar
+        return (float(np.sqrt(max(np.interp(X_fluid, self.X_fluid, H2O_squared), 0.0))),
+                float(np.interp(X_fluid, self.X_fluid, CO2_vals)))
+
+    def _saturation_excess(self, isobar, H2O, CO2):
+        """An internally used function which finds where an isobar crosses the line from the
+        origin through the sample's H2O and CO2 concentrations (in wt%), and returns the fluid
+        composition there and the total dissolved volatiles on the isobar less those in the
+        sample. The excess is negative if the sample is saturated. Returns (None, NaN) if the
+        isobar does not cross the line within the surface's range of X_fluid."""
+        def crossing(X):
+            # Positive for CO2-rich fluids, negative for H2O-rich fluids
+            (H2O_liq, CO2_liq) = self._interpolate_X_fluid(isobar, X)
+            return CO2_liq * H2O - H2O_liq * CO2
+
+        g = np.array([crossing(X) for X in self.X_fluid])
+        if g[0] < 0 or g[-1] > 0:
+            return (None, np.nan)
+        i = int(np.argmax(g <= 0))
+        if i == 0:
+            X = self.X_fluid[0]
+        else:
+            X = brentq(crossing, self.X_fluid[i - 1], self.X_fluid[i], xtol=1e-9)
+        (H2O_liq, CO2_liq) = self._interpolate_X_fluid(isobar, X)
+        return (float(X), H2O_liq + CO2_liq - H2O - CO2)
+
+
+def calculate_surface(sample, temperatures, pressures, X_fluid=default_X_fluid, n_holdout=10,
+                      seed=0, path=None, print_status=False, n_workers=None, executor=None):
+    """
+    Calculates MagmaSat dissolved volatile concentrations on a temperature-pressure-XH2Ofluid
+    grid for a sample, and at randomly placed held-out points within the grid, against which the
+    interpolation error is measured. The sample's MagmaSat saturation pressure is also
+    calculated at each of the grid's temperatures, if it contains H2O or CO2.
+
+    Parameters
+    ----------
+    sample: Sample class
+        Magma major element composition.
+
+    temperatures: float or list
+        Temperatures of the grid, in degrees C.
+
+    pressures: list
+        Pressures of the grid, in bars. All must be greater than 0.
+
+    X_fluid: list
+        OPTIONAL: Default is 0 to 1 in steps of 0.1. Fluid compositions of the grid, in mole
+        fraction H2O. Values other than 0 and 1 must be between 0.001 and 0.999. The range
+        should be 0-1 for saturation pressures and fluid compositions to be found for all
+        samples.
+
+    n_holdout: int
+        OPTIONAL: Default is 10. The number of held-out points.
+
+    seed: int
+        OPTIONAL: Default is 0. Seed for the random placement of the held-out points.
+
+    path: str
+        OPTIONAL: Default is None. If a path is passed, the surface is saved to it (see
+        MagmaSatSurface.save).
+
+    print_status: bool
+        OPTIONAL: Default is False. If set to True, progress of the calculations will be printed
+        to the terminal.
+
+    n_workers: int
+        OPTIONAL: Default is None, in which case the calculations are run one after another in
+        this process. If an int greater than 1 is passed, they are run concurrently in that many
+        worker processes. Scripts using this option must run the calculation under
+        `if __name__ == '__main__':`.
+
+    executor: concurrent.futures.Executor
+        OPTIONAL: Default is None. An existing executor in which to run the calculations, in
+        place of the one created with n_workers. It is not shut down after the calculation.
+
+    Returns
+    -------
+    MagmaSatSurface
+    """
+    temperatures = np.sort(np.atleast_1d(np.array(temperatures, dtype=float)))
+    pressures = np.sort(np.atleast_1d(np.array(pressures, dtype=float)))
+    X_vals = np.sort(np.atleast_1d(np.array(X_fluid, dtype=float)))
+    if pressures[0] <= 0:
+        raise core.InputError("pressures must all be greater than 0.")
+    for X in X_vals:
+        if X != 0 and X != 1 and (X < 0.001 or X > 0.999):
+            raise core.InputError("X_fluid values must be 0, 1, or between 0.001 and 0.999.")
+
+    rng = np.random.default_rng(seed)
+    holdout = pd.DataFrame({'Temperature': rng.uniform(temperatures[0], temperatures[-1],
+                                                       n_holdout),
+                            'Pressure': rng.uniform(pressures[0], pressures[-1], n_holdout),
+                            'XH2O_fl': np.round(rng.uniform(max(X_vals[0], 0.001),
+                                                            min(X_vals[-1], 0.999),
+                                                            n_holdout), 4)})
+
+    grid_args = [(sample, T, P, list(X_vals)) for T in temperatures for P in pressures]
+    holdout_args = [(sample, row['Temperature'], row['Pressure'], row['XH2O_fl'])
+                    for index, row in holdout.iterrows()]
+    bulk_comp = sample.get_composition(units='wtpt_oxides', normalization='fixedvolatiles')
+    volatiles = {'H2O': bulk_comp.get('H2O', 0.0), 'CO2': bulk_comp.get('CO2', 0.0)}
+    if volatiles['H2O'] + volatiles['CO2'] > 0:
+        saturation_args = [(sample, T) for T in temperatures]
+    else:
+        saturation_args = []
+
+    if executor is None and (n_workers is None or n_workers <= 1):
+        pool = None
+    elif executor is None:
+        # MELTS is not fork-safe, so worker processes are spawned fresh
+        pool = ProcessPoolExecutor(max_workers=n_workers,
+                                   mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=magmasat._initialize_worker,
+                                   initargs=(magmasat.get_engine(),))
+    else:
+        pool = executor
+    try:
+        if pool is None:
+            tasks = ([(magmasat._calculate_isobar, args) for args in grid_args] +
+                     [(_calculate_holdout_point, args) for args in holdout_args] +
+                     [(_calculate_saturation_point, args) for args in saturation_args])
+            results = []
+            for i, (calculation, args) in enumerate(tasks):
+                results.append(calculation(*args))
+                if print_status:
+                    batchfile.status_bar.status_bar((i + 1) / len(tasks),
+                                                    btext="Calculating surface...")
+        else:
+            futures = ([pool.submit(magmasat._calculate_isobar, *args) for args in grid_args] +
+                       [pool.submit(_calculate_holdout_point, *args) for args in holdout_args] +
+                       [pool.submit(_calculate_saturation_point, *args)
+                        for args in saturation_args])
+            results = []
+            for i, future in enumerate(futures):
+                results.append(future.result())
+                if print_status:
+                    batchfile.status_bar.status_bar((i + 1) / len(futures),
+                                                    btext="Calculating surface...")
+    finally:
+        if executor is None and pool is not None:
+            pool.shutdown()
+
+    isobars = results[:len(grid_args)]
+    shape = (len(temperatures), len(pressures), len(X_vals))
+    H2O_liq = np.array([[point['H2O_liq'] for point in isobar] for isobar in isobars],
+                       dtype=float).reshape(shape)
+    CO2_liq = np.array([[point['CO2_liq'] for point in isobar] for isobar in isobars],
+                       dtype=float).reshape(shape)
+    holdout_results = results[len(grid_args):len(grid_args) + len(holdout_args)]
+    holdout['H2O_liq'] = [point['H2O_liq'] for point in holdout_results]
+    holdout['CO2_liq'] = [point['CO2_liq'] for point in holdout_results]
+    saturation_results = results[len(grid_args) + len(holdout_args):]
+    if len(saturation_results) == 0:
+        volatiles = None
+        SaturationP = None
+        saturation_XH2O_fl = None
+    else:
+        SaturationP = [point['SaturationP_bars'] for point in saturation_results]
+        saturation_XH2O_fl = [point['XH2O_fl'] for point in saturation_results]
+
+    surface = MagmaSatSurface(temperatures, pressures, X_vals, H2O_liq, CO2_liq,
+                              sample.get_composition(units='wtpt_oxides'), holdout=holdout,
+                              volatiles=volatiles, SaturationP=SaturationP,
+                              saturation_XH2O_fl=saturation_XH2O_fl,
+                              melts_version=magmasat.MagmaSat().melts_version)
+    if path is not None:
+        surface.save(path)
+    return surface
+
+
+def load_surface(path):
+    """
+    Reads a surface saved with MagmaSatSurface.save().
+
+    Parameters
+    ----------
+    path: str
+        Path of the file.
+
+    Returns
+    -------
+    MagmaSatSurface
+    """
+    with np.load(path, allow_pickle=False) as data:
+        holdout = pd.DataFrame(data['holdout'].reshape(-1, 5),
+                               columns=['Temperature', 'Pressure', 'XH2O_fl', 'H2O_liq',
+                                        'CO2_liq'])
+        # Surfaces saved without precomputed saturation pressures have none to load
+        if 'SaturationP' in data.files and data['SaturationP'].size > 0:
+            volatiles = dict(zip(['H2O', 'CO2'], data['volatiles']))
+            SaturationP = data['SaturationP']
+            saturation_XH2O_fl = data['saturation_XH2O_fl']
+        else:
+            volatiles = None
+            SaturationP = None
+            saturation_XH2O_fl = None
+        return MagmaSatSurface(data['temperature'], data['pressure'], data['X_fluid'],
+                               data['H2O_liq'], data['CO2_liq'],
+                               dict(zip(data['oxides'].tolist(), data['composition'])),
+                               holdout=holdout, volatiles=volatiles, SaturationP=SaturationP,
+                               saturation_XH2O_fl=saturation_XH2O_fl,
+                               melts_version=str(data['melts_version']))
+
+
+def _anhydrous_composition(composition):
+    """Returns a composition in wt% oxides as a dict of its anhydrous oxides, normalized to
+    100 wt%."""
+    composition = {oxide: float(dict(composition).get(oxide, 0.0))
+                   for oxide in core.anhydrous_oxides}
+    total = sum(composition.values())
+    if total <= 0:
+        raise core.InputError("The composition has no anhydrous oxides.")
+    return {oxide: 100.0 * value / total for oxide, value in composition.items()}
+
+
+def _interpolation_weights(axis, value, name):
+    """Returns the index of the grid node at or below value and the fractional distance of
+    value towards the next node."""
+    value = float(value)
+    tolerance = 1e-9 * max(1.0, abs(axis[-1]))
+    if value < axis[0] - tolerance or value > axis[-1] + tolerance:
+        raise core.InputError(name + " must be within the surface's range of " +
+                              str(axis[0]) + "-" + str(axis[-1]) + ".")
+    if len(axis) == 1:
+        return (0, 0.0)
+    i = int(np.clip(np.searchsorted(axis, value, side='right') - 1, 0, len(axis) - 2))
+    f = float(np.clip((value - axis[i]) / (axis[i + 1] - axis[i]), 0.0, 1.0))
+    return (i, f)
+
+
+def _fluid_H2O_mass_fraction(X):
+    """Converts the mole fraction of H2O in an H2O-CO2 fluid to its mass fraction."""
+    H2O = X * core.oxideMass['H2O']
+    return H2O / (H2O + (1 - X) * core.oxideMass['CO2'])
+
+
+def _calculate_holdout_point(sample, temperature, pressure, X_fluid):
+    """Calculates dissolved volatiles with MagmaSat. Module-level so that it can be sent to
+    worker processes."""
+    return magmasat.MagmaSat().calculate_dissolved_volatiles(sample=sample,
+                                                             temperature=temperature,
+                                                             pressure=pressure,
+                                                             X_fluid=float(X_fluid))
+
+
+def _calculate_saturation_point(sample, temperature):
+    """Calculates the saturation pressure and the fluid composition there with MagmaSat.
+    Module-level so that it can be sent to worker processes."""
+    return magmasat.MagmaSat().calculate_saturation_pressure(sample=sample,
+                                                             temperature=float(temperature),
+                                                             verbose=True)
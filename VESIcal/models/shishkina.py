@@ -6,6 +6,7 @@ from VESIcal import model_classes
 from VESIcal import sample_class
 
 import numpy as np
+import pandas as pd
 import warnings as w
 from scipy.optimize import root_scalar
 
@@ -45,13 +46,15 @@ class carbon(model_classes.Model):
 
         Parameters
         ----------
-        sample:        Sample class
-            The magma composition stored in a Sample class.
+        sample:        Sample class or SampleBatch class
+            The magma composition stored in a Sample class, or many compositions stored in a
+            SampleBatch class.
 
         Returns
         -------
-        float
-            The value of the Pi* compositional parameter.
+        float or pandas.Series
+            The value of the Pi* compositional parameter, or for a SampleBatch its value for
+            each sample.
         """
 
         _mols = sample.get_composition(units='mol_cations')
@@ -105,6 +108,37 @@ class carbon(model_classes.Model):
         else:
             return np.exp(A*np.log(fugacity/10)+B*PiStar+C)/1e4
 
+    def calculate_dissolved_volatiles_array(self, pressure, samples, X_fluid=1.0, **kwargs):
+        """ Calculates the dissolved CO2 concentration in wt% for many samples and conditions at
+        once, using equation (13) of Shishkina et al. (2014). The compositions, pressures and
+        fluid compositions are broadcast together, as for numpy arrays.
+
+        Parameters
+        ----------
+        pressure:    float or numpy.ndarray
+            (Total) pressure in bars.
+        samples:    SampleBatch class or pandas.DataFrame
+            Magma compositions, one per sample. A DataFrame is read as for SampleBatch.
+        X_fluid:    float or numpy.ndarray
+            The mol-fraction of the fluid that is CO2. Default is 1, i.e. a pure CO2 fluid.
+
+        Returns
+        -------
+        numpy.ndarray
+            The dissolved CO2 concentration in wt%.
+        """
+        pressure, X_fluid = _check_conditions(pressure, X_fluid)
+        PiStar = self.PiStar(_get_sample_batch(samples)).to_numpy()
+        fugacity = self.fugacity_model.fugacity(pressure=pressure, X_fluid=X_fluid, **kwargs)
+
+        A = 1.150
+        B = 6.71
+        C = -1.345
+
+        with np.errstate(divide='ignore'):
+            dissolved = np.exp(A*np.log(fugacity/10)+B*PiStar+C)/1e4
+        return np.where(fugacity == 0, 0.0, dissolved)
+
     def calculate_equilibrium_fluid_comp(self, pressure, sample, **kwargs):
         """ Returns 1.0 if a pure CO2 fluid is saturated. Returns 0.0 if a pure CO2 fluid is
         undersaturated.
@@ -255,6 +289,47 @@ class water(model_classes.Model):
 
         return a*total_alkalis + b
 
+    def calculate_dissolved_volatiles_array(self, pressure, samples, X_fluid=1.0, **kwargs):
+        """Calculates the dissolved H2O concentration for many samples and conditions at once,
+        using Eqn (9) of Shishkina et al. (2014). The compositions, pressures and fluid
+        compositions are broadcast together, as for numpy arrays.
+
+        Parameters
+        ----------
+        pressure     float or numpy.ndarray
+            Total pressure in bars
+        samples     SampleBatch class or pandas.DataFrame
+            Magma major element compositions, one per sample. A DataFrame is read as for
+            SampleBatch.
+        X_fluid     float or numpy.ndarray
+            The mol fraction of H2O in the fluid
+
+        Returns
+        -------
+        numpy.ndarray
+            The H2O concentration in wt%
+        """
+        samples = _get_sample_batch(samples)
+        if samples.check_oxide('Na2O') is False or samples.check_oxide('K2O') is False:
+            raise core.InputError("Na2O and K2O must be present in samples.")
+        pressure, X_fluid = _check_conditions(pressure, X_fluid)
+
+        _mols = samples.get_composition(units='mol_cations')
+        _mol_volatiles = 0
+        if 'H' in _mols:
+            _mol_volatiles += _mols['H']
+        if 'C' in _mols:
+            _mol_volatiles += _mols['C']
+
+        total_alkalis = ((_mols['Na'] + _mols['K'])/(1-_mol_volatiles)).to_numpy()
+
+        fugacity = self.fugacity_model.fugacity(pressure, X_fluid=X_fluid, **kwargs)
+
+        a = 3.36e-7 * (fugacity/10)**3 - 2.33e-4*(fugacity/10)**2 + 0.0711*(fugacity/10) - 1.1309
+        b = -1.2e-5*(fugacity/10)**2 + 0.0196*(fugacity/10)+1.1297
+
+        return a*total_alkalis + b
+
     def calculate_equilibrium_fluid_comp(self, pressure, sample, **kwargs):
         """ Returns 1.0 if a pure H2O fluid is saturated.
         Returns 0.0 if a pure H2O fluid is undersaturated.
@@ -333,6 +408,55 @@ class water(model_classes.Model):
                 sample.get_composition('H2O'))
 
 
+def calculate_dissolved_volatiles_array(pressure, samples, X_fluid, **kwargs):
+    """ Calculates the dissolved H2O and CO2 concentrations in wt% of many samples, in
+    equilibrium with a mixed H2O-CO2 fluid, using the Shishkina et al. (2014) models. The
+    compositions, pressures and fluid compositions are broadcast together, as for numpy
+    arrays, and evaluated at once. The result is the same as from
+    mixed.calculate_dissolved_volatiles for each sample and set of conditions.
+
+    Parameters
+    ----------
+    pressure:    float or numpy.ndarray
+        The total pressure in bars.
+    samples:    SampleBatch class or pandas.DataFrame
+        Magma compositions, one per sample. A DataFrame is read as for SampleBatch.
+    X_fluid:    float or numpy.ndarray
+        The mole fraction of H2O in the fluid. The remainder of the fluid is CO2.
+
+    Returns
+    -------
+    tuple
+        numpy arrays of the dissolved H2O and CO2 concentrations, in wt%.
+    """
+    samples = _get_sample_batch(samples)
+    pressure, X_fluid = _check_conditions(pressure, X_fluid)
+    H2O = water().calculate_dissolved_volatiles_array(pressure, samples, X_fluid, **kwargs)
+    CO2 = carbon().calculate_dissolved_volatiles_array(pressure, samples, 1-X_fluid, **kwargs)
+    return H2O, CO2
+
+
+def _get_sample_batch(samples):
+    """ Returns samples as a SampleBatch, reading a DataFrame of wt% oxides if necessary. """
+    if isinstance(samples, sample_class.SampleBatch):
+        return samples
+    if isinstance(samples, pd.DataFrame):
+        return sample_class.SampleBatch(samples)
+    raise core.InputError("samples must be an instance of the SampleBatch class or a pandas "
+                          "DataFrame.")
+
+
+def _check_conditions(pressure, X_fluid):
+    """ Returns pressure and X_fluid as float arrays, checking that their values are valid. """
+    pressure = np.asarray(pressure, dtype=float)
+    X_fluid = np.asarray(X_fluid, dtype=float)
+    if np.any(X_fluid < 0) or np.any(X_fluid > 1):
+        raise core.InputError("X_fluid must have a value between 0 and 1.")
+    if np.any(pressure < 0):
+        raise core.InputError("pressure must be a positive value.")
+    return pressure, X_fluid
+
+
 crmsg_BC_fail_T1 = ("{param_name} ({param_val:.1f} {units}) is outside the calibration range of "
                     "{model_name} ({calib_val0:.1f}-{calib_val1:.1f} {units}). Note, the authors "
                     "recomend that this model is optimally calibrated between 1150-1250C. ")
@@ -6,6 +6,99 @@ from VESIcal import core
 
 from copy import deepcopy, copy
 
+# Molar masses and stoichiometry of the oxides in core.oxides, in the same order, so that unit
+# conversions are a single multiplication of arrays.
+_oxide_masses = np.array([core.oxideMass[ox] for ox in core.oxides])
+_cation_numbers = np.array([core.CationNum[ox] for ox in core.oxides])
+_oxygen_numbers = np.array([core.OxygenNum[ox] for ox in core.oxides])
+_cations = [core.oxides_to_cations[ox] for ox in core.oxides]
+_is_volatile = np.array([ox in core.volatiles for ox in core.oxides])
+
+_oxide_positions = {ox: i for i, ox in enumerate(core.oxides)}
+_cation_positions = {cation: i for i, cation in enumerate(_cations)}
+
+# Caches of the positions in core.oxides of the entries of each composition index seen, of the
+# molar masses with each set of oxide_masses overrides seen, and of the entries of each
+# composition index that are not volatiles.
+_index_positions = {}
+_oxide_mass_overrides = {}
+_nonvolatile_entries = {}
+
+
+def _get_positions(index, cations=False):
+    """ Returns the positions in core.oxides of the oxides (or, if cations is True, of the
+    oxides of the cations) in a composition index, as an array, and the index of the composition
+    converted to cations (or oxides).
+    """
+    key = (tuple(index), cations)
+    positions = _index_positions.get(key)
+    if positions is None:
+        if cations:
+            positions = np.array([_cation_positions[name] for name in key[0]], dtype=int)
+            converted_index = pd.Index([core.oxides[i] for i in positions])
+        else:
+            positions = np.array([_oxide_positions[name] for name in key[0]], dtype=int)
+            converted_index = pd.Index([_cations[i] for i in positions])
+        positions = (positions, converted_index)
+        _index_positions[key] = positions
+    return positions
+
+
+def _get_nonvolatile_entries(index):
+    """ Returns a boolean array marking the entries of a composition index that are not H2O or
+    CO2, and the index without them.
+    """
+    key = tuple(index)
+    entries = _nonvolatile_entries.get(key)
+    if entries is None:
+        keep = np.array([name not in ['H2O', 'CO2'] for name in key], dtype=bool)
+        entries = (keep, index[keep])
+        _nonvolatile_entries[key] = entries
+    return entries
+
+
+def _convert_wtpercentOxides(values, index, units, oxideMass=_oxide_masses):
+    """ Converts wt% oxides, given as a numpy array of values and the pandas.Index of their oxide
+    names, to the given units. Returns the converted values, and their index (of cations if the
+    units are 'mol_cations' or 'mol_singleO'). mol_oxides and mol_cations are normalized to 1,
+    and mol_singleO to one oxygen.
+    """
+    if units == 'wtpt_oxides':
+        return values, index
+    positions, cations = _get_positions(index)
+    if units == 'mol_oxides':
+        molOxides = values/oxideMass[positions]
+        return molOxides/np.nansum(molOxides), index
+    elif units == 'mol_cations':
+        molCations = _cation_numbers[positions]*values/oxideMass[positions]
+        return molCations/np.nansum(molCations), cations
+    elif units == 'mol_singleO':
+        molOxides = values/oxideMass[positions]
+        molCations = _cation_numbers[positions]*molOxides
+        return molCations/np.dot(_oxygen_numbers[positions], molOxides), cations
+    raise core.InputError("The units must be one of 'wtpt_oxides', 'mol_oxides', "
+                          "'mol_cations', or 'mol_singleO'.")
+
+
+def _get_oxide_masses(oxide_masses):
+    """ Returns the molar masses of the oxides in core.oxides, with any values in the dict
+    oxide_masses replacing the VESIcal defaults. The array is cached by the contents of
+    oxide_masses and must not be modified.
+    """
+    if len(oxide_masses) == 0:
+        return _oxide_masses
+    key = frozenset(oxide_masses.items())
+    masses = _oxide_mass_overrides.get(key)
+    if masses is None:
+        masses = _oxide_masses.copy()
+        for ox in oxide_masses:
+            if ox in core.oxideMass:
+                masses[_oxide_positions[ox]] = oxide_masses[ox]
+            else:
+                raise core.InputError("The oxide name provided in oxide_masses is not recognised.")
+        _oxide_mass_overrides[key] = masses
+    return masses
+
 
 class Sample(object):
     """ The sample class stores compositional information for samples, and contains methods for
@@ -51,6 +144,10 @@ class Sample(object):
         """
 
         composition = deepcopy(composition)
+        self._views = {}
+        self._overrides = None
+        self._shared = False
+        self._base_positions = None
 
         if isinstance(composition, dict):
             composition = pd.Series(composition, dtype='float64')
@@ -71,6 +168,94 @@ class Sample(object):
         self.set_default_normalization(default_normalization)
         self.set_default_units(default_units)
 
+    def __getstate__(self):
+        # Cached compositions and sharing are left out, so that equal samples pickle identically
+        # (e.g., for the sample hashes of checkpoint.Checkpoint) and copies do not carry them.
+        self._materialize()
+        state = self.__dict__.copy()
+        for name in ['_views', '_overrides', '_shared', '_base_positions']:
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._views = {}
+        self._overrides = None
+        self._shared = False
+        self._base_positions = None
+
+    @property
+    def _composition(self):
+        """ The composition in wt% oxides, as a pandas.Series. It may be shared with other Sample
+        objects (see change_composition), so must not be modified in place unless
+        _make_private() has been called.
+        """
+        if self._overrides is not None:
+            self._materialize()
+        return self._wtpt
+
+    @_composition.setter
+    def _composition(self, composition):
+        self._wtpt = composition
+        self._overrides = None
+        self._shared = False
+        self._base_positions = None
+
+    def _get_base_positions(self):
+        """ Returns a dict of the position of each component in the shared composition, which
+        is shared in turn by the samples returned by change_composition(inplace=False).
+        """
+        if self._base_positions is None:
+            self._base_positions = {ox: i for i, ox in enumerate(self._wtpt.index)}
+        return self._base_positions
+
+    def _get_values(self):
+        """ Returns the index and the values, as a numpy array, of the composition in wt%
+        oxides. Components overridden by change_composition(inplace=False) are applied to a copy
+        of the shared values, so that reading the composition does not build a pandas.Series.
+        The array must not be modified.
+        """
+        values = self._wtpt.to_numpy(dtype=float)
+        if self._overrides is None:
+            return self._wtpt.index, values
+        positions = self._get_base_positions()
+        if any(ox not in positions for ox in self._overrides):
+            # Components the shared composition does not have change the index
+            self._materialize()
+            return self._wtpt.index, self._wtpt.to_numpy(dtype=float)
+        values = values.copy()
+        for ox, value in self._overrides.items():
+            values[positions[ox]] = value
+        return self._wtpt.index, values
+
+    def _materialize(self):
+        """ Applies the components overridden by change_composition(inplace=False) to a private
+        copy of the shared composition.
+        """
+        if self._overrides is None:
+            return
+        positions = self._get_base_positions()
+        if all(ox in positions for ox in self._overrides):
+            composition = pd.Series(self._get_values()[1], index=self._wtpt.index,
+                                    name=self._wtpt.name)
+        else:
+            composition = self._wtpt.copy()
+            for ox in self._overrides:
+                composition[ox] = self._overrides[ox]
+        self._composition = composition
+
+    def _contains(self, oxide):
+        """ Returns whether the composition has a value for oxide, without building it. """
+        return oxide in self._wtpt.index or (self._overrides is not None and
+                                             oxide in self._overrides)
+
+    def _make_private(self):
+        """ Copies the composition if it is shared with other Sample objects, so that it can be
+        modified in place.
+        """
+        if self._shared:
+            self._composition = self._composition.copy()
+
     def set_default_normalization(self, default_normalization):
         """ Set the default type of normalization to use with the get_composition() method.
 
@@ -166,12 +351,7 @@ class Sample(object):
             The sample composition, as specified.
         """
         # Process the oxide_masses variable, if necessary:
-        oxideMass = copy(core.oxideMass)
-        for ox in oxide_masses:
-            if ox in oxideMass:
-                oxideMass[ox] = oxide_masses[ox]
-            else:
-                raise core.InputError("The oxide name provided in oxide_masses is not recognised.")
+        oxideMass = _get_oxide_masses(oxide_masses)
 
         # Fetch the default return types if not specified in function call
         if normalization is None and species is None:
@@ -179,20 +359,55 @@ class Sample(object):
         if units is None and species is None:
             units = self.default_units
 
+        if species is not None and not isinstance(species, str):
+            raise core.InputError("Species must be either a string or a NoneType.")
+
+        # Compositions are cached by the arguments that determine them until the composition is
+        # changed, since models ask for the same composition many times while solving.
+        key = (species, normalization, units, exclude_volatiles,
+               frozenset(oxide_masses.items()) if len(oxide_masses) > 0 else None)
+        if key in self._views:
+            final = self._views[key]
+        else:
+            final = self._calculate_composition(species, normalization, units,
+                                                exclude_volatiles, oxideMass)
+            self._views[key] = final
+
+        if species is None:
+            if asSampleClass is False:
+                return final.copy()
+            else:
+                return Sample(final)
+        else:
+            if asSampleClass and self._contains(species) and not (
+                    exclude_volatiles and species in ['H2O', 'CO2']):
+                w.warn("Cannot return single species as Sample class. Returning as float.",
+                       RuntimeWarning, stacklevel=2)
+            return final
+
+    def _calculate_composition(self, species, normalization, units, exclude_volatiles,
+                               oxideMass):
+        """ Calculates the composition requested from get_composition(), which caches it. The
+        parameters are those of get_composition() after the defaults have been applied, with
+        oxideMass the array of oxide molar masses.
+
+        Returns
+        -------
+        pandas.Series or float
+            The sample composition, or the concentration of species if given.
+        """
+        # The composition is read as wt% oxides from the shared values and any overridden
+        # components (see change_composition), and only the result is built as a Series.
+        index, values = self._get_values()
+
         # Check whether to exclude volatiles
-        # note that here composition is gotten as wtpt_oxides
         if exclude_volatiles:
-            composition = self._composition.copy()
-            if 'H2O' in composition.index:
-                composition = composition.drop(index='H2O')
-            if 'CO2' in composition.index:
-                composition = composition.drop(index='CO2')
-        else:
-            composition = self._composition.copy()
+            (keep, index) = _get_nonvolatile_entries(index)
+            values = values[keep]
 
         # Check for a species being provided, if so, work out which units to return.
         if isinstance(species, str):
-            if species in composition.index:  # if the requested species has a value, proceed
+            if species in index:  # if the requested species has a value, proceed
                 if species in core.oxides:
                     if units in ['mol_cations, mol_singleO'] or units is None:
                         units = 'wtpt_oxides'
@@ -206,21 +421,19 @@ class Sample(object):
                     normalization = 'none'
             else:
                 return 0.0  # if the requested species has no set value, return a float of 0.0
-        elif species is not None:
-            raise core.InputError("Species must be either a string or a NoneType.")
 
         # Get the requested type of composition
-        if units == 'wtpt_oxides':
-            converted = composition
-        elif units == 'mol_oxides':
-            converted = self._wtpercentOxides_to_molOxides(composition, oxideMass=oxideMass)
-        elif units == 'mol_cations':
-            converted = self._wtpercentOxides_to_molCations(composition, oxideMass=oxideMass)
-        elif units == 'mol_singleO':
-            converted = self._wtpercentOxides_to_molSingleO(composition, oxideMass=oxideMass)
+        (converted, converted_index) = _convert_wtpercentOxides(values, index, units,
+                                                                oxideMass=oxideMass)
+        if species is not None and normalization == 'none':
+            return converted[converted_index.get_loc(species)]
+        if units == 'wtpt_oxides' and self._overrides is None and not exclude_volatiles:
+            # Not copied, since it is not modified below and get_composition() returns a copy
+            converted = self._wtpt
+        elif units == 'wtpt_oxides':
+            converted = pd.Series(converted, index=converted_index, name=self._wtpt.name)
         else:
-            raise core.InputError("The units must be one of 'wtpt_oxides', 'mol_oxides', "
-                                  "'mol_cations', or 'mol_singleO'.")
+            converted = pd.Series(converted, index=converted_index)
 
         # Do requested normalization
         if normalization == 'none':
@@ -236,14 +449,8 @@ class Sample(object):
                                   "'fixedvolatiles', or 'additionalvolatiles'.")
 
         if species is None:
-            if asSampleClass is False:
-                return final
-            else:
-                return Sample(final)
-        elif isinstance(species, str):
-            if asSampleClass:
-                w.warn("Cannot return single species as Sample class. Returning as float.",
-                       RuntimeWarning, stacklevel=2)
+            return final
+        else:
             return final[species]
 
     def change_composition(self, new_composition, units='wtpt_oxides', inplace=True):
@@ -280,12 +487,29 @@ class Sample(object):
             new_composition = dict(new_composition)
 
         if inplace is False:
+            if units == 'wtpt_oxides':
+                # The new sample shares this sample's composition, with the changed components
+                # kept separately until its whole composition is needed.
+                self._get_base_positions()
+                newsample = Sample.__new__(type(self))
+                newsample.__dict__.update(self.__dict__)
+                newsample._views = {}
+                newsample._overrides = dict(self._overrides or {})
+                newsample._overrides.update(new_composition)
+                self._shared = True
+                newsample._shared = True
+                return newsample
             newsample = deepcopy(self)
             return newsample.change_composition(new_composition, units=units)
 
         if units == 'wtpt_oxides':
-            for ox in new_composition:
-                self._composition[ox] = new_composition[ox]
+            if self._overrides is not None:
+                self._overrides.update(new_composition)
+            else:
+                self._make_private()
+                for ox in new_composition:
+                    self._composition[ox] = new_composition[ox]
+                self._base_positions = None
 
         elif units == 'mol_oxides':
             _comp = self.get_composition(units='mol_oxides')
@@ -303,6 +527,8 @@ class Sample(object):
             raise core.InputError("Units must be one of 'wtpt_oxides', 'mol_oxides', or "
                                   "'mol_cations'.")
 
+        self._views = {}
+
         return self
 
     def get_formulaweight(self, exclude_volatiles=False):
@@ -347,7 +573,7 @@ class Sample(object):
             w.warn("Oxide name not recognised. If it is in your sample, unexpected behaviour "
                    "might occur!",
                    RuntimeWarning, stacklevel=2)
-        return oxide in self._composition
+        return self._contains(oxide)
 
     def check_cation(self, cation):
         """
@@ -500,7 +726,7 @@ class Sample(object):
 
         return normalized
 
-    def _wtpercentOxides_to_molOxides(self, composition, oxideMass=core.oxideMass):
+    def _wtpercentOxides_to_molOxides(self, composition, oxideMass=_oxide_masses):
         """
         Converts a wt% oxide composition to mol oxides, normalised to 1 mol.
 
@@ -511,27 +737,20 @@ class Sample(object):
         composition:    pandas.Series
             Major element oxides in wt%
 
-        oxideMass:  dict
-            The molar mass of the oxides. Default is the VESIcal default molar masses.
+        oxideMass:  numpy.ndarray
+            The molar masses of the oxides in core.oxides, in order. Default is the VESIcal
+            default molar masses.
 
         Returns
         -------
         pandas.Series
             Molar proportions of major element oxides, normalised to 1.
         """
-        molOxides = {}
-        comp = composition.copy()
-        oxideslist = list(comp.index)
-
-        for ox in oxideslist:
-            molOxides[ox] = comp[ox]/oxideMass[ox]
-
-        molOxides = pd.Series(molOxides)
-        molOxides = molOxides/molOxides.sum()
-
-        return molOxides
+        return pd.Series(*_convert_wtpercentOxides(composition.to_numpy(dtype=float),
+                                                   composition.index, 'mol_oxides',
+                                                   oxideMass=oxideMass))
 
-    def _wtpercentOxides_to_molCations(self, composition, oxideMass=core.oxideMass):
+    def _wtpercentOxides_to_molCations(self, composition, oxideMass=_oxide_masses):
         """
         Converts a wt% oxide composition to molar proportions of cations (normalised to 1).
 
@@ -542,28 +761,20 @@ class Sample(object):
         composition        pandas.Series
             Major element oxides in wt%.
 
-        oxideMass:  dict
-            The molar mass of the oxides. Default is the VESIcal default molar masses.
+        oxideMass:  numpy.ndarray
+            The molar masses of the oxides in core.oxides, in order. Default is the VESIcal
+            default molar masses.
 
         Returns
         -------
         pandas.Series
             Molar proportions of cations, normalised to 1.
         """
-        molCations = {}
-        comp = composition.copy()
-        oxideslist = list(comp.index)
-
-        for ox in oxideslist:
-            cation = core.oxides_to_cations[ox]
-            molCations[cation] = core.CationNum[ox]*comp[ox]/oxideMass[ox]
-
-        molCations = pd.Series(molCations)
-        molCations = molCations/molCations.sum()
-
-        return molCations
+        return pd.Series(*_convert_wtpercentOxides(composition.to_numpy(dtype=float),
+                                                   composition.index, 'mol_cations',
+                                                   oxideMass=oxideMass))
 
-    def _wtpercentOxides_to_molSingleO(self, composition, oxideMass=core.oxideMass):
+    def _wtpercentOxides_to_molSingleO(self, composition, oxideMass=_oxide_masses):
         """
         Constructs the chemical formula, on a single oxygen basis, from wt% oxides.
 
@@ -574,8 +785,9 @@ class Sample(object):
         composition        pandas.Series
             Major element oxides in wt%
 
-        oxideMass:  dict
-            The molar mass of the oxides. Default is the VESIcal default molar masses.
+        oxideMass:  numpy.ndarray
+            The molar masses of the oxides in core.oxides, in order. Default is the VESIcal
+            default molar masses.
 
         Returns
         -------
@@ -583,23 +795,11 @@ class Sample(object):
             The chemical formula of the composition, on a single oxygen basis. Each element is
             a separate entry in the Series.
         """
-        molCations = {}
-        comp = composition.copy()
-
-        oxideslist = list(comp.index)
-
-        total_O = 0.0
-        for ox in oxideslist:
-            cation = core.oxides_to_cations[ox]
-            molCations[cation] = core.CationNum[ox]*comp[ox]/oxideMass[ox]
-            total_O += core.OxygenNum[ox]*comp[ox]/oxideMass[ox]
-
-        molCations = pd.Series(molCations)
-        molCations = molCations/total_O
+        return pd.Series(*_convert_wtpercentOxides(composition.to_numpy(dtype=float),
+                                                   composition.index, 'mol_singleO',
+                                                   oxideMass=oxideMass))
 
-        return molCations
-
-    def _molOxides_to_wtpercentOxides(self, composition, oxideMass=core.oxideMass):
+    def _molOxides_to_wtpercentOxides(self, composition, oxideMass=_oxide_masses):
         """
         Converts mol oxides to wt% oxides. Returned composition is normalized to 100 wt%.
 
@@ -608,25 +808,19 @@ class Sample(object):
         composition:     pandas.Series
             mol fraction oxides
 
-        oxideMass:  dict
-            The molar mass of the oxides. Default is the VESIcal default molar masses.
+        oxideMass:  numpy.ndarray
+            The molar masses of the oxides in core.oxides, in order. Default is the VESIcal
+            default molar masses.
 
         Returns
         -------
         pandas.Series
             wt% oxides normalized to 100 wt%.
         """
+        positions = _get_positions(composition.index)[0]
+        wtpt = composition.to_numpy(dtype=float)*oxideMass[positions]
 
-        comp = composition.copy()
-        wtpt = {}
-
-        for ox in composition.index:
-            wtpt[ox] = comp[ox]*oxideMass[ox]
-
-        wtpt = pd.Series(wtpt)
-        wtpt = wtpt/wtpt.sum()*100
-
-        return wtpt
+        return pd.Series(wtpt/np.nansum(wtpt)*100, index=composition.index)
 
     def _molOxides_to_molCations(self, composition):
         """
@@ -643,19 +837,13 @@ class Sample(object):
         pandas.Series
             mole fraction cations
         """
+        positions, cations = _get_positions(composition.index)
+        molcations = composition.to_numpy(dtype=float)*_cation_numbers[positions]
 
-        comp = composition.copy()
-        molcations = {}
-
-        for ox in comp.index:
-            molcations[core.oxides_to_cations[ox]] = comp[ox]*core.CationNum[ox]
-
-        molcations = pd.Series(molcations)
-        molcations = molcations/molcations.sum()
-
-        return molcations
+        return pd.Series(molcations/np.nansum(molcations),
+                         index=cations)
 
-    def _molCations_to_wtpercentOxides(self, composition, oxideMass=core.oxideMass):
+    def _molCations_to_wtpercentOxides(self, composition, oxideMass=_oxide_masses):
         """
         Converts mole fraction cations to wt% oxides, normalized to 100 wt%.
 
@@ -664,27 +852,20 @@ class Sample(object):
         composition:     pandas.Series
             Mole fraction cations
 
-        oxideMass:  dict
-            The molar mass of the oxides. Default is the VESIcal default molar masses.
+        oxideMass:  numpy.ndarray
+            The molar masses of the oxides in core.oxides, in order. Default is the VESIcal
+            default molar masses.
 
         Returns
         -------
         pandas.Series
             Wt% oxides, normalized to 100 wt%.
         """
+        positions, oxides = _get_positions(composition.index, cations=True)
+        wtpt = (composition.to_numpy(dtype=float) / _cation_numbers[positions] *
+                oxideMass[positions])
 
-        comp = composition.copy()
-        wtpt = {}
-
-        for el in comp.index:
-            wtpt[core.cations_to_oxides[el]] = (
-                comp[el] / core.CationNum[core.cations_to_oxides[el]] *
-                oxideMass[core.cations_to_oxides[el]])
-
-        wtpt = pd.Series(wtpt)
-        wtpt = wtpt/wtpt.sum()*100
-
-        return wtpt
+        return pd.Series(wtpt/np.nansum(wtpt)*100, index=oxides)
 
     def _molCations_to_molOxides(self, composition):
         """
@@ -700,14 +881,397 @@ class Sample(object):
         pandas.Series
             Mole fraction oxides, normalized to one.
         """
-        comp = composition.copy()
-        moloxides = {}
+        positions, oxides = _get_positions(composition.index, cations=True)
+        moloxides = composition.to_numpy(dtype=float)/_cation_numbers[positions]
+
+        return pd.Series(moloxides/np.nansum(moloxides),
+                         index=oxides)
+
+
+class SampleBatch(object):
+    """ Stores the compositions of many samples in a single 2-D numpy array, with one row per
+    sample and one column per oxide in core.oxides. Provides the compositional methods of the
+    Sample class, calculated for all samples at once. As for Sample, a missing (NaN) oxide is
+    skipped in the totals of unit conversions and of the major oxides, rather than making the
+    whole row NaN.
+    """
 
-        for el in comp.index:
-            moloxides[core.cations_to_oxides[el]] = (
-                comp[el]/core.CationNum[core.cations_to_oxides[el]])
+    def __init__(self, compositions, units='wtpt_oxides', default_normalization='none',
+                 default_units='wtpt_oxides'):
+        """ Initialises the SampleBatch class.
 
-        moloxides = pd.Series(moloxides)
-        moloxides = moloxides/moloxides.sum()
+        As for Sample, the compositions are stored as wtpt. If they are provided as mols, they
+        will be normalized to 100 wt%.
 
-        return moloxides
+        Parameters
+        ----------
+        compositions:     pandas.DataFrame or numpy.ndarray
+            The compositions of the samples, one per row, in the units specified by the units
+            parameter. DataFrame columns are oxide names (or cation names if units is
+            'mol_cations'); other columns are ignored, and the DataFrame index is kept as the
+            sample names. An array must have one column for each oxide in core.oxides, in the
+            same order.
+
+        units:     str
+            Specifies the units of compositions. Choose from 'wtpt_oxides', 'mol_oxides',
+            'mol_cations'.
+
+        default_normalization:     str
+            The type of normalization to apply to the data by default, as for Sample.
+
+        default_units:     str
+            The type of composition to return by default, as for Sample.
+        """
+        if units == 'mol_cations':
+            names = _cations
+        elif units in ['wtpt_oxides', 'mol_oxides']:
+            names = core.oxides
+        else:
+            raise core.InputError("Units must be one of 'wtpt_oxides', 'mol_oxides', or "
+                                  "'mol_cations'.")
+
+        if isinstance(compositions, pd.DataFrame):
+            self.index = compositions.index
+            self._present = np.array([name in compositions.columns for name in names])
+            values = compositions.reindex(columns=names, fill_value=0.0).to_numpy(dtype=float)
+        elif isinstance(compositions, np.ndarray):
+            values = np.array(compositions, dtype=float)
+            if values.ndim != 2 or values.shape[1] != len(core.oxides):
+                raise core.InputError("An array of compositions must have one column for each "
+                                      "oxide in core.oxides.")
+            self.index = pd.RangeIndex(len(values))
+            self._present = np.ones(len(core.oxides), dtype=bool)
+        else:
+            raise core.InputError("The compositions must be given as either a pandas DataFrame "
+                                  "or a numpy array.")
+
+        if units == 'wtpt_oxides':
+            self._composition = values
+        elif units == 'mol_oxides':
+            self._composition = self._moles_to_wtpercentOxides(values,
+                                                               np.ones(len(core.oxides)))
+        else:
+            self._composition = self._moles_to_wtpercentOxides(values, _cation_numbers)
+
+        self.set_default_normalization(default_normalization)
+        self.set_default_units(default_units)
+
+    def __len__(self):
+        return len(self._composition)
+
+    def set_default_normalization(self, default_normalization):
+        """ Set the default type of normalization to use with the get_composition() method.
+
+        Parameters
+        ----------
+        default_normalization:    str
+            One of 'none', 'standard', 'fixedvolatiles', or 'additionalvolatiles'. See
+            Sample.set_default_normalization().
+        """
+        if default_normalization in ['none', 'standard', 'fixedvolatiles', 'additionalvolatiles']:
+            self.default_normalization = default_normalization
+        else:
+            raise core.InputError("The normalization method must be one of 'none', 'standard', "
+                                  "'fixedvolatiles', or 'additionalvolatiles'.")
+
+    def set_default_units(self, default_units):
+        """ Set the default units of composition to return when using the get_composition() method.
+
+        Parameters
+        ----------
+        default_units     str
+            One of 'wtpt_oxides', 'mol_oxides', 'mol_cations', or 'mol_singleO'.
+        """
+        if default_units in ['wtpt_oxides', 'mol_oxides', 'mol_cations', 'mol_singleO']:
+            self.default_units = default_units
+        else:
+            raise core.InputError("The units must be one of 'wtpt_oxides', 'mol_oxides', "
+                                  "'mol_cations', or 'mol_singleO'.")
+
+    def get_composition(self, species=None, normalization=None, units=None,
+                        exclude_volatiles=False, oxide_masses={}):
+        """ Returns the compositions in the format requested, normalized as requested. The
+        arguments are as for Sample.get_composition().
+
+        Parameters
+        ----------
+        species:    NoneType or str
+            The name of the oxide or cation to return the concentration of. If NoneType
+            (default) the whole compositions will be returned. An oxide is returned in wtpt
+            unless units is 'mol_oxides', and a cation as mol_cations unless units is
+            'mol_singleO'. Unless normalization is specified, none will be applied.
+
+        normalization:     NoneType or str
+            One of 'none', 'standard', 'fixedvolatiles', or 'additionalvolatiles'. If NoneType
+            is passed the default normalization option will be used.
+
+        units:     NoneType or str
+            One of 'wtpt_oxides', 'mol_oxides', 'mol_cations', or 'mol_singleO'. If NoneType is
+            passed the default units option will be used.
+
+        exclude_volatiles   bool
+            If True, volatiles will be excluded from the returned compositions, prior to
+            normalization and conversion.
+
+        oxide_masses:  dict
+            Specify here any oxide masses that should be changed from the VESIcal default.
+
+        Returns
+        -------
+        pandas.DataFrame or numpy.ndarray
+            The compositions of the samples, with the sample names as index and the oxides
+            (or cations) given in the compositions as columns, in the order of core.oxides.
+            If a species is given, its concentration in each sample as a 1-D array.
+        """
+        masses = _get_oxide_masses(oxide_masses)
+
+        # Fetch the default return types if not specified in function call
+        if normalization is None and species is None:
+            normalization = self.default_normalization
+        if units is None and species is None:
+            units = self.default_units
+
+        columns = self._present.copy()
+        if exclude_volatiles:
+            columns = columns & ~_is_volatile
+
+        # Check for a species being provided, if so, work out which units to return.
+        if isinstance(species, str):
+            if species in core.oxides:
+                oxide = species
+                if units != 'mol_oxides':
+                    units = 'wtpt_oxides'
+            elif species in core.cations_to_oxides:
+                oxide = core.cations_to_oxides[species]
+                if units != 'mol_singleO':
+                    units = 'mol_cations'
+            else:
+                raise core.InputError(species + " was not recognised, check spelling, " +
+                                      "capitalization and stoichiometry.")
+            if not columns[core.oxides.index(oxide)]:
+                # The requested species has no set value
+                return np.zeros(len(self))
+            if normalization is None:
+                normalization = 'none'
+        elif species is not None:
+            raise core.InputError("Species must be either a string or a NoneType.")
+
+        composition = self._composition[:, columns]
+        masses = masses[columns]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if units == 'wtpt_oxides':
+                converted = composition.copy()
+            elif units == 'mol_oxides':
+                converted = composition / masses
+                converted = converted / np.nansum(converted, axis=1)[:, np.newaxis]
+            elif units == 'mol_cations' or units == 'mol_singleO':
+                converted = composition / masses * _cation_numbers[columns]
+                if units == 'mol_cations':
+                    total = np.nansum(converted, axis=1)
+                else:
+                    total = (composition / masses * _oxygen_numbers[columns]).sum(axis=1)
+                converted = converted / total[:, np.newaxis]
+            else:
+                raise core.InputError("The units must be one of 'wtpt_oxides', 'mol_oxides', "
+                                      "'mol_cations', or 'mol_singleO'.")
+
+            # As for Sample, volatiles are only recognised by oxide name
+            if units in ['wtpt_oxides', 'mol_oxides']:
+                volatile = _is_volatile[columns]
+            else:
+                volatile = np.zeros(columns.sum(), dtype=bool)
+            final = self._normalize(converted, volatile, normalization, units)
+
+        if species is None:
+            if units in ['wtpt_oxides', 'mol_oxides']:
+                names = [ox for ox, column in zip(core.oxides, columns) if column]
+            else:
+                names = [cation for cation, column in zip(_cations, columns) if column]
+            return pd.DataFrame(final, index=self.index, columns=names)
+        else:
+            return final[:, np.flatnonzero(columns).tolist().index(core.oxides.index(oxide))]
+
+    def change_composition(self, new_composition, units='wtpt_oxides', inplace=True):
+        """
+        Change the concentration of some components of the compositions, as for
+        Sample.change_composition().
+
+        Parameters
+        ----------
+        new_composition:    dict or pandas.Series
+            The components to be updated, each with a single value for all samples or an array
+            with one value per sample.
+        units:      str
+            The units of new_composition. Should be one of:
+            - wtpt_oxides (default)
+            - mol_oxides
+            - mol_cations
+        inplace:    bool
+            If True the object will be modified in place. If False, a copy of the SampleBatch
+            object will be created, modified, and then returned.
+
+        Returns
+        -------
+        SampleBatch class
+            Modified SampleBatch class.
+        """
+        if isinstance(new_composition, pd.Series):
+            new_composition = dict(new_composition)
+
+        if inplace is False:
+            newbatch = self.copy()
+            return newbatch.change_composition(new_composition, units=units)
+
+        if units == 'mol_cations':
+            names = _cations
+        elif units in ['wtpt_oxides', 'mol_oxides']:
+            names = core.oxides
+        else:
+            raise core.InputError("Units must be one of 'wtpt_oxides', 'mol_oxides', or "
+                                  "'mol_cations'.")
+        for name in new_composition:
+            if name not in names:
+                raise core.InputError(str(name) + " was not recognised, check spelling, " +
+                                      "capitalization and stoichiometry.")
+
+        if units == 'wtpt_oxides':
+            composition = self._composition
+        elif units == 'mol_oxides':
+            cation_numbers = np.ones(len(core.oxides))
+        else:
+            cation_numbers = _cation_numbers
+        if units != 'wtpt_oxides':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                composition = self._composition / _oxide_masses * cation_numbers
+                composition = composition / np.nansum(composition, axis=1)[:, np.newaxis]
+
+        for name in new_composition:
+            column = names.index(name)
+            composition[:, column] = new_composition[name]
+            self._present[column] = True
+
+        if units != 'wtpt_oxides':
+            self._composition = self._moles_to_wtpercentOxides(composition, cation_numbers)
+
+        return self
+
+    def check_oxide(self, oxide):
+        """
+        Check whether the compositions contain the given oxide.
+
+        Parameters
+        ----------
+        oxide:  str
+            Oxide name to check compositions for.
+
+        Returns
+        -------
+        bool
+            Whether the compositions contain the given oxide, or not.
+        """
+        if oxide not in core.oxides:
+            w.warn("Oxide name not recognised. If it is in your sample, unexpected behaviour "
+                   "might occur!",
+                   RuntimeWarning, stacklevel=2)
+            return False
+        return bool(self._present[core.oxides.index(oxide)])
+
+    def copy(self):
+        """ Returns a copy of the SampleBatch object, which does not share its compositions. """
+        newbatch = copy(self)
+        newbatch._composition = self._composition.copy()
+        newbatch._present = self._present.copy()
+        return newbatch
+
+    def get_sample(self, samplename):
+        """
+        Returns the composition of one sample as a Sample object.
+
+        Parameters
+        ----------
+        samplename:     object
+            The name of the sample, from the index.
+
+        Returns
+        -------
+        Sample class
+            The sample, with the same default normalization and units as the SampleBatch.
+        """
+        row = self._composition[self.index.get_loc(samplename)]
+        composition = pd.Series({ox: value for ox, value, present
+                                 in zip(core.oxides, row, self._present) if present},
+                                dtype='float64')
+        return Sample(composition, default_normalization=self.default_normalization,
+                      default_units=self.default_units)
+
+    def _normalize(self, composition, volatile, normalization, units):
+        """
+        Normalizes compositions as Sample._normalize_Standard, _normalize_FixedVolatiles, and
+        _normalize_AdditionalVolatiles do. Intended to be called only by the get_composition()
+        method.
+
+        Parameters
+        ----------
+        composition:    numpy.ndarray
+            Compositions, one per row.
+
+        volatile:   numpy.ndarray
+            Boolean array marking the volatile columns of composition.
+
+        normalization:     str
+            One of 'none', 'standard', 'fixedvolatiles', or 'additionalvolatiles'.
+
+        units:      str
+            The units of composition.
+
+        Returns
+        -------
+        numpy.ndarray
+            Normalized compositions.
+        """
+        if normalization == 'none':
+            return composition
+        elif normalization not in ['standard', 'fixedvolatiles', 'additionalvolatiles']:
+            raise core.InputError("The normalization method must be one of 'none', 'standard', "
+                                  "'fixedvolatiles', or 'additionalvolatiles'.")
+
+        if units == 'wtpt_oxides':
+            total = 100.0
+        elif units == 'mol_oxides' or units == 'mol_cations':
+            total = 1.0
+        else:
+            raise core.InputError("Units must be one of 'wtpt_oxides', 'mol_oxides', or "
+                                  "'mol_cations'.")
+
+        if normalization == 'standard':
+            return total * composition / composition.sum(axis=1)[:, np.newaxis]
+
+        normalized = composition.copy()
+        majors = composition[:, ~volatile]
+        if normalization == 'fixedvolatiles':
+            total = total - composition[:, volatile].sum(axis=1)
+        normalized[:, ~volatile] = (majors / np.nansum(majors, axis=1)[:, np.newaxis] *
+                                    np.reshape(total, (-1, 1)))
+        return normalized
+
+    def _moles_to_wtpercentOxides(self, moles, cation_numbers):
+        """
+        Converts moles of each oxide (or of its cation, if cation_numbers is given) to wt%
+        oxides, normalized to 100 wt%.
+
+        Parameters
+        ----------
+        moles:  numpy.ndarray
+            Moles of each oxide in core.oxides, one sample per row.
+
+        cation_numbers:     numpy.ndarray
+            Number of cations in each oxide, or ones if moles are of oxides.
+
+        Returns
+        -------
+        numpy.ndarray
+            Wt% oxides, normalized to 100 wt%.
+        """
+        wtpt = moles / cation_numbers * _oxide_masses
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return wtpt / np.nansum(wtpt, axis=1)[:, np.newaxis] * 100
@@ -0,0 +1,265 @@
+import unittest
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import VESIcal as v
+from VESIcal import batchmodel
+from VESIcal import melts_engine
+from VESIcal.models import magmasat
+
+calculated = []
+
+
+def record_calculation(x):
+    """Stands in for a calculation, recording each call."""
+    calculated.append(x)
+    return x**2
+
+
+class FailingEngine(melts_engine.MixedFluidEngine):
+    """A MixedFluidEngine that raises an error for systems with 5 wt% H2O or more."""
+    def equilibrate_tp(self, T_a, P_a, initialize=False):
+        if self.bulk_comp.get('H2O', 0.0) >= 5.0:
+            raise RuntimeError("test failure")
+        return super().equilibrate_tp(T_a, P_a, initialize=initialize)
+
+
+class HangingEngine(melts_engine.MixedFluidEngine):
+    """A MixedFluidEngine that hangs for systems with 5 wt% H2O or more."""
+    def equilibrate_tp(self, T_a, P_a, initialize=False):
+        if self.bulk_comp.get('H2O', 0.0) >= 5.0:
+            time.sleep(60.0)
+        return super().equilibrate_tp(T_a, P_a, initialize=initialize)
+
+
+class TestBudgets(unittest.TestCase):
+    def setUp(self):
+        self.majors = {'SiO2':    47.95,
+                       'TiO2':    1.67,
+                       'Al2O3':   17.32,
+                       'FeO':     10.24,
+                       'Fe2O3':   0.1,
+                       'MgO':     5.76,
+                       'CaO':     10.93,
+                       'Na2O':    3.45,
+                       'K2O':     1.99,
+                       'P2O5':    0.51,
+                       'MnO':     0.1,
+                       'H2O':     2.0,
+                       'CO2':     0.1}
+        self.batch = v.BatchFile_from_DataFrame(pd.DataFrame([self.majors, self.majors],
+                                                             index=['sample1', 'sample2']))
+
+        self.previous_engine = magmasat.get_engine()
+        magmasat.set_engine(melts_engine.MixedFluidEngine)
+
+    def tearDown(self):
+        magmasat.set_engine(self.previous_engine)
+
+    def test_timeout(self):
+        # time.sleep stands in for a calculation; the second sample never finishes in time
+        calc_args = [('a', (0.0,)), ('b', (60.0,)), ('c', (0.0,))]
+        start = time.monotonic()
+        results = self.batch._run_calculations(time.sleep, calc_args, timeout=5.0)
+        self.assertLess(time.monotonic() - start, 50.0)
+        self.assertIsNone(results['a'])
+        self.assertIsInstance(results['b'], v.core.BudgetExceededError)
+        self.assertIsNone(results['c'])
+
+    def test_timeout_with_executor(self):
+        with self.assertRaises(v.core.InputError):
+            self.batch._run_calculations(time.sleep, [], timeout=5.0, executor=object())
+
+    def test_max_equilibrations(self):
+        # Budgeted first, since equilibrations answered from the MELTS cache are not counted
+        satP = self.batch.calculate_saturation_pressure(temperature=1000, print_status=False,
+                                                        max_equilibrations=2)
+        self.assertTrue(satP['SaturationP_bars_VESIcal'].isna().all())
+        self.assertTrue(satP['Warnings'].str.contains('2 MELTS equilibrations').all())
+
+        satP = self.batch.calculate_saturation_pressure(temperature=1000, print_status=False)
+        self.assertTrue((satP['SaturationP_bars_VESIcal'] > 0).all())
+
+    def test_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.sqlite')
+            first = v.BatchFile_from_DataFrame(pd.DataFrame([self.majors], index=['sample1']))
+            satP = first.calculate_saturation_pressure(temperature=1000, print_status=False,
+                                                       checkpoint=path)
+            self.assertGreater(satP.loc['sample1', 'SaturationP_bars_VESIcal'], 0)
+
+            # MELTS can no longer be called, so only sample1, from the checkpoint, has a result
+            magmasat.set_engine(lambda version: melts_engine.MissingEngine())
+            batch = v.BatchFile_from_DataFrame(pd.DataFrame([self.majors,
+                                                             dict(self.majors, H2O=3.0)],
+                                                            index=['sample1', 'sample2']))
+            resumed = batch.calculate_saturation_pressure(temperature=1000, print_status=False,
+                                                          checkpoint=path)
+            self.assertEqual(resumed.loc['sample1', 'SaturationP_bars_VESIcal'],
+                             satP.loc['sample1', 'SaturationP_bars_VESIcal'])
+            self.assertTrue(np.isnan(resumed.loc['sample2', 'SaturationP_bars_VESIcal']))
+
+            # A different temperature is a different calculation
+            changed = batch.calculate_saturation_pressure(temperature=1100, print_status=False,
+                                                          checkpoint=path)
+            self.assertTrue(changed['SaturationP_bars_VESIcal'].isna().all())
+
+    def test_duplicates(self):
+        del calculated[:]
+        calc_args = [('a', (1,)), ('b', (2,)), ('c', (1,)), ('d', (1,))]
+        results = self.batch._run_calculations(record_calculation, calc_args)
+        self.assertEqual(results, {'a': 1, 'b': 4, 'c': 1, 'd': 1})
+        self.assertEqual(calculated, [1, 2])
+
+    def test_duplicate_samples(self):
+        data = pd.DataFrame([self.majors, self.majors, dict(self.majors, H2O=3.0)],
+                            index=['sample1', 'sample2', 'sample3'])
+        data['Temperature'] = [1000, 1000, 1000]
+        satP = v.BatchFile_from_DataFrame(data).calculate_saturation_pressure(
+                                    temperature='Temperature', print_status=False,
+                                    record_melts_calls=True)
+        self.assertEqual(satP.loc['sample1', 'SaturationP_bars_VESIcal'],
+                         satP.loc['sample2', 'SaturationP_bars_VESIcal'])
+        self.assertNotEqual(satP.loc['sample1', 'SaturationP_bars_VESIcal'],
+                            satP.loc['sample3', 'SaturationP_bars_VESIcal'])
+        self.assertGreater(satP.loc['sample1', 'equilibrate_tp_calls_VESIcal'], 0)
+        self.assertEqual(satP.loc['sample2', 'equilibrate_tp_calls_VESIcal'], 0)
+
+    def test_nearest_neighbour_order(self):
+        samples = [v.Sample(dict(self.majors, H2O=H2O)) for H2O in [1.0, 4.0, 2.0, 3.0]]
+        calc_args = [(index, (sample, 1000.0)) for index, sample in zip('abcd', samples)]
+        order = batchmodel._nearest_neighbour_order(calc_args, 1)
+        self.assertEqual([index for index, args in order], ['a', 'c', 'd', 'b'])
+
+    def test_warm_start(self):
+        data = pd.DataFrame([dict(self.majors, H2O=H2O) for H2O in [3.0, 1.0, 2.9, 1.1]],
+                            index=['sample1', 'sample2', 'sample3', 'sample4'])
+        batch = v.BatchFile_from_DataFrame(data)
+        cold = batch.calculate_saturation_pressure(temperature=1000, print_status=False)
+        magmasat.set_engine(melts_engine.MixedFluidEngine)  # empties the MELTS cache
+        warm = batch.calculate_saturation_pressure(temperature=1000, print_status=False,
+                                                   warm_start=True)
+        self.assertEqual(list(warm.index), list(cold.index))
+        for index in data.index:
+            self.assertLessEqual(abs(warm.loc[index, 'SaturationP_bars_VESIcal'] -
+                                     cold.loc[index, 'SaturationP_bars_VESIcal']), 10.0)
+
+    def test_calculate_in_chunks(self):
+        data = pd.DataFrame([dict(self.majors, H2O=H2O) for H2O in [1.0, 2.0, 3.0, 4.0, 5.0]])
+        data.insert(0, 'Label', ['sample' + str(i) for i in range(len(data))])
+        expected = v.BatchFile_from_DataFrame(data, label='Label').calculate_saturation_pressure(
+                        temperature=1000, print_status=False)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'samples.csv')
+            output_path = os.path.join(directory, 'results.csv')
+            data.to_csv(path, index=False)
+            n_samples = v.calculate_in_chunks(path, output_path, 'calculate_saturation_pressure',
+                                              chunksize=2, temperature=1000,
+                                              print_status=False)
+            results = pd.read_csv(output_path, index_col='Label')
+        self.assertEqual(n_samples, 5)
+        self.assertEqual(list(results.index), list(expected.index))
+        np.testing.assert_allclose(results['SaturationP_bars_VESIcal'],
+                                   expected['SaturationP_bars_VESIcal'])
+
+        with self.assertRaises(v.core.InputError):
+            v.calculate_in_chunks(path, output_path, 'calculate_isobars_and_isopleths')
+
+    def test_degassing_path_in_chunks(self):
+        data = pd.DataFrame([dict(self.majors, H2O=H2O) for H2O in [6.0, 2.0, 3.0]])
+        data.insert(0, 'Label', ['sample' + str(i) for i in range(len(data))])
+        expected = v.BatchFile_from_DataFrame(data, label='Label').calculate_degassing_path(
+                        temperature=1000, steps=5, print_status=False)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'samples.csv')
+            output_path = os.path.join(directory, 'results.csv')
+            data.to_csv(path, index=False)
+            n_rows = v.calculate_in_chunks(path, output_path, 'calculate_degassing_path',
+                                           chunksize=2, temperature=1000, steps=5,
+                                           print_status=False)
+            results = pd.read_csv(output_path, index_col='Label')
+            self.assertEqual(n_rows, len(expected))
+            self.assertEqual(list(results.index), list(expected.index))
+            np.testing.assert_allclose(results['Pressure_bars'], expected['Pressure_bars'])
+            np.testing.assert_allclose(results['H2O_liq'], expected['H2O_liq'])
+
+            # Every path of the first chunk fails, so the second chunk adds all the columns
+            magmasat.set_engine(FailingEngine)
+            with self.assertWarns(RuntimeWarning):
+                v.calculate_in_chunks(path, output_path, 'calculate_degassing_path',
+                                      chunksize=1, temperature=1000, steps=5,
+                                      print_status=False)
+            results = pd.read_csv(output_path, index_col='Label')
+        self.assertEqual(list(results.index), list(expected.loc[['sample1', 'sample2']].index))
+        self.assertEqual(list(results.columns), list(expected.columns))
+        np.testing.assert_allclose(results['H2O_liq'],
+                                   expected.loc[['sample1', 'sample2'], 'H2O_liq'])
+
+
+class TestWorkers(unittest.TestCase):
+    def setUp(self):
+        majors = {'SiO2': 47.95, 'TiO2': 1.67, 'Al2O3': 17.32, 'FeO': 10.24, 'Fe2O3': 0.1,
+                  'MgO': 5.76, 'CaO': 10.93, 'Na2O': 3.45, 'K2O': 1.99, 'P2O5': 0.51,
+                  'MnO': 0.1, 'CO2': 0.1}
+        # Out of order in H2O, so that results returned in order of completion would be noticed
+        self.batch = v.BatchFile_from_DataFrame(
+                        pd.DataFrame([dict(majors, H2O=H2O) for H2O in [3.0, 1.0, 6.0, 2.0]],
+                                     index=['sample1', 'sample2', 'sample3', 'sample4']))
+        self.previous_engine = magmasat.get_engine()
+        magmasat.set_engine(melts_engine.MixedFluidEngine)
+
+    def tearDown(self):
+        magmasat.set_engine(self.previous_engine)
+
+    def calculate_saturation_pressure(self, **kwargs):
+        return self.batch.calculate_saturation_pressure(temperature=1000, print_status=False,
+                                                        **kwargs)
+
+    def test_n_workers(self):
+        serial = self.calculate_saturation_pressure()
+        magmasat.set_engine(melts_engine.MixedFluidEngine)  # empties the MELTS cache
+        parallel = self.calculate_saturation_pressure(n_workers=2)
+        self.assertEqual(list(parallel.index), list(serial.index))
+        pd.testing.assert_series_equal(parallel['SaturationP_bars_VESIcal'],
+                                       serial['SaturationP_bars_VESIcal'])
+        self.assertTrue((parallel['SaturationP_bars_VESIcal'] > 0).all())
+
+    def test_executor(self):
+        serial = self.batch.calculate_dissolved_volatiles(temperature=1000, pressure=2000.0,
+                                                          X_fluid=0.5, print_status=False)
+        executor = ProcessPoolExecutor(max_workers=2,
+                                       mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=magmasat._initialize_worker,
+                                       initargs=(melts_engine.MixedFluidEngine,))
+        try:
+            parallel = self.batch.calculate_dissolved_volatiles(
+                            temperature=1000, pressure=2000.0, X_fluid=0.5, print_status=False,
+                            executor=executor)
+            # The executor is not shut down
+            self.assertEqual(executor.submit(abs, -1).result(), 1)
+        finally:
+            executor.shutdown()
+        self.assertEqual(list(parallel.index), list(serial.index))
+        for column in ['H2O_liq_VESIcal', 'CO2_liq_VESIcal']:
+            pd.testing.assert_series_equal(parallel[column], serial[column])
+
+    def test_failed_worker(self):
+        magmasat.set_engine(FailingEngine)
+        satP = self.calculate_saturation_pressure(n_workers=2)
+        self.assertTrue(np.isnan(satP.loc['sample3', 'SaturationP_bars_VESIcal']))
+        self.assertEqual(satP.loc['sample3', 'Warnings'], 'Calculation Failed')
+        self.assertTrue((satP.drop('sample3')['SaturationP_bars_VESIcal'] > 0).all())
+
+    def test_timed_out_worker(self):
+        magmasat.set_engine(HangingEngine)
+        start = time.monotonic()
+        satP = self.calculate_saturation_pressure(n_workers=2, timeout=5.0)
+        self.assertLess(time.monotonic() - start, 50.0)
+        self.assertEqual(list(satP.index), list(self.batch.get_data().index))
+        self.assertTrue(np.isnan(satP.loc['sample3', 'SaturationP_bars_VESIcal']))
+        self.assertIn('timed out', satP.loc['sample3', 'Warnings'])
+        self.assertTrue((satP.drop('sample3')['SaturationP_bars_VESIcal'] > 0).all())
@@ -1,5 +1,11 @@
+import contextlib
+import io
 import unittest
 import VESIcal as v
+import numpy as np
+from VESIcal import melts_engine
+from VESIcal import melts_stats
+from VESIcal.models import magmasat
 
 class TestDissolvedVolatiles(unittest.TestCase):
     def setUp(self):
@@ -448,5 +454,78 @@ class TestEquilibriumFluidComp(unittest.TestCase):
             known_result = self.water_dict[model]
             self.assertAlmostEqual(calcd_result, known_result, places=4)
 
+class TestDegassingPath(unittest.TestCase):
+    def setUp(self):
+        # Set conditions of calculation
+        self.temperature = 1000
+
+        # BatchFile with test sample in wtpt_oxides
+        try:
+            self.batch_wtpt = v.BatchFile('BatchTest.xlsx', units='wtpt_oxides')
+        except:
+            self.batch_wtpt = v.BatchFile('tests/BatchTest.xlsx', units='wtpt_oxides')
+        self.batch_wtpt.set_default_units("wtpt_oxides")
+        self.sample_wtpt = self.batch_wtpt.get_sample_composition('test_samp', asSampleClass=True)
+
+        self.models = ['Dixon', 'IaconoMarziano']
+
+    def test_calculate_batch_matches_single(self):
+        for model in self.models:
+            for fractionate_vapor in [0.0, 1.0]:
+                batch_result = self.batch_wtpt.calculate_degassing_path(
+                                                    temperature=self.temperature, model=model,
+                                                    fractionate_vapor=fractionate_vapor, steps=11)
+                calcd_result = batch_result.loc['test_samp']
+                known_result = v.calculate_degassing_path(self.sample_wtpt,
+                                                          temperature=self.temperature,
+                                                          model=model,
+                                                          fractionate_vapor=fractionate_vapor,
+                                                          steps=11).result
+                self.assertEqual(len(calcd_result), 11)
+                for column in ['Pressure_bars', 'H2O_liq', 'CO2_liq']:
+                    np.testing.assert_allclose(calcd_result[column].values,
+                                               known_result[column].values)
+                self.assertTrue((calcd_result['Model'] == model).all())
+
+    def calculate_magmasat_path(self, **kwargs):
+        """Calculates a MagmaSat degassing path with the MixedFluidEngine stand-in for MELTS,
+        returning the path and the number of MELTS equilibrations it took."""
+        with contextlib.redirect_stdout(io.StringIO()), melts_stats.record_calls() as stats:
+            result = magmasat.MagmaSat().calculate_degassing_path(
+                            self.sample_wtpt, temperature=self.temperature, **kwargs)
+        return result, stats.calls['equilibrate_tp']
+
+    def test_adaptive_first_step(self):
+        previous_engine = magmasat.get_engine()
+        magmasat.set_engine(melts_engine.MixedFluidEngine)
+        try:
+            result, calls = self.calculate_magmasat_path(steps=10, step_tolerance=1.0)
+            sample = v.Sample(self.sample_wtpt.get_composition(normalization='standard'))
+            satP = magmasat.MagmaSat().calculate_saturation_pressure(
+                            sample=sample, temperature=self.temperature)
+        finally:
+            magmasat.set_engine(previous_engine)
+        # The first step is a tenth of the saturation pressure
+        self.assertAlmostEqual(result['Pressure_bars'].iloc[0], 0.9 * satP, delta=0.01 * satP)
+
+    def test_adaptive_matches_fixed(self):
+        tolerance = 0.05
+        previous_engine = magmasat.get_engine()
+        magmasat.set_engine(melts_engine.MixedFluidEngine)
+        try:
+            # The adaptive path is calculated first, so that it also counts the equilibrations
+            # of the saturation pressure calculation, which are then cached
+            adaptive, adaptive_calls = self.calculate_magmasat_path(steps=10,
+                                                                    step_tolerance=tolerance)
+            fixed, fixed_calls = self.calculate_magmasat_path(steps=100)
+        finally:
+            magmasat.set_engine(previous_engine)
+        self.assertLess(adaptive_calls, fixed_calls)
+        for column in ['H2O_liq', 'CO2_liq']:
+            expected = np.interp(adaptive['Pressure_bars'], fixed['Pressure_bars'][::-1],
+                                 fixed[column][::-1])
+            np.testing.assert_array_less(np.abs(adaptive[column] - expected),
+                                         tolerance * fixed[column].iloc[0])
+
 if __name__ == '__main__':
     unittest.main()
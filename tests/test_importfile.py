@@ -47,4 +47,89 @@ class TestImportExcel(unittest.TestCase):
 
     def test_ImportExcel(self):
         self.assertEqual(self.df, self.myfile.get_data(), 
-                         'DataFrame are different')
\ No newline at end of file
+                         'DataFrame are different')
+
+
+class TestGetComposition(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({'SiO2':  [47.95, 56.0, 72.1],
+                                  'TiO2':  [1.67, 1.1, 0.2],
+                                  'Al2O3': [17.32, 16.5, 13.0],
+                                  'FeO':   [10.24, 7.0, 1.5],
+                                  'MgO':   [5.76, 3.5, 0.3],
+                                  'CaO':   [10.93, 7.0, 1.2],
+                                  'Na2O':  [3.45, 3.9, 4.1],
+                                  'K2O':   [1.99, 1.7, 4.5],
+                                  'H2O':   [2.0, 4.0, 6.0],
+                                  'CO2':   [0.1, 0.05, 0.0]},
+                                 index=['basalt', 'andesite', 'rhyolite'])
+
+    def get_sample_compositions(self, batch, **kwargs):
+        """Returns the compositions of each sample calculated with the Sample class."""
+        compositions = []
+        for index, row in batch.data.iterrows():
+            sample = v.Sample(dict(row[[ox for ox in row.index if ox in v.core.oxides]]))
+            sample = v.Sample(sample.get_composition(normalization=batch.default_normalization))
+            compositions.append(sample.get_composition(**kwargs).rename(index))
+        return pd.DataFrame(compositions)
+
+    def test_matches_sample(self):
+        normalizations = ['none', 'standard', 'fixedvolatiles', 'additionalvolatiles']
+        for default_normalization in normalizations:
+            batch = v.BatchFile_from_DataFrame(self.data)
+            batch.set_default_normalization(default_normalization)
+            for units in ['wtpt_oxides', 'mol_oxides', 'mol_cations']:
+                for normalization in normalizations:
+                    for exclude_volatiles in [False, True]:
+                        kwargs = {'units': units, 'normalization': normalization,
+                                  'exclude_volatiles': exclude_volatiles}
+                        pd.testing.assert_frame_equal(batch.get_composition(**kwargs),
+                                                      self.get_sample_compositions(batch,
+                                                                                   **kwargs))
+
+        batch = v.BatchFile_from_DataFrame(self.data)
+        pd.testing.assert_frame_equal(batch.get_composition(units='mol_singleO'),
+                                      self.get_sample_compositions(batch, units='mol_singleO',
+                                                                   normalization='none'))
+
+    def test_species(self):
+        batch = v.BatchFile_from_DataFrame(self.data)
+        pd.testing.assert_frame_equal(batch.get_composition(species='H2O'),
+                                      pd.DataFrame({'H2O': [2.0, 4.0, 6.0]},
+                                                   index=self.data.index))
+        self.assertEqual(list(batch.get_composition(species='H2O', exclude_volatiles=True)['H2O']),
+                         [0.0, 0.0, 0.0])
+        mol_SiO2 = batch.get_composition(species='SiO2', units='mol_oxides')['SiO2']
+        self.assertAlmostEqual(mol_SiO2['basalt'],
+                               v.Sample(dict(self.data.loc['basalt'])).get_composition(
+                                   species='SiO2', units='mol_oxides'))
+
+
+class TestImportUnits(unittest.TestCase):
+    def setUp(self):
+        self.sample = v.Sample({'SiO2': 47.95, 'TiO2': 1.67, 'Al2O3': 17.32, 'FeO': 10.24,
+                                'Fe2O3': 0.1, 'MgO': 5.76, 'CaO': 10.93, 'Na2O': 3.45,
+                                'K2O': 1.99, 'P2O5': 0.51, 'MnO': 0.1, 'H2O': 2.0, 'CO2': 0.1})
+        self.wtpt = self.sample.get_composition(normalization='standard')
+
+    def assertImported(self, batch):
+        composition = batch.get_composition()
+        for oxide in v.core.oxides:
+            self.assertAlmostEqual(composition[oxide]['sample'], self.wtpt.get(oxide, 0.0))
+
+    def test_mol_oxides(self):
+        data = pd.DataFrame([self.sample.get_composition(units='mol_oxides')], index=['sample'])
+        self.assertImported(v.BatchFile_from_DataFrame(data, units='mol_oxides'))
+
+    def test_mol_cations(self):
+        data = pd.DataFrame([self.sample.get_composition(units='mol_cations')], index=['sample'])
+        self.assertImported(v.BatchFile_from_DataFrame(data, units='mol_cations'))
+
+    def test_total_iron(self):
+        data = pd.DataFrame({'SiO2': [50.0, 50.0], 'FeO': [0.0, 8.0], 'FeOT': [9.0, 10.0],
+                             'MgO': [-1.0, 5.0]}, index=['sample1', 'sample2'])
+        with self.assertWarns(RuntimeWarning):
+            batch = v.BatchFile_from_DataFrame(data)
+        self.assertEqual(list(batch.data['FeO']), [9.0, 8.0])
+        self.assertEqual(list(batch.data['Fe2O3']), [0.0, 0.0])
+        self.assertEqual(list(batch.data['MgO']), [0.0, 5.0])
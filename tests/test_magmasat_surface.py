@@ -0,0 +1,173 @@
+import unittest
+import contextlib
+import io
+import os
+import tempfile
+import warnings
+import numpy as np
+import pandas as pd
+import VESIcal as v
+from VESIcal import melts_engine
+from VESIcal.models import magmasat
+from VESIcal.models import magmasat_surface
+
+
+class TestMagmaSatSurface(unittest.TestCase):
+    """The interpolation is tested on a surface built from the Dixon model, so that results can
+    be compared against it without MELTS."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sample = v.Sample({'SiO2':    47.95,
+                               'TiO2':    1.67,
+                               'Al2O3':   17.32,
+                               'FeO':     10.24,
+                               'Fe2O3':   0.1,
+                               'MgO':     5.76,
+                               'CaO':     10.93,
+                               'Na2O':    3.45,
+                               'K2O':     1.99,
+                               'P2O5':    0.51,
+                               'MnO':     0.1,
+                               'H2O':     2.0,
+                               'CO2':     0.1})
+        cls.model = v.models.default_models['Dixon']
+        temperatures = [1000, 1100]
+        pressures = np.arange(250, 4001, 250)
+        X_vals = magmasat_surface.default_X_fluid
+        shape = (len(temperatures), len(pressures), len(X_vals))
+        H2O_liq = np.zeros(shape)
+        CO2_liq = np.zeros(shape)
+        for i, T in enumerate(temperatures):
+            for j, P in enumerate(pressures):
+                for k, X in enumerate(X_vals):
+                    dissolved = cls.model.calculate_dissolved_volatiles(
+                                    sample=cls.sample, temperature=T, pressure=float(P),
+                                    X_fluid=float(X), returndict=True)
+                    H2O_liq[i, j, k] = dissolved['H2O_liq']
+                    CO2_liq[i, j, k] = dissolved['CO2_liq']
+        cls.holdout_points = [(1000.0, 1234.0, 0.37), (1000.0, 3100.0, 0.93)]
+        holdout = []
+        for (T, P, X) in cls.holdout_points:
+            dissolved = cls.model.calculate_dissolved_volatiles(
+                            sample=cls.sample, temperature=T, pressure=P, X_fluid=X,
+                            returndict=True)
+            holdout.append([T, P, X, dissolved['H2O_liq'], dissolved['CO2_liq']])
+        holdout = pd.DataFrame(holdout, columns=['Temperature', 'Pressure', 'XH2O_fl',
+                                                 'H2O_liq', 'CO2_liq'])
+        cls.surface = magmasat_surface.MagmaSatSurface(temperatures, pressures, X_vals,
+                                                       H2O_liq, CO2_liq,
+                                                       cls.sample.get_composition(),
+                                                       holdout=holdout)
+
+    def test_dissolved_volatiles(self):
+        for (T, P, X) in self.holdout_points:
+            expected = self.model.calculate_dissolved_volatiles(
+                            sample=self.sample, temperature=T, pressure=P, X_fluid=X,
+                            returndict=True)
+            result = self.surface.calculate_dissolved_volatiles(sample=self.sample,
+                                                                temperature=T, pressure=P,
+                                                                X_fluid=X)
+            self.assertAlmostEqual(result['H2O_liq'], expected['H2O_liq'], places=2)
+            self.assertAlmostEqual(result['CO2_liq'], expected['CO2_liq'], places=3)
+
+    def test_saturation_pressure(self):
+        expected = self.model.calculate_saturation_pressure(sample=self.sample,
+                                                            temperature=1000)
+        result = v.calculate_saturation_pressure(sample=self.sample, temperature=1000,
+                                                 model=self.surface).result
+        self.assertLess(abs(result - expected), 10.0)
+
+    def test_precomputed_saturation_pressure(self):
+        SaturationP = [self.model.calculate_saturation_pressure(sample=self.sample,
+                                                                temperature=T)
+                       for T in self.surface.temperature]
+        surface = magmasat_surface.MagmaSatSurface(
+                        self.surface.temperature, self.surface.pressure, self.surface.X_fluid,
+                        self.surface.H2O_liq, self.surface.CO2_liq, self.surface.composition,
+                        volatiles={'H2O': 2.0, 'CO2': 0.1}, SaturationP=SaturationP,
+                        saturation_XH2O_fl=[0.5, 0.6])
+        result = surface.calculate_saturation_pressure(sample=self.sample, temperature=1050,
+                                                       verbose=True)
+        self.assertAlmostEqual(result['SaturationP_bars'], np.mean(SaturationP))
+        self.assertAlmostEqual(result['XH2O_fl'], 0.55)
+
+        # Other volatile concentrations are found on the isobars
+        sample = v.Sample(dict(self.sample.get_composition(), H2O=1.5))
+        self.assertEqual(surface.calculate_saturation_pressure(sample=sample, temperature=1000),
+                         self.surface.calculate_saturation_pressure(sample=sample,
+                                                                    temperature=1000))
+
+        path = os.path.join(tempfile.mkdtemp(), 'surface.npz')
+        surface.save(path)
+        loaded = magmasat_surface.load_surface(path)
+        np.testing.assert_array_equal(loaded.SaturationP, surface.SaturationP)
+        self.assertEqual(loaded.volatiles, surface.volatiles)
+
+    def test_equilibrium_fluid_comp(self):
+        undersaturated = self.surface.calculate_equilibrium_fluid_comp(
+                                sample=self.sample, temperature=1000, pressure=3000)
+        self.assertEqual(undersaturated, {'CO2': 0.0, 'H2O': 0.0})
+        saturated = self.surface.calculate_equilibrium_fluid_comp(
+                                sample=self.sample, temperature=1000, pressure=1000)
+        self.assertGreater(saturated['H2O'], 0.0)
+        self.assertAlmostEqual(saturated['H2O'] + saturated['CO2'], 1.0)
+
+    def test_interpolation_error(self):
+        errors = self.surface.get_interpolation_error()
+        self.assertEqual(errors['n_points'], 2)
+        self.assertLess(errors['H2O_liq'], 0.01)
+        self.assertLess(errors['CO2_liq'], 0.001)
+
+    def test_save_and_load(self):
+        path = os.path.join(tempfile.mkdtemp(), 'surface.npz')
+        self.surface.save(path)
+        surface = magmasat_surface.load_surface(path)
+        np.testing.assert_array_equal(surface.H2O_liq, self.surface.H2O_liq)
+        np.testing.assert_array_equal(surface.pressure, self.surface.pressure)
+        self.assertEqual(surface.get_interpolation_error(),
+                         self.surface.get_interpolation_error())
+        self.assertIsNone(surface.SaturationP)
+
+    def test_outside_grid(self):
+        with self.assertRaises(v.core.InputError):
+            self.surface.calculate_dissolved_volatiles(sample=self.sample, temperature=1200,
+                                                       pressure=1000)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            sample = v.Sample(dict(self.sample.get_composition(), H2O=8.0))
+            self.assertTrue(np.isnan(self.surface.calculate_saturation_pressure(
+                                        sample=sample, temperature=1000)))
+
+    def test_composition_check(self):
+        sample = v.Sample(dict(self.sample.get_composition(), SiO2=55.0))
+        with self.assertWarns(RuntimeWarning):
+            self.surface.calculate_dissolved_volatiles(sample=sample, temperature=1000,
+                                                       pressure=1000)
+
+
+class TestCalculateSurface(unittest.TestCase):
+    def setUp(self):
+        self.sample = v.Sample({'SiO2': 47.95, 'TiO2': 1.67, 'Al2O3': 17.32, 'FeO': 10.24,
+                                'Fe2O3': 0.1, 'MgO': 5.76, 'CaO': 10.93, 'Na2O': 3.45,
+                                'K2O': 1.99, 'P2O5': 0.51, 'MnO': 0.1, 'H2O': 2.0,
+                                'CO2': 0.1})
+        self.previous_engine = magmasat.get_engine()
+        magmasat.set_engine(melts_engine.MixedFluidEngine)
+
+    def tearDown(self):
+        magmasat.set_engine(self.previous_engine)
+
+    def test_saturation_pressure_precomputed(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            surface = magmasat_surface.calculate_surface(self.sample, [1000, 1100],
+                                                         [500, 1000, 2000, 3000],
+                                                         X_fluid=[0.0, 0.5, 1.0], n_holdout=1)
+            expected = [magmasat.MagmaSat().calculate_saturation_pressure(sample=self.sample,
+                                                                          temperature=T)
+                        for T in [1000, 1100]]
+        self.assertEqual(surface.volatiles, {'H2O': 2.0, 'CO2': 0.1})
+        np.testing.assert_allclose(surface.SaturationP, expected)
+        self.assertEqual(surface.calculate_saturation_pressure(sample=self.sample,
+                                                               temperature=1000),
+                         expected[0])
@@ -0,0 +1,76 @@
+import unittest
+import os
+import tempfile
+from VESIcal import melts_cache
+
+
+class CountingMELTS(object):
+    """Stands in for a MELTS instance, counting equilibrations."""
+    def __init__(self):
+        self.calls = 0
+        self.bulk = {}
+
+    def set_bulk_composition(self, bulk_comp):
+        self.bulk = dict(bulk_comp)
+
+    def equilibrate_tp(self, T_a, P_a, initialize=False):
+        self.calls += 1
+        return [('success', T_a, P_a, {'H2O': self.bulk.get('H2O', 0) * P_a})]
+
+    def get_mass_of_phase(self, xmlout, phase_name='System'):
+        return xmlout['H2O']
+
+
+class TestCachedMELTS(unittest.TestCase):
+    def setUp(self):
+        self.comp = {'SiO2': 50.0, 'H2O': 2.0, 'CO2': 0.0}
+        self.engine = CountingMELTS()
+        self.melts = melts_cache.CachedMELTS(self.engine, maxsize=2)
+
+    def test_repeated_equilibration_is_cached(self):
+        self.melts.set_bulk_composition(self.comp)
+        first = self.melts.equilibrate_tp(1000, 100, initialize=True)
+        self.melts.set_bulk_composition(dict(self.comp, CO2=-0.0))
+        second = self.melts.equilibrate_tp(1000.0, 100.0000000001, initialize=True)
+        self.assertEqual(self.engine.calls, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(self.melts.cache_info()['hits'], 1)
+        self.assertEqual(self.melts.cache_info()['misses'], 1)
+
+    def test_different_states_are_not_shared(self):
+        self.melts.set_bulk_composition(self.comp)
+        self.melts.equilibrate_tp(1000, 100, initialize=True)
+        self.melts.equilibrate_tp(1000, 200, initialize=True)
+        self.melts.set_bulk_composition(dict(self.comp, H2O=3.0))
+        out = self.melts.equilibrate_tp(1000, 100, initialize=True)
+        self.assertEqual(self.engine.calls, 3)
+        self.assertEqual(self.melts.get_mass_of_phase(out[0][3]), 300.0)
+
+    def test_uninitialized_calls_are_not_cached(self):
+        self.melts.set_bulk_composition(self.comp)
+        self.melts.equilibrate_tp(1000, 100)
+        self.melts.equilibrate_tp(1000, 100)
+        self.assertEqual(self.engine.calls, 2)
+
+    def test_lru_bound(self):
+        self.melts.set_bulk_composition(self.comp)
+        for P in [100, 200, 100, 300, 200]:
+            self.melts.equilibrate_tp(1000, P, initialize=True)
+        # 200 was evicted when 300 was added
+        self.assertEqual(self.engine.calls, 4)
+        self.assertEqual(self.melts.cache_info()['size'], 2)
+
+    def test_store(self):
+        path = os.path.join(tempfile.mkdtemp(), 'melts.sqlite')
+        self.melts.open_store(path)
+        self.melts.set_bulk_composition(self.comp)
+        first = self.melts.equilibrate_tp(1000, 100, initialize=True)
+        self.melts.close_store()
+
+        engine = CountingMELTS()
+        melts = melts_cache.CachedMELTS(engine, path=path)
+        melts.set_bulk_composition(self.comp)
+        second = melts.equilibrate_tp(1000, 100, initialize=True)
+        melts.close_store()
+        self.assertEqual(engine.calls, 0)
+        self.assertEqual(first, second)
@@ -0,0 +1,216 @@
+import contextlib
+import io
+import unittest
+import pandas as pd
+import VESIcal as v
+from VESIcal import melts_engine
+from VESIcal import melts_stats
+from VESIcal.models import magmasat
+
+
+class FailingEngine(melts_engine.MixedFluidEngine):
+    """A MixedFluidEngine that counts how many times it is constructed, and whose
+    equilibrations can be made to fail."""
+    instances = 0
+    failure = None
+
+    def __init__(self, version='1.2.0'):
+        FailingEngine.instances += 1
+        super().__init__(version)
+
+    def equilibrate_tp(self, T_a, P_a, initialize=False):
+        if FailingEngine.failure == 'status':
+            return [('failure, test failure.', T_a, P_a, None)]
+        if FailingEngine.failure == 'error':
+            raise RuntimeError("test failure")
+        return super().equilibrate_tp(T_a, P_a, initialize=initialize)
+
+
+class TestMixedFluidEngine(unittest.TestCase):
+    def setUp(self):
+        self.majors = {'SiO2':    47.95,
+                       'TiO2':    1.67,
+                       'Al2O3':   17.32,
+                       'FeO':     10.24,
+                       'Fe2O3':   0.1,
+                       'MgO':     5.76,
+                       'CaO':     10.93,
+                       'Na2O':    3.45,
+                       'K2O':     1.99,
+                       'P2O5':    0.51,
+                       'MnO':     0.1,
+                       'H2O':     2.0,
+                       'CO2':     0.1}
+        self.temperature = 1000
+
+        sample = v.Sample(self.majors)
+        self.bulk_comp = dict(sample.get_composition(normalization='fixedvolatiles'))
+        sample = v.Sample(self.bulk_comp)
+        self.satP = v.models.default_models['Dixon'].calculate_saturation_pressure(
+                                                    sample=sample, temperature=self.temperature)
+
+        self.engine = melts_engine.MixedFluidEngine(model='Dixon')
+        self.engine.set_bulk_composition(self.bulk_comp)
+
+        self.previous_engine = magmasat.get_engine()
+
+    def tearDown(self):
+        if magmasat.get_engine() is not self.previous_engine:
+            magmasat.set_engine(self.previous_engine)
+
+    def get_fluid_mass(self, pressure):
+        output = self.engine.equilibrate_tp(self.temperature, pressure / 10.0, initialize=True)
+        (status, temperature, pressureMPa, xmlout) = output[0]
+        return self.engine.get_mass_of_phase(xmlout, phase_name='Fluid')
+
+    def test_saturation(self):
+        self.assertEqual(self.get_fluid_mass(self.satP + 50), 0.0)
+        self.assertGreater(self.get_fluid_mass(self.satP - 50), 0.0)
+
+    def test_fluid_composition(self):
+        output = self.engine.equilibrate_tp(self.temperature, 50.0, initialize=True)
+        xmlout = output[0][3]
+        fluid_comp = self.engine.get_composition_of_phase(xmlout, phase_name='Fluid',
+                                                          mode='component')
+        self.assertAlmostEqual(fluid_comp['Water'] + fluid_comp['Carbon Dioxide'], 1.0)
+        liquid_mass = self.engine.get_mass_of_phase(xmlout, phase_name='Liquid')
+        fluid_mass = self.engine.get_mass_of_phase(xmlout, phase_name='Fluid')
+        self.assertAlmostEqual(liquid_mass + fluid_mass, sum(self.bulk_comp.values()))
+
+    def test_magmasat_with_engine(self):
+        magmasat.set_engine(melts_engine.MixedFluidEngine)
+        calcd_result = magmasat.MagmaSat().calculate_saturation_pressure(
+                                        sample=v.Sample(self.bulk_comp),
+                                        temperature=self.temperature)
+        self.assertLessEqual(abs(calcd_result - self.satP), 10.0)
+
+    def test_search_steps(self):
+        magmasat.set_engine(melts_engine.MixedFluidEngine)
+        max_search_steps = magmasat.max_search_steps
+        magmasat.max_search_steps = 5
+        try:
+            with self.assertRaises(v.core.SaturationError):
+                magmasat.MagmaSat().calculate_saturation_pressure(
+                                        sample=v.Sample(self.bulk_comp),
+                                        temperature=self.temperature, solver='legacy')
+        finally:
+            magmasat.max_search_steps = max_search_steps
+
+    def calculate_recorded(self, calculation, **kwargs):
+        """Runs a MagmaSat calculation with the stand-in engine and an empty MELTS cache,
+        returning its result and the number of MELTS equilibrations it took."""
+        magmasat.set_engine(melts_engine.MixedFluidEngine)
+        with melts_stats.record_calls() as stats:
+            result = getattr(magmasat.MagmaSat(), calculation)(sample=v.Sample(self.bulk_comp),
+                                                               temperature=self.temperature,
+                                                               **kwargs)
+        return result, stats.calls['equilibrate_tp']
+
+    def test_saturation_pressure_bisection(self):
+        legacy, legacy_calls = self.calculate_recorded('calculate_saturation_pressure',
+                                                       solver='legacy')
+        for pressure_tolerance in [1.0, 10.0, 100.0]:
+            result, calls = self.calculate_recorded('calculate_saturation_pressure',
+                                                    pressure_tolerance=pressure_tolerance)
+            # The pressure returned is the fluid-saturated end of the final bracket
+            self.assertLessEqual(result, self.satP)
+            self.assertLessEqual(self.satP - result, pressure_tolerance)
+            self.assertLessEqual(abs(result - legacy), pressure_tolerance + 10.0)
+            self.assertLess(calls, legacy_calls)
+
+    def test_saturation_pressure_initial_guess(self):
+        result, calls = self.calculate_recorded('calculate_saturation_pressure')
+        for initial_guess in [1.1 * self.satP, 'Dixon']:
+            guessed, guessed_calls = self.calculate_recorded('calculate_saturation_pressure',
+                                                             initial_guess=initial_guess)
+            self.assertLessEqual(self.satP - guessed, 10.0)
+            self.assertLess(guessed_calls, calls)
+        # Guesses far enough off that the saturation pressure is outside the +/-20% bracket
+        for initial_guess in [3.0 * self.satP, self.satP / 3.0]:
+            guessed = self.calculate_recorded('calculate_saturation_pressure',
+                                              initial_guess=initial_guess)[0]
+            self.assertLessEqual(guessed, self.satP)
+            self.assertLessEqual(self.satP - guessed, 10.0)
+
+    def test_X_fluid_secant(self):
+        for X_fluid in [0.2, 0.5, 0.8]:
+            legacy, legacy_calls = self.calculate_recorded('calculate_dissolved_volatiles',
+                                                           pressure=2000.0, X_fluid=X_fluid,
+                                                           verbose=True, solver='legacy')
+            secant, secant_calls = self.calculate_recorded('calculate_dissolved_volatiles',
+                                                           pressure=2000.0, X_fluid=X_fluid,
+                                                           verbose=True)
+            self.assertLessEqual(abs(secant['XH2O_fl'] - X_fluid), 0.0001)
+            # Both match X_fluid to within 0.0001, so the dissolved volatiles agree closely
+            for volatile in ['H2O_liq', 'CO2_liq']:
+                self.assertAlmostEqual(secant[volatile], legacy[volatile],
+                                       delta=0.01 * legacy[volatile])
+            self.assertLess(secant_calls, legacy_calls)
+
+    def test_X_fluid_tolerance(self):
+        result, calls = self.calculate_recorded('calculate_dissolved_volatiles', pressure=2000.0,
+                                                X_fluid=0.5, verbose=True)
+        coarse, coarse_calls = self.calculate_recorded('calculate_dissolved_volatiles',
+                                                       pressure=2000.0, X_fluid=0.5,
+                                                       verbose=True, X_fluid_tolerance=0.01)
+        self.assertLessEqual(abs(coarse['XH2O_fl'] - 0.5), 0.01)
+        self.assertLessEqual(coarse_calls, calls)
+
+    def test_isobars_n_workers(self):
+        magmasat.set_engine(melts_engine.MixedFluidEngine)
+        kwargs = {'sample': v.Sample(self.bulk_comp), 'temperature': self.temperature,
+                  'pressure_list': [2000.0, 500.0, 1000.0], 'isopleth_list': [0.4],
+                  'smooth_isobars': False, 'smooth_isopleths': False, 'print_status': False}
+        serial = magmasat.MagmaSat().calculate_isobars_and_isopleths(**kwargs)
+        magmasat.set_engine(melts_engine.MixedFluidEngine)  # empties the MELTS cache
+        parallel = magmasat.MagmaSat().calculate_isobars_and_isopleths(n_workers=2, **kwargs)
+        # Isobars are returned in the order of pressure_list
+        self.assertEqual(list(dict.fromkeys(parallel[0]['Pressure'])), [2000.0, 500.0, 1000.0])
+        for serial_df, parallel_df in zip(serial, parallel):
+            pd.testing.assert_frame_equal(parallel_df, serial_df)
+
+    def test_bad_model(self):
+        with self.assertRaises(v.core.InputError):
+            melts_engine.MixedFluidEngine(model='DixonWater')
+
+
+class TestMELTSHandle(unittest.TestCase):
+    def setUp(self):
+        self.sample = v.Sample({'SiO2': 47.95, 'TiO2': 1.67, 'Al2O3': 17.32, 'FeO': 10.24,
+                                'Fe2O3': 0.1, 'MgO': 5.76, 'CaO': 10.93, 'Na2O': 3.45,
+                                'K2O': 1.99, 'P2O5': 0.51, 'MnO': 0.1, 'H2O': 2.0, 'CO2': 0.1})
+        self.previous_engine = magmasat.get_engine()
+        FailingEngine.failure = None
+        magmasat.set_engine(FailingEngine)
+        self.instances = FailingEngine.instances
+
+    def tearDown(self):
+        FailingEngine.failure = None
+        magmasat.set_engine(self.previous_engine)
+
+    def calculate_degassing_path(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            magmasat.MagmaSat().calculate_degassing_path(self.sample, temperature=1000, steps=5)
+
+    def test_reused(self):
+        for i in range(3):
+            self.calculate_degassing_path()
+        self.assertEqual(FailingEngine.instances - self.instances, 1)
+        self.assertEqual(magmasat.degassing_melts.builds, 1)
+
+    def test_rebuilt_after_failure(self):
+        self.calculate_degassing_path()
+        for failure in ['status', 'error']:
+            FailingEngine.failure = failure
+            try:
+                magmasat.degassing_melts.equilibrate_tp(1000, 100.0, initialize=True)
+            except RuntimeError:
+                pass
+            FailingEngine.failure = None
+            self.assertTrue(magmasat.degassing_melts.failed)
+            self.calculate_degassing_path()
+            self.assertFalse(magmasat.degassing_melts.failed)
+        # Built once at first, then once after each failure
+        self.assertEqual(FailingEngine.instances - self.instances, 3)
+        self.calculate_degassing_path()
+        self.assertEqual(FailingEngine.instances - self.instances, 3)
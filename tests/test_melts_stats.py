@@ -0,0 +1,64 @@
+import unittest
+from VESIcal import core
+from VESIcal import melts_stats
+
+
+class DummyMELTS(object):
+    """Stands in for a MELTS instance."""
+    def equilibrate_tp(self, T_a, P_a, initialize=False):
+        return [('success', T_a, P_a, {'Fluid': 1.0})]
+
+    def get_mass_of_phase(self, xmlout, phase_name='System'):
+        return xmlout.get(phase_name, 0.0)
+
+    def get_phase_names(self):
+        return ['Liquid', 'Fluid']
+
+
+class TestRecordCalls(unittest.TestCase):
+    def setUp(self):
+        self.melts = melts_stats.InstrumentedMELTS(DummyMELTS())
+
+    def run_calculation(self):
+        output = self.melts.equilibrate_tp(1000, 100, initialize=True)
+        self.melts.get_mass_of_phase(output[0][3], phase_name='Fluid')
+        self.melts.get_mass_of_phase(output[0][3], phase_name='Liquid')
+
+    def test_calls_counted(self):
+        with melts_stats.record_calls() as stats:
+            self.run_calculation()
+        self.assertEqual(stats.calls['equilibrate_tp'], 1)
+        self.assertEqual(stats.calls['get_mass_of_phase'], 2)
+        self.assertEqual(stats.calls['get_composition_of_phase'], 0)
+        self.assertGreaterEqual(stats.seconds['equilibrate_tp'], 0.0)
+
+    def test_calls_outside_recorder_not_counted(self):
+        with melts_stats.record_calls() as stats:
+            pass
+        self.run_calculation()
+        self.assertEqual(stats.calls['equilibrate_tp'], 0)
+
+    def test_nested_recorders(self):
+        with melts_stats.record_calls() as outer:
+            self.run_calculation()
+            with melts_stats.record_calls() as inner:
+                self.run_calculation()
+        self.assertEqual(outer.calls['equilibrate_tp'], 2)
+        self.assertEqual(inner.calls['equilibrate_tp'], 1)
+
+    def test_call_recorded(self):
+        result, stats = melts_stats.call_recorded(self.melts.equilibrate_tp, 1000, 100)
+        self.assertEqual(result[0][2], 100)
+        self.assertEqual(stats['equilibrate_tp_calls'], 1)
+        self.assertEqual(stats['get_mass_of_phase_calls'], 0)
+
+    def test_passthrough(self):
+        self.assertEqual(self.melts.get_phase_names(), ['Liquid', 'Fluid'])
+
+    def test_call_budgeted(self):
+        result = melts_stats.call_budgeted(2, self.run_calculation)
+        self.assertIsNone(result)
+        with self.assertRaises(core.BudgetExceededError):
+            melts_stats.call_budgeted(2, lambda: [self.run_calculation() for i in range(3)])
+        # Recording stops when the budget is exceeded
+        self.run_calculation()
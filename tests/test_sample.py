@@ -2,6 +2,7 @@ import unittest
 import VESIcal as v
 import numpy as np
 import pandas as pd
+import pickle
 
 class TestCreateSample(unittest.TestCase):
     def setUp(self):
@@ -408,3 +409,190 @@ class TestGetComposition(unittest.TestCase):
     def test_formulawt_exclV(self):
         fw = self.sample.get_formulaweight(exclude_volatiles=True)
         self.assertEqual(np.round(self.majors_fw,2),np.round(fw,2))
+
+
+class TestSampleBatch(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({'SiO2':  [47.95, 56.0, 72.1],
+                                  'TiO2':  [1.67, 1.1, 0.2],
+                                  'Al2O3': [17.32, 16.5, 13.0],
+                                  'FeO':   [10.24, 7.0, 1.5],
+                                  'MgO':   [5.76, 3.5, 0.3],
+                                  'CaO':   [10.93, 7.0, 1.2],
+                                  'Na2O':  [3.45, 3.9, 4.1],
+                                  'K2O':   [1.99, 1.7, 4.5],
+                                  'H2O':   [2.0, 4.0, 6.0],
+                                  'CO2':   [0.1, 0.05, 0.0]},
+                                 index=['basalt', 'andesite', 'rhyolite'])
+        self.batch = v.SampleBatch(self.data)
+        self.samples = [v.Sample(dict(self.data.loc[index])) for index in self.data.index]
+
+    def assertMatchesSamples(self, batch, **kwargs):
+        expected = pd.DataFrame([sample.get_composition(**kwargs).rename(index)
+                                 for sample, index in zip(self.samples, self.data.index)])
+        composition = batch.get_composition(**kwargs)
+        pd.testing.assert_frame_equal(composition, expected[composition.columns])
+
+    def test_get_composition(self):
+        for units in ['wtpt_oxides', 'mol_oxides', 'mol_cations']:
+            for normalization in ['none', 'standard', 'fixedvolatiles', 'additionalvolatiles']:
+                for exclude_volatiles in [False, True]:
+                    self.assertMatchesSamples(self.batch, units=units,
+                                              normalization=normalization,
+                                              exclude_volatiles=exclude_volatiles)
+        self.assertMatchesSamples(self.batch, units='mol_singleO')
+        self.assertEqual(list(self.batch.get_composition().columns),
+                         [ox for ox in v.core.oxides if ox in self.data.columns])
+
+    def test_missing_oxide(self):
+        # As for Sample, a NaN oxide is skipped in the totals rather than making its row NaN
+        self.data.loc['andesite', 'TiO2'] = np.nan
+        self.samples = [v.Sample(dict(self.data.loc[index])) for index in self.data.index]
+        batch = v.SampleBatch(self.data)
+        for units in ['wtpt_oxides', 'mol_oxides', 'mol_cations']:
+            for normalization in ['none', 'fixedvolatiles', 'additionalvolatiles']:
+                self.assertMatchesSamples(batch, units=units, normalization=normalization)
+        molOxides = batch.get_composition(units='mol_oxides')
+        self.assertFalse(np.isnan(molOxides.loc['andesite', 'SiO2']))
+
+    def test_species(self):
+        np.testing.assert_allclose(self.batch.get_composition(species='SiO2', units='mol_oxides'),
+                                   [sample.get_composition(species='SiO2', units='mol_oxides')
+                                    for sample in self.samples])
+        np.testing.assert_allclose(self.batch.get_composition(species='Si'),
+                                   self.batch.get_composition(units='mol_cations')['Si'])
+        np.testing.assert_array_equal(self.batch.get_composition(species='Cr2O3'), [0, 0, 0])
+        with self.assertRaises(v.core.InputError):
+            self.batch.get_composition(species='SiO3')
+
+    def test_change_composition(self):
+        for units, new_composition in [('wtpt_oxides', {'H2O': 3.0}), ('mol_oxides', {'H2O': 0.1}),
+                                       ('mol_cations', {'H': 0.1})]:
+            changed = self.batch.change_composition(new_composition, units=units, inplace=False)
+            self.samples = [sample.change_composition(new_composition, units=units,
+                                                      inplace=False)
+                            for sample in [v.Sample(dict(self.data.loc[index]))
+                                           for index in self.data.index]]
+            self.assertMatchesSamples(changed)
+        np.testing.assert_array_equal(self.batch.get_composition(species='H2O'), [2.0, 4.0, 6.0])
+
+        self.batch.change_composition({'H2O': np.array([1.0, 2.0, 3.0])})
+        np.testing.assert_array_equal(self.batch.get_composition(species='H2O'), [1.0, 2.0, 3.0])
+
+    def test_check_oxide(self):
+        self.assertTrue(self.batch.check_oxide('H2O'))
+        self.assertFalse(self.batch.check_oxide('Cr2O3'))
+        self.batch.change_composition({'Cr2O3': 0.1})
+        self.assertTrue(self.batch.check_oxide('Cr2O3'))
+
+    def test_array(self):
+        batch = v.SampleBatch(self.batch.get_composition().reindex(columns=v.core.oxides,
+                                                                   fill_value=0.0).to_numpy())
+        np.testing.assert_allclose(batch.get_composition(units='mol_oxides')[self.data.columns],
+                                   self.batch.get_composition(units='mol_oxides'))
+        with self.assertRaises(v.core.InputError):
+            v.SampleBatch(np.ones((3, 4)))
+
+
+class TestOxideMasses(unittest.TestCase):
+    def setUp(self):
+        self.sample = v.Sample({'SiO2': 47.95, 'Al2O3': 17.32, 'FeO': 10.24, 'MgO': 5.76,
+                                'CaO': 10.93, 'H2O': 2.0})
+        self.oxide_masses = {'SiO2': 60.09, 'H2O': 18.01}
+
+    def test_oxide_masses(self):
+        composition = self.sample.get_composition(units='mol_oxides',
+                                                  oxide_masses=self.oxide_masses)
+        oxideMass = dict(v.core.oxideMass, **self.oxide_masses)
+        moles = pd.Series({ox: self.sample.get_composition(species=ox) / oxideMass[ox]
+                           for ox in composition.index})
+        pd.testing.assert_series_equal(composition, moles / moles.sum())
+
+        # Overrides are cached by their contents, not by the dict passed
+        self.assertIs(v.sample_class._get_oxide_masses(self.oxide_masses),
+                      v.sample_class._get_oxide_masses(dict(self.oxide_masses)))
+        self.assertIs(v.sample_class._get_oxide_masses({}), v.sample_class._oxide_masses)
+
+        with self.assertRaises(v.core.InputError):
+            self.sample.get_composition(units='mol_oxides', oxide_masses={'SiO3': 76.0})
+
+
+class TestCompositionViews(unittest.TestCase):
+    def setUp(self):
+        self.sample = v.Sample({'SiO2': 47.95, 'Al2O3': 17.32, 'FeO': 10.24, 'MgO': 5.76,
+                                'CaO': 10.93, 'H2O': 2.0, 'CO2': 0.1})
+
+    def test_cached(self):
+        composition = self.sample.get_composition(units='mol_oxides')
+        composition['SiO2'] = 0.0
+        pd.testing.assert_series_equal(self.sample.get_composition(units='mol_oxides'),
+                                       v.Sample(self.sample.get_composition()).get_composition(
+                                           units='mol_oxides'))
+
+    def test_change_composition(self):
+        for units in ['wtpt_oxides', 'mol_oxides', 'mol_cations']:
+            self.sample.get_composition(units=units, normalization='standard')
+        self.sample.change_composition({'H2O': 4.0})
+        self.assertEqual(self.sample.get_composition(species='H2O'), 4.0)
+        fresh = v.Sample(self.sample.get_composition())
+        for units in ['wtpt_oxides', 'mol_oxides', 'mol_cations']:
+            pd.testing.assert_series_equal(
+                self.sample.get_composition(units=units, normalization='standard'),
+                fresh.get_composition(units=units, normalization='standard'))
+
+    def test_pickle(self):
+        other = v.Sample(self.sample.get_composition())
+        self.sample.get_composition(units='mol_oxides')
+        self.assertEqual(pickle.dumps(self.sample), pickle.dumps(other))
+
+
+class TestChangeCompositionCopy(unittest.TestCase):
+    def setUp(self):
+        self.composition = {'SiO2': 47.95, 'Al2O3': 17.32, 'FeO': 10.24, 'MgO': 5.76,
+                            'CaO': 10.93, 'H2O': 2.0, 'CO2': 0.1}
+        self.sample = v.Sample(self.composition)
+
+    def test_independent(self):
+        changed = self.sample.change_composition({'H2O': 3.0}, inplace=False)
+        self.assertEqual(changed.get_composition(species='H2O'), 3.0)
+        self.assertEqual(self.sample.get_composition(species='H2O'), 2.0)
+
+        # Changes made in place to either sample afterwards do not affect the other
+        self.sample.change_composition({'CO2': 0.5})
+        changed.change_composition({'MgO': 6.0})
+        self.assertEqual(changed.get_composition(species='CO2'), 0.1)
+        self.assertEqual(self.sample.get_composition(species='MgO'), 5.76)
+        pd.testing.assert_series_equal(changed.get_composition(),
+                                       pd.Series(dict(self.composition, H2O=3.0, MgO=6.0)))
+
+        twice = changed.change_composition({'K2O': 1.0}, inplace=False)
+        pd.testing.assert_series_equal(twice.get_composition(),
+                                       pd.Series(dict(self.composition, H2O=3.0, MgO=6.0,
+                                                      K2O=1.0)))
+        self.assertFalse(changed.check_oxide('K2O'))
+
+    def test_read_without_copy(self):
+        changed = self.sample.change_composition({'H2O': 3.0}, inplace=False)
+        copied = v.Sample(dict(self.composition, H2O=3.0))
+        for units in ['wtpt_oxides', 'mol_oxides', 'mol_cations', 'mol_singleO']:
+            for exclude_volatiles in [False, True]:
+                pd.testing.assert_series_equal(
+                    changed.get_composition(units=units, exclude_volatiles=exclude_volatiles),
+                    copied.get_composition(units=units, exclude_volatiles=exclude_volatiles))
+        self.assertEqual(changed.get_composition(species='H2O'), 3.0)
+        self.assertEqual(changed.get_composition(species='SiO2', units='mol_oxides'),
+                         copied.get_composition(species='SiO2', units='mol_oxides'))
+        self.assertTrue(changed.check_oxide('H2O'))
+
+        # Reading the changed sample leaves it sharing the original composition
+        self.assertIs(changed._wtpt, self.sample._wtpt)
+        self.assertEqual(self.sample.get_composition(species='H2O'), 2.0)
+
+    def test_matches_copy(self):
+        changed = self.sample.change_composition({'H2O': 3.0, 'CO2': 0.0}, inplace=False)
+        copied = v.Sample(dict(self.composition, H2O=3.0, CO2=0.0))
+        for units in ['wtpt_oxides', 'mol_oxides', 'mol_cations']:
+            pd.testing.assert_series_equal(
+                changed.get_composition(units=units, normalization='standard'),
+                copied.get_composition(units=units, normalization='standard'))
+        self.assertEqual(pickle.dumps(changed), pickle.dumps(copied))
@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+import pandas as pd
+import VESIcal as v
+from VESIcal.models import shishkina
+
+
+class TestDissolvedVolatilesArray(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({'SiO2':  [47.95, 56.0, 62.1],
+                                  'TiO2':  [1.67, 1.1, 0.2],
+                                  'Al2O3': [17.32, 16.5, 15.0],
+                                  'FeO':   [10.24, 7.0, 3.5],
+                                  'Fe2O3': [0.1, 0.5, 0.0],
+                                  'MgO':   [5.76, 3.5, 1.3],
+                                  'CaO':   [10.93, 7.0, 4.2],
+                                  'Na2O':  [3.45, 3.9, 4.1],
+                                  'K2O':   [1.99, 1.7, 3.5],
+                                  'H2O':   [2.0, 4.0, 6.0],
+                                  'CO2':   [0.1, 0.05, 0.0]},
+                                 index=['basalt', 'andesite', 'dacite'])
+        self.samples = [v.Sample(dict(self.data.loc[index])) for index in self.data.index]
+        self.pressure = np.array([500.0, 2000.0, 4000.0])
+        self.X_fluid = np.array([0.0, 0.4, 1.0])
+
+    def test_matches_samples(self):
+        H2O, CO2 = shishkina.calculate_dissolved_volatiles_array(self.pressure, self.data,
+                                                                 self.X_fluid)
+        for i, sample in enumerate(self.samples):
+            expected = shishkina.mixed.calculate_dissolved_volatiles(
+                            pressure=self.pressure[i], X_fluid=float(self.X_fluid[i]),
+                            sample=sample)
+            self.assertEqual(H2O[i], expected[0])
+            self.assertEqual(CO2[i], expected[1])
+
+    def test_broadcast(self):
+        batch = v.SampleBatch(self.data)
+        CO2 = shishkina.carbon().calculate_dissolved_volatiles_array(
+                  self.pressure[:, None], batch, X_fluid=0.5)
+        self.assertEqual(CO2.shape, (3, 3))
+        for i, sample in enumerate(self.samples):
+            self.assertEqual(CO2[1, i], shishkina.carbon().calculate_dissolved_volatiles(
+                                            pressure=2000.0, sample=sample, X_fluid=0.5))
+        H2O = shishkina.water().calculate_dissolved_volatiles_array(1000.0, batch)
+        self.assertEqual(H2O.shape, (3,))
+
+    def test_invalid(self):
+        with self.assertRaises(v.core.InputError):
+            shishkina.calculate_dissolved_volatiles_array(self.pressure, self.data, 1.5)
+        with self.assertRaises(v.core.InputError):
+            shishkina.calculate_dissolved_volatiles_array(-self.pressure, self.data, 0.5)
+        with self.assertRaises(v.core.InputError):
+            shishkina.water().calculate_dissolved_volatiles_array(
+                1000.0, self.data.drop(columns='K2O'))
+        with self.assertRaises(v.core.InputError):
+            shishkina.carbon().calculate_dissolved_volatiles_array(1000.0, self.samples)